@@ -0,0 +1,253 @@
+from argparse import (
+    Namespace,
+    ArgumentParser,
+)
+from pathlib import Path
+from sys import exit
+from time import perf_counter
+from platform import (
+    platform,
+    processor,
+    python_version,
+)
+from json import (
+    dumps,
+    loads,
+)
+from itertools import pairwise
+from typing import (
+    Any,
+    Callable,
+)
+from glm import vec3
+from numpy import (
+    __version__ as numpyVersion,
+    ndarray,
+    float64,
+    array,
+    abs as npabs,
+    maximum,
+    isnan,
+    errstate,
+)
+from numpy.random import default_rng
+from imagecolorpicker.colorspace import (
+    ColorSpace,
+    ColorSpaceConversion,
+    ColorSpaceType,
+    Observer,
+    Illuminant,
+)
+
+
+def measure(function: Callable[[], Any], colorCount: int, repetitionCount: int) -> float:
+    """Best time per color in ns over the repetitions of a call that converts colorCount colors."""
+    best: float = float('inf')
+    for _ in range(repetitionCount):
+        start: float = perf_counter()
+        function()
+        best = min(best, perf_counter() - start)
+    return best / colorCount * 1e9
+
+
+def relativeError(actual: ndarray, expected: ndarray) -> float:
+    """Maximum error relative to max(1, |expected|), ignoring components undefined in either array."""
+    error: ndarray = npabs(actual - expected) / maximum(1., npabs(expected))
+    return float(error[~isnan(error)].max(initial=0.))
+
+
+def compare(
+    results: dict[str, Any],
+    baseline: dict[str, Any],
+    timeTolerance: float,
+    errorTolerance: float,
+) -> list[str]:
+    """Regressions of results against baseline: times slower by more than the factor
+    timeTolerance and errors larger by more than the factor errorTolerance."""
+    regressions: list[str] = []
+    for section in ['edges', 'pairs']:
+        baselineEntries: dict[tuple[str, str], dict[str, Any]] = dict(map(
+            lambda entry: ((entry['from'], entry['to']), entry),
+            baseline.get(section, []),
+        ))
+        for entry in results[section]:
+            key: tuple[str, str] = entry['from'], entry['to']
+            if key not in baselineEntries:
+                continue
+            baselineEntry: dict[str, Any] = baselineEntries[key]
+            timings: list[tuple[str, float, float]] = [('scalar', entry['scalar'], baselineEntry['scalar'])]
+            if 'compiled' in entry:
+                timings.append(('compiled', entry['compiled'], baselineEntry['compiled']))
+            for batchSize, time in entry['array'].items():
+                if batchSize in baselineEntry['array']:
+                    timings.append((f'array[{batchSize}]', time, baselineEntry['array'][batchSize]))
+            for name, time, baselineTime in timings:
+                if time > baselineTime * timeTolerance:
+                    regressions.append(f"{section} {key[0]} -> {key[1]} {name}: {time:.1f} ns vs. {baselineTime:.1f} ns per color")
+            for name in ['roundTripError', 'scalarError']:
+                if name in entry and entry[name] > baselineEntry[name] * errorTolerance + 1e-12:
+                    regressions.append(f"{section} {key[0]} -> {key[1]} {name}: {entry[name]:.2e} vs. {baselineEntry[name]:.2e}")
+    return regressions
+
+
+if __name__ == '__main__':
+    parser: ArgumentParser = ArgumentParser('benchmark', description='Color space conversion benchmark and accuracy suite')
+    parser.add_argument(
+        '-o', '--output',
+        type=Path,
+        default=Path('build') / 'benchmark.json',
+        dest='output',
+        help='JSON file to write the results to.',
+    )
+    parser.add_argument(
+        '-b', '--baseline',
+        type=Path,
+        default=None,
+        dest='baseline',
+        help='JSON file of an earlier run to compare against; exits with 1 on regressions.',
+    )
+    parser.add_argument(
+        '-s', '--batch-sizes',
+        type=int,
+        nargs='+',
+        default=[1, 64, 4096, 65536],
+        dest='batchSizes',
+        help='Batch sizes for the array conversions.',
+    )
+    parser.add_argument(
+        '-r', '--repetitions',
+        type=int,
+        default=5,
+        dest='repetitionCount',
+        help='Repetitions per measurement; the best one counts.',
+    )
+    parser.add_argument(
+        '--scalar-samples',
+        type=int,
+        default=256,
+        dest='scalarSampleCount',
+        help='Colors converted one by one per scalar measurement.',
+    )
+    parser.add_argument(
+        '--time-tolerance',
+        type=float,
+        default=1.5,
+        dest='timeTolerance',
+        help='Slowdown factor against the baseline reported as regression.',
+    )
+    parser.add_argument(
+        '--error-tolerance',
+        type=float,
+        default=2.,
+        dest='errorTolerance',
+        help='Error growth factor against the baseline reported as regression.',
+    )
+    args: Namespace = parser.parse_args()
+
+    observer: Observer = Observer.TwoDegreesCIE1931
+    illuminant: Illuminant = Illuminant.D65
+    whitepoint: vec3 = ColorSpace.Tristimuli[observer][illuminant]
+    whitepointArray: ndarray = array(whitepoint, dtype=float64)
+
+    # Fixed corpus of sRGB colors away from the gamut boundary, converted into each source space.
+    corpus: ndarray = default_rng(210).uniform(0.05, 0.95, (max(args.batchSizes), 3))
+    inputs: dict[ColorSpaceType, ndarray] = dict(map(
+        lambda colorSpaceType: (colorSpaceType, ColorSpace.convertArray(corpus, ColorSpaceType.SRGB, colorSpaceType)),
+        ColorSpaceType,
+    ))
+    scalarInputs: dict[ColorSpaceType, list[vec3]] = dict(map(
+        lambda item: (item[0], list(map(lambda color: vec3(*color), item[1][:args.scalarSampleCount]))),
+        inputs.items(),
+    ))
+
+    def measureArray(function: Callable[[ndarray], ndarray], colors: ndarray) -> dict[str, float]:
+        timings: dict[str, float] = {}
+        for batchSize in args.batchSizes:
+            # Small batches are repeated, so that every measurement converts a comparable amount of colors.
+            batchCount: int = max(1, 1024 // batchSize)
+            batch: ndarray = colors[:batchSize]
+            timings[str(batchSize)] = measure(
+                lambda: [function(batch) for _ in range(batchCount)],
+                batchSize * batchCount,
+                args.repetitionCount,
+            )
+        return timings
+
+    results: dict[str, Any] = {
+        'machine': {
+            'platform': platform(),
+            'processor': processor(),
+            'python': python_version(),
+            'numpy': numpyVersion,
+        },
+        'settings': {
+            'batchSizes': args.batchSizes,
+            'repetitions': args.repetitionCount,
+            'scalarSamples': args.scalarSampleCount,
+            'observer': observer.name,
+            'illuminant': illuminant.name,
+        },
+        'edges': [],
+        'pairs': [],
+    }
+
+    with errstate(divide='ignore', invalid='ignore', over='ignore'):
+        for edge in ColorSpace.Edges.keys():
+            transform, arrayTransform = ColorSpaceConversion._bind(edge, whitepoint, whitepointArray)
+            inverseArrayTransform = ColorSpaceConversion._bind(edge[::-1], whitepoint, whitepointArray)[1]
+            colors: ndarray = inputs[edge[0]]
+            scalarColors: list[vec3] = scalarInputs[edge[0]]
+            entry: dict[str, Any] = {
+                'from': edge[0].name,
+                'to': edge[1].name,
+                'scalar': measure(lambda: [transform(color) for color in scalarColors], len(scalarColors), args.repetitionCount),
+                'array': measureArray(arrayTransform, colors),
+                'roundTripError': relativeError(inverseArrayTransform(arrayTransform(colors)), colors),
+            }
+            results['edges'].append(entry)
+            print(f"{edge[0].name} -> {edge[1].name}: {entry['scalar']:.0f} ns scalar, " +
+                ', '.join(map(lambda item: f"{item[1]:.1f} ns @ {item[0]}", entry['array'].items())) +
+                f", round trip error {entry['roundTripError']:.1e}")
+
+        for fromColorSpace in ColorSpaceType:
+            for toColorSpace in ColorSpaceType:
+                conversion: ColorSpaceConversion = ColorSpace.compile(fromColorSpace, toColorSpace, observer, illuminant)
+                colors = inputs[fromColorSpace]
+                scalarColors = scalarInputs[fromColorSpace]
+                converted: ndarray = conversion.convertArray(colors)
+                scalarConverted: ndarray = array(list(map(conversion, scalarColors)), dtype=float64)
+                entry = {
+                    'from': fromColorSpace.name,
+                    'to': toColorSpace.name,
+                    'hops': len(ColorSpace.path(fromColorSpace, toColorSpace)) - 1,
+                    'stages': conversion.stageCount,
+                    'scalar': measure(
+                        lambda: [ColorSpace.convert(color, fromColorSpace, toColorSpace, observer=observer, illuminant=illuminant) for color in scalarColors],
+                        len(scalarColors),
+                        args.repetitionCount,
+                    ),
+                    'compiled': measure(lambda: [conversion(color) for color in scalarColors], len(scalarColors), args.repetitionCount),
+                    'array': measureArray(conversion.convertArray, colors),
+                    'roundTripError': relativeError(
+                        ColorSpace.compile(toColorSpace, fromColorSpace, observer, illuminant).convertArray(converted),
+                        colors,
+                    ),
+                    'scalarError': relativeError(scalarConverted, converted[:len(scalarColors)]),
+                }
+                results['pairs'].append(entry)
+                print(f"{fromColorSpace.name} -> {toColorSpace.name}: {entry['scalar']:.0f} ns scalar, {entry['compiled']:.0f} ns compiled, " +
+                    ', '.join(map(lambda item: f"{item[1]:.1f} ns @ {item[0]}", entry['array'].items())) +
+                    f", round trip error {entry['roundTripError']:.1e}")
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(dumps(results, indent=4))
+    print(f"Wrote {args.output}.")
+
+    if args.baseline is not None:
+        regressions: list[str] = compare(results, loads(args.baseline.read_text()), args.timeTolerance, args.errorTolerance)
+        for regression in regressions:
+            print(regression)
+        if len(regressions) != 0:
+            print(f"{len(regressions)} regressions against {args.baseline}.")
+            exit(1)
+        print(f"No regressions against {args.baseline}.")
@@ -0,0 +1,139 @@
+from argparse import (
+    Namespace,
+    ArgumentParser,
+)
+from pathlib import Path
+from time import perf_counter
+from platform import (
+    platform,
+    processor,
+    python_version,
+)
+from json import dumps
+from typing import (
+    Any,
+    Callable,
+)
+from numpy import (
+    __version__ as numpyVersion,
+    ndarray,
+)
+from imagecolorpicker.colorgradient import (
+    ColorGradient,
+    DefaultGradient1,
+    FitAlgorithm,
+    FitLoss,
+    FitModel,
+    FitReport,
+)
+from imagecolorpicker.optimizationalgorithm import OptimizationAlgorithm
+
+
+# Residual evaluations including those of the finite differences, which scipy's nfev leaves out.
+residualCallCount: int = 0
+leastSquares: Callable[..., tuple[ndarray, int, int]] = OptimizationAlgorithm.LeastSquares
+
+
+def countingLeastSquares(residuals: Callable[[ndarray], ndarray], *args: Any) -> tuple[ndarray, int, int]:
+    def countedResiduals(x: ndarray) -> ndarray:
+        global residualCallCount
+        residualCallCount += 1
+        return residuals(x)
+    return leastSquares(countedResiduals, *args)
+
+
+def fitOnce(info: dict, analyticalJacobians: bool, repetitionCount: int) -> tuple[FitReport, int, float]:
+    """Report and residual evaluations of a cold fit and the best wall time over the
+    repetitions, bypassing the FitCache."""
+    global residualCallCount
+    ColorGradient.AnalyticalJacobians = analyticalJacobians
+    best: float = float('inf')
+    report: FitReport
+    callCount: int
+    for _ in range(repetitionCount):
+        gradient: ColorGradient = ColorGradient.fromDict(info)
+        residualCallCount = 0
+        start: float = perf_counter()
+        gradient.fit()
+        best = min(best, perf_counter() - start)
+        report, callCount = gradient.fitReport, residualCallCount
+    return report, callCount, best
+
+
+if __name__ == '__main__':
+    parser: ArgumentParser = ArgumentParser('benchmark.fitting', description='Fit benchmark: analytical Jacobians against finite differences')
+    parser.add_argument(
+        '-o', '--output',
+        type=Path,
+        default=Path('build') / 'benchmark-fitting.json',
+        dest='output',
+        help='JSON file to write the results to.',
+    )
+    parser.add_argument(
+        '-d', '--degrees',
+        type=int,
+        nargs='+',
+        default=list(range(4, 17)),
+        dest='degrees',
+        help='Degrees to fit.',
+    )
+    parser.add_argument(
+        '-r', '--repetitions',
+        type=int,
+        default=3,
+        dest='repetitionCount',
+        help='Repetitions per measurement; the best one counts.',
+    )
+    args: Namespace = parser.parse_args()
+
+    OptimizationAlgorithm.LeastSquares = countingLeastSquares
+
+    # The linear models only iterate with robust losses; with the linear loss, they are solved in closed form.
+    configurations: list[tuple[FitModel, FitAlgorithm, FitLoss]] = [
+        (FitModel.Fourier, FitAlgorithm.LM, FitLoss.Linear),
+        (FitModel.Fourier, FitAlgorithm.TRF, FitLoss.Linear),
+        *map(lambda model: (model, FitAlgorithm.TRF, FitLoss.Arctan), ColorGradient.LinearBases.keys()),
+    ]
+
+    results: dict[str, Any] = {
+        'machine': {
+            'platform': platform(),
+            'processor': processor(),
+            'python': python_version(),
+            'numpy': numpyVersion,
+        },
+        'settings': {
+            'degrees': args.degrees,
+            'repetitions': args.repetitionCount,
+            'gradient': DefaultGradient1._name,
+        },
+        'fits': [],
+    }
+
+    for model, algorithm, loss in configurations:
+        for degree in args.degrees:
+            info: dict = dict(DefaultGradient1.toDict(), model=model.name, degree=degree, algorithm=algorithm.name, fit_loss=loss.name)
+            entry: dict[str, Any] = {
+                'model': model.name,
+                'algorithm': algorithm.name,
+                'loss': loss.name,
+                'degree': degree,
+            }
+            for name, analyticalJacobians in [('finiteDifferences', False), ('analytical', True)]:
+                report, callCount, wallTime = fitOnce(info, analyticalJacobians, args.repetitionCount)
+                entry[name] = {
+                    'evaluations': callCount,
+                    'iterations': report.iterationCount,
+                    'time': wallTime,
+                    'residual': report.residual,
+                }
+            results['fits'].append(entry)
+            before, after = entry['finiteDifferences'], entry['analytical']
+            print(f"{model.name} {algorithm.name} {loss.name} {degree}: " +
+                f"{before['evaluations']} -> {after['evaluations']} evaluations, " +
+                f"{before['time'] * 1e3:.1f} -> {after['time'] * 1e3:.1f} ms, " +
+                f"rms {before['residual']:.2e} -> {after['residual']:.2e}")
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(dumps(results, indent=4))
+    print(f"Wrote {args.output}.")
@@ -0,0 +1,52 @@
+from argparse import (
+    Namespace,
+    ArgumentParser,
+)
+from subprocess import (
+    run,
+    CompletedProcess,
+)
+from os import environ
+from sys import (
+    exit,
+    executable,
+)
+from time import perf_counter
+
+
+# Modules with a --check mode, in the order of their dependencies.
+CheckedModules: list[str] = [
+    # Static route table, array conversions and 8 bit transfer function tables.
+    'imagecolorpicker.colorspace',
+    'imagecolorpicker.colorlut',
+    'imagecolorpicker.imagearray',
+    'imagecolorpicker.fitscheduler',
+    'imagecolorpicker.inversecolormap',
+]
+
+
+if __name__ == '__main__':
+    parser: ArgumentParser = ArgumentParser('check', description='Run the checks of all modules.')
+    parser.add_argument(
+        'modules',
+        nargs='*',
+        default=CheckedModules,
+        help='Modules to check; all by default.',
+    )
+    args: Namespace = parser.parse_args()
+
+    # The checks create Qt objects; they need no display.
+    environment: dict[str, str] = dict(environ)
+    environment.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+    failedModules: list[str] = []
+    for module in args.modules:
+        start: float = perf_counter()
+        result: CompletedProcess = run([executable, '-m', module, '--check'], env=environment)
+        print(f"{module}: {'passed' if result.returncode == 0 else 'FAILED'} in {perf_counter() - start:.1f} s")
+        if result.returncode != 0:
+            failedModules.append(module)
+
+    if failedModules:
+        print(f"Failed: {', '.join(failedModules)}.")
+    exit(1 if failedModules else 0)
@@ -1,5 +1,11 @@
 import sys
-from PyQt6.QtWidgets import QApplication
+from typing import Optional
+from multiprocessing import current_process
 
 # Note (@LeStahL): error NEEDS a present QApplication instance.
-application: QApplication = QApplication(sys.argv)
+# The worker processes of the fits import the package, too; they have no GUI and must not load Qt's.
+# Spawned processes are named before they import anything, unlike their parent_process.
+application: Optional['QApplication'] = None
+if current_process().name == 'MainProcess':
+    from PyQt6.QtWidgets import QApplication
+    application = QApplication(sys.argv)
@@ -1,7 +1,13 @@
-from PyQt6.QtWidgets import QApplication
-from imagecolorpicker.controller import Controller
+from multiprocessing import freeze_support
 
 if __name__ == '__main__':
+    # Before anything else: in frozen builds, the process pool workers of the fits start through
+    # this entry point, too, and must not start the GUI.
+    freeze_support()
+
+    from PyQt6.QtWidgets import QApplication
+    from imagecolorpicker.controller import Controller
+
     controller: Controller = Controller()
     controller.startApplication()
     QApplication.exit(0)
@@ -0,0 +1,25 @@
+from os import environ
+from sys import platform
+from pathlib import Path
+
+
+class CacheLocation:
+    ApplicationName: str = 'ImageColorPicker'
+
+    @staticmethod
+    def root() -> Path:
+        """The generic cache location of the platform, as QStandardPaths.GenericCacheLocation.
+
+        Computed without Qt, so that the caches work in worker processes that never load it.
+        """
+        if platform == 'win32':
+            return Path(environ.get('LOCALAPPDATA', Path.home() / 'AppData' / 'Local')) / 'cache'
+        if platform == 'darwin':
+            return Path.home() / 'Library' / 'Caches'
+        return Path(environ.get('XDG_CACHE_HOME') or Path.home() / '.cache')
+
+    @staticmethod
+    def directory(subdirectory: str) -> Path:
+        path: Path = CacheLocation.root() / CacheLocation.ApplicationName / subdirectory
+        path.mkdir(parents=True, exist_ok=True)
+        return path
@@ -1,10 +1,20 @@
 from __future__ import annotations
-from scipy.optimize import curve_fit, minimize
 from numpy import (
+    ndarray,
+    float64,
     array,
-    array,
+    asarray,
+    empty,
+    sqrt,
+    isfinite,
+    append,
     linspace,
+    floor,
+    searchsorted,
+    hstack,
 )
+from numpy.random import default_rng
+from numpy.typing import ArrayLike
 from glm import (
     vec3,
     fract,
@@ -16,13 +26,20 @@ from typing import (
     Tuple,
     List,
     Callable,
+    Optional,
+    Iterable,
 )
 from enum import (
     IntEnum,
     auto,
 )
 from copy import deepcopy
+from time import perf_counter
 from functools import partial
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from os import cpu_count
 from PyQt6.QtGui import (
     QColor,
     QLinearGradient,
@@ -33,11 +50,15 @@ from construct import (
 )
 from .colorspace import (
     ColorSpace,
+    ColorSpaceConversion,
     ColorSpaceType,
     Observer,
     Illuminant,
 )
 from .optimizationmodel import OptimizationModel
+from .optimizationalgorithm import OptimizationAlgorithm
+from .fitcache import FitCache
+from .inversecolormap import InverseColorMap
 
 
 class GradientWeight(IntEnum):
@@ -73,7 +94,193 @@ class FitAlgorithm(IntEnum):
     CMAES = auto()
 
 
+class FitLoss(IntEnum):
+    Linear = auto()
+    Arctan = auto()
+
+
+class FitReport:
+    def __init__(
+        self: Self,
+        algorithm: str,
+        iterationCount: int,
+        evaluationCount: int,
+        wallTime: float,
+        residual: float,
+        warmStart: bool = False,
+        cached: bool = False,
+        startCount: int = 1,
+        bestStartCount: int = 1,
+    ) -> None:
+        self._algorithm: str = algorithm
+        self._iterationCount: int = iterationCount
+        self._evaluationCount: int = evaluationCount
+        self._wallTime: float = wallTime
+        self._residual: float = residual
+        self._warmStart: bool = warmStart
+        self._cached: bool = cached
+        self._startCount: int = startCount
+        self._bestStartCount: int = bestStartCount
+
+    @property
+    def algorithm(self: Self) -> str:
+        return self._algorithm
+
+    @property
+    def iterationCount(self: Self) -> int:
+        """Iterations summed over the channels; generations for CMA-ES."""
+        return self._iterationCount
+
+    @property
+    def evaluationCount(self: Self) -> int:
+        """Model evaluations summed over the channels; one per candidate for CMA-ES."""
+        return self._evaluationCount
+
+    @property
+    def wallTime(self: Self) -> float:
+        """Seconds spent in fit, including sampling the gradient."""
+        return self._wallTime
+
+    @property
+    def residual(self: Self) -> float:
+        """Root mean square deviation of the fit from the samples."""
+        return self._residual
+
+    @property
+    def warmStart(self: Self) -> bool:
+        """Whether the fit, or one of its starts, started from the previous coefficients."""
+        return self._warmStart
+
+    @property
+    def cached(self: Self) -> bool:
+        """Whether the fit was taken from the FitCache; the other statistics are those of the original fit."""
+        return self._cached
+
+    @property
+    def startCount(self: Self) -> int:
+        """Starts of a multi-start fit; iterations and evaluations are summed over them."""
+        return self._startCount
+
+    @property
+    def bestStartCount(self: Self) -> int:
+        """Starts that converged to the best loss, up to ColorGradient.MultiStartTolerance."""
+        return self._bestStartCount
+
+    def __str__(self: Self) -> str:
+        starts: str = f', {self._bestStartCount} of {self._startCount} starts at best' if self._startCount > 1 else ''
+        return f'{self._algorithm}{" (warm)" if self._warmStart else ""}{" (cached)" if self._cached else ""}: {self._iterationCount} iterations, {self._evaluationCount} evaluations, {self._wallTime * 1e3:.1f} ms, rms {self._residual:.2e}{starts}'
+
+
+class AutoFitCandidate:
+    """One row of the table of ColorGradient.autoFit: a model and degree with its cost and error."""
+
+    def __init__(
+        self: Self,
+        model: FitModel,
+        degree: int,
+        coefficientCount: int,
+        maxDeltaE: float,
+        meanDeltaE: float,
+        wallTime: float,
+        entry: dict[str, ndarray],
+    ) -> None:
+        self._model: FitModel = model
+        self._degree: int = degree
+        self._coefficientCount: int = coefficientCount
+        self._maxDeltaE: float = maxDeltaE
+        self._meanDeltaE: float = meanDeltaE
+        self._wallTime: float = wallTime
+        # The fit as FitCache entry, so the chosen candidate is not fitted again.
+        self._entry: dict[str, ndarray] = entry
+
+    @property
+    def model(self: Self) -> FitModel:
+        return self._model
+
+    @property
+    def degree(self: Self) -> int:
+        return self._degree
+
+    @property
+    def coefficientCount(self: Self) -> int:
+        """vec3 coefficients of the fitted color map, i.e. the size of the shader."""
+        return self._coefficientCount
+
+    @property
+    def maxDeltaE(self: Self) -> float:
+        return self._maxDeltaE
+
+    @property
+    def meanDeltaE(self: Self) -> float:
+        return self._meanDeltaE
+
+    @property
+    def wallTime(self: Self) -> float:
+        """Seconds spent fitting and measuring in the worker."""
+        return self._wallTime
+
+    def __str__(self: Self) -> str:
+        return f'{self._model.name} {self._degree}: {self._coefficientCount} coefficients, max dE {self._maxDeltaE:.2f}, mean dE {self._meanDeltaE:.2f}, {self._wallTime * 1e3:.1f} ms'
+
+
 class ColorGradient:
+    # Array evaluation of the fitted color map for each model, see OptimizationModel.
+    ArrayModels: dict[FitModel, Callable[[ndarray, ndarray], ndarray]] = {
+        FitModel.HornerPolynomial: OptimizationModel.PolynomialArray,
+        FitModel.Fourier: OptimizationModel.FourierArray,
+        FitModel.Exponential: OptimizationModel.ExponentialArray,
+        FitModel.ChebyshevT: OptimizationModel.ChebyshevTArray,
+        FitModel.ChebyshevU: OptimizationModel.ChebyshevUArray,
+    }
+
+    # Methods of scipy's least squares for the gradient based algorithms.
+    LeastSquaresMethods: dict[FitAlgorithm, str] = {
+        FitAlgorithm.LM: 'lm',
+        FitAlgorithm.TRF: 'trf',
+        FitAlgorithm.DogBox: 'dogbox',
+    }
+
+    # Jacobians of the models for the gradient based algorithms, see OptimizationModel.
+    Jacobians: dict[FitModel, Callable[[ndarray, ndarray], ndarray]] = {
+        FitModel.HornerPolynomial: OptimizationModel.PolynomialJacobian,
+        FitModel.Fourier: OptimizationModel.FourierJacobian,
+        FitModel.Exponential: OptimizationModel.ExponentialJacobian,
+        FitModel.ChebyshevT: OptimizationModel.ChebyshevTJacobian,
+        FitModel.ChebyshevU: OptimizationModel.ChebyshevUJacobian,
+    }
+
+    # Whether the gradient based algorithms use the Jacobians or estimate them by finite differences.
+    AnalyticalJacobians: bool = True
+
+    # Initial CMA-ES step size when starting from the previous fit.
+    WarmStartSigma: float = .05
+
+    # Multi-start Fourier fits: seed and phase deviation of the jittered starts, and the relative
+    # excess over the best loss up to which a start counts as converged to the best.
+    MultiStartSeed: int = 210
+    MultiStartPhaseJitter: float = .1
+    MultiStartTolerance: float = 1e-3
+
+    InitialGuesses: dict[FitModel, Callable[[int], list[list[float]]]] = {
+        FitModel.HornerPolynomial: OptimizationModel.PolynomialInitialGuess,
+        FitModel.Fourier: OptimizationModel.FourierInitialGuess,
+        FitModel.Exponential: OptimizationModel.ExponentialInitialGuess,
+        FitModel.ChebyshevT: OptimizationModel.ChebyshevTInitialGuess,
+        FitModel.ChebyshevU: OptimizationModel.ChebyshevUInitialGuess,
+    }
+
+    # Bases of the models that are linear in their coefficients. These are fitted in closed form,
+    # all channels at once, instead of by iterative optimization.
+    LinearBases: dict[FitModel, Callable[[ndarray, int], ndarray]] = {
+        FitModel.HornerPolynomial: OptimizationModel.PolynomialBasis,
+        FitModel.Exponential: OptimizationModel.ExponentialBasis,
+        FitModel.ChebyshevT: OptimizationModel.ChebyshevTBasis,
+        FitModel.ChebyshevU: OptimizationModel.ChebyshevUBasis,
+    }
+
+    # Samples of the gradient the error of a fit is measured on.
+    DeltaESampleCount: int = 1024
+
     def __init__(
         self: Self,
         name: str,
@@ -88,6 +295,8 @@ class ColorGradient:
         fitAlgorithm: FitAlgorithm = FitAlgorithm.LM,
         maxFitIterationCount: int = 5000,
         fitAmount: int = 256,
+        fitLoss: FitLoss = FitLoss.Linear,
+        fitStartCount: int = 1,
     ) -> None:
         self._name: str = name
         self._degree: int = degree
@@ -98,28 +307,386 @@ class ColorGradient:
         self._illuminant: Illuminant = illuminant
         self._model: FitModel = model
         self._wraparound: Wraparound = wraparound
-        self._weights: list[float] = [0.] * self.colorCount
-        self._coefficients: list[vec3] = [vec3(0)] * self.colorCount
+        # Weights and fit are computed on first access and reset by the setters below.
+        self._weights: Optional[list[float]] = None
+        self._coefficients: Optional[list[vec3]] = None
+        self._coefficientMatrix: Optional[ndarray] = None
         self._fitAlgorithm: FitAlgorithm = fitAlgorithm
         self._maxFitIterationCount: int = maxFitIterationCount
         self._fitAmount: int = fitAmount
-        self._update()
+        self._fitLoss: FitLoss = fitLoss
+        # Starts of the Fourier fits, see _fourierStarts.
+        self._fitStartCount: int = fitStartCount
+        self._fitReport: Optional[FitReport] = None
+        # Free parameters of the last fit, before the periodicity terms are appended, for warm starts.
+        self._fitParameters: Optional[ndarray] = None
+        self._fitParametersModel: Optional[FitModel] = None
+        # After edits, the previous coefficients stay for display until the refit; if a background
+        # fit was scheduled for it, see deferFit, accessing them does not refit in between.
+        self._fitStale: bool = False
+        self._fitDeferred: bool = False
+        # Stops converted to the mix color space and the conversion back, built on first use.
+        self._mixStops: Optional[list[vec3]] = None
+        self._mixStopArray: Optional[ndarray] = None
+        self._fromMixColorSpace: Optional[ColorSpaceConversion] = None
+        # Rebuilt whenever the coefficient matrix changes.
+        self._inverseColorMap: Optional[InverseColorMap] = None
 
     @property
     def colorCount(self: Self) -> int:
         return len(self._colors)
 
+    @property
+    def colors(self: Self) -> list[vec3]:
+        return list(self._colors)
+
+    @colors.setter
+    def colors(self: Self, colors: list[vec3]) -> None:
+        self._colors = deepcopy(list(colors))
+        self._invalidateMixStops()
+        self._invalidateFit()
+
+    def setColor(self: Self, index: int, color: vec3) -> None:
+        self._colors[index] = vec3(color)
+        self._invalidateMixStops()
+        self._invalidateFit()
+
+    @property
+    def degree(self: Self) -> int:
+        return self._degree
+
+    @degree.setter
+    def degree(self: Self, degree: int) -> None:
+        self._degree = degree
+        self._invalidateFit()
+
+    @property
+    def weightColorSpace(self: Self) -> ColorSpaceType:
+        return self._weightColorSpace
+
+    @weightColorSpace.setter
+    def weightColorSpace(self: Self, weightColorSpace: ColorSpaceType) -> None:
+        self._weightColorSpace = weightColorSpace
+        self._invalidateFit()
+
+    @property
+    def mixColorSpace(self: Self) -> ColorSpaceType:
+        return self._mixColorSpace
+
+    @mixColorSpace.setter
+    def mixColorSpace(self: Self, mixColorSpace: ColorSpaceType) -> None:
+        self._mixColorSpace = mixColorSpace
+        self._invalidateMixStops()
+        self._invalidateFit()
+
+    @property
+    def observer(self: Self) -> Observer:
+        return self._observer
+
+    @observer.setter
+    def observer(self: Self, observer: Observer) -> None:
+        self._observer = observer
+        self._invalidateMixStops()
+        self._invalidateFit()
+
+    @property
+    def illuminant(self: Self) -> Illuminant:
+        return self._illuminant
+
+    @illuminant.setter
+    def illuminant(self: Self, illuminant: Illuminant) -> None:
+        self._illuminant = illuminant
+        self._invalidateMixStops()
+        self._invalidateFit()
+
+    @property
+    def mixStops(self: Self) -> list[vec3]:
+        """The colors converted to the mix color space."""
+        if self._mixStops is None:
+            self._mixStops = list(map(
+                ColorSpace.compile(
+                    ColorSpaceType.SRGB,
+                    self._mixColorSpace,
+                    self._observer,
+                    self._illuminant,
+                ),
+                self._colors,
+            ))
+        return self._mixStops
+
+    @property
+    def mixStopArray(self: Self) -> ndarray:
+        """The colors converted to the mix color space as array of shape (colorCount, 3)."""
+        if self._mixStopArray is None:
+            self._mixStopArray = ColorSpace.convertArray(
+                array(self._colors, dtype=float64),
+                ColorSpaceType.SRGB,
+                self._mixColorSpace,
+                self._observer,
+                self._illuminant,
+            )
+        return self._mixStopArray
+
+    @property
+    def fromMixColorSpace(self: Self) -> ColorSpaceConversion:
+        if self._fromMixColorSpace is None:
+            self._fromMixColorSpace = ColorSpace.compile(
+                self._mixColorSpace,
+                ColorSpaceType.SRGB,
+                self._observer,
+                self._illuminant,
+            )
+        return self._fromMixColorSpace
+
+    def _invalidateMixStops(self: Self) -> None:
+        self._mixStops = None
+        self._mixStopArray = None
+        self._fromMixColorSpace = None
+
+    @property
+    def model(self: Self) -> FitModel:
+        return self._model
+
+    @model.setter
+    def model(self: Self, model: FitModel) -> None:
+        self._model = model
+        self._invalidateFit()
+
+    @property
+    def wraparound(self: Self) -> Wraparound:
+        return self._wraparound
+
+    @wraparound.setter
+    def wraparound(self: Self, wraparound: Wraparound) -> None:
+        self._wraparound = wraparound
+        self._invalidateFit()
+
+    @property
+    def fitAlgorithm(self: Self) -> FitAlgorithm:
+        return self._fitAlgorithm
+
+    @fitAlgorithm.setter
+    def fitAlgorithm(self: Self, fitAlgorithm: FitAlgorithm) -> None:
+        self._fitAlgorithm = fitAlgorithm
+        self._invalidateFit()
+
+    @property
+    def maxFitIterationCount(self: Self) -> int:
+        """Budget of the iterative fits in objective evaluations per channel, for all algorithms;
+        IRLS evaluates the residuals once per reweighting iteration. Multi-start fits split the
+        budget evenly between their starts, so more starts do not make a fit take longer."""
+        return self._maxFitIterationCount
+
+    @maxFitIterationCount.setter
+    def maxFitIterationCount(self: Self, maxFitIterationCount: int) -> None:
+        self._maxFitIterationCount = maxFitIterationCount
+        self._invalidateFit()
+
+    @property
+    def fitAmount(self: Self) -> int:
+        """Samples the fits take from the gradient; at least one per parameter, see _sampleCount."""
+        return self._fitAmount
+
+    @fitAmount.setter
+    def fitAmount(self: Self, fitAmount: int) -> None:
+        self._fitAmount = fitAmount
+        self._invalidateFit()
+
+    @property
+    def fitLoss(self: Self) -> FitLoss:
+        return self._fitLoss
+
+    @fitLoss.setter
+    def fitLoss(self: Self, fitLoss: FitLoss) -> None:
+        self._fitLoss = fitLoss
+        self._invalidateFit()
+
+    @property
+    def fitStartCount(self: Self) -> int:
+        """Starts of Fourier fits, which share maxFitIterationCount; the best one wins."""
+        return self._fitStartCount
+
+    @fitStartCount.setter
+    def fitStartCount(self: Self, fitStartCount: int) -> None:
+        self._fitStartCount = fitStartCount
+        self._invalidateFit()
+
+    def _invalidateFit(self: Self) -> None:
+        """Drop the weights and mark the fit stale; the previous fit stays for display and as warm start."""
+        self._weights = None
+        self._fitStale = True
+
+    def deferFit(self: Self) -> None:
+        """Leave the refit to a background fit, e.g. of the FitScheduler. Until its result is
+        adopted, the coefficients stay those of the previous fit instead of being refitted on
+        access; gradients that were never fitted are still fitted right away."""
+        self._fitDeferred = True
+
+    @property
+    def fitStale(self: Self) -> bool:
+        """Whether the coefficients belong to an earlier state of the gradient."""
+        return self._fitStale
+
     @property
     def weights(self: Self) -> list[float]:
+        if self._weights is None:
+            self._weights = self.determineWeights()
         return self._weights
 
     @property
     def coefficients(self: Self) -> list[vec3]:
+        if self._coefficients is None or self._fitStale and not self._fitDeferred:
+            self._update()
         return self._coefficients
 
+    @property
+    def fitReport(self: Self) -> Optional[FitReport]:
+        """Statistics of the last fit."""
+        return self._fitReport
+
+    @property
+    def coefficientMatrix(self: Self) -> ndarray:
+        """The coefficients as array of shape (coefficientCount, 3)."""
+        if self._coefficientMatrix is None:
+            self._coefficientMatrix = array(self.coefficients, dtype=float64)
+        return self._coefficientMatrix
+
+    @property
+    def fitKey(self: Self) -> str:
+        """Content hash of everything weights and fit depend on, the key into the FitCache."""
+        return FitCache.key(
+            array(self._colors, dtype=float64),
+            self._degree,
+            self._weightColorSpace.name,
+            self._mixColorSpace.name,
+            self._observer.name,
+            self._illuminant.name,
+            self._model.name,
+            self._wraparound.name,
+            self._fitAlgorithm.name,
+            self._maxFitIterationCount,
+            self._fitAmount,
+            self._fitLoss.name,
+            self._fitStartCount,
+        )
+
     def _update(self: Self) -> None:
-        self._weights = self.determineWeights()
-        self._coefficients = self.fit()
+        key: str = self.fitKey
+        entry: Optional[dict[str, ndarray]] = FitCache.get(key)
+        if entry is None:
+            self._weights = self.determineWeights()
+            self._coefficients = self.fit()
+            self._coefficientMatrix = None
+            # Warm starts depend on the previous fit, which the key does not cover.
+            if not self._fitReport.warmStart:
+                FitCache.put(key, self._fitEntry())
+            self._fitStale = self._fitDeferred = False
+        else:
+            self._adoptFitEntry(entry, cached=True)
+
+    def _fitEntry(self: Self) -> dict[str, ndarray]:
+        """Weights and fit as FitCache entry."""
+        return {
+            'weights': array(self._weights, dtype=float64),
+            'coefficients': array(self._coefficients, dtype=float64),
+            'parameters': self._fitParameters,
+            'algorithm': array(self._fitReport.algorithm),
+            'counts': array([self._fitReport.iterationCount, self._fitReport.evaluationCount]),
+            'measures': array([self._fitReport.wallTime, self._fitReport.residual]),
+            'warm_start': array(self._fitReport.warmStart),
+            'starts': array([self._fitReport.startCount, self._fitReport.bestStartCount]),
+        }
+
+    def _adoptFitEntry(self: Self, entry: dict[str, ndarray], cached: bool) -> None:
+        self._weights = list(map(float, entry['weights']))
+        self._coefficients = list(map(lambda row: vec3(*row), entry['coefficients']))
+        self._coefficientMatrix = None
+        self._fitParameters = entry['parameters'].copy()
+        self._fitParametersModel = self._model
+        self._fitStale = self._fitDeferred = False
+        self._fitReport = FitReport(
+            str(entry['algorithm']),
+            *map(int, entry['counts']),
+            *map(float, entry['measures']),
+            bool(entry['warm_start']),
+            cached,
+            *map(int, entry['starts']),
+        )
+
+    def adoptFit(self: Self, other: 'ColorGradient') -> None:
+        """Take over weights, coefficients and fit state of a gradient fitted elsewhere, e.g. of a
+        snapshot fitted in a worker thread."""
+        self._weights = other._weights
+        self._coefficients = other._coefficients
+        self._coefficientMatrix = None
+        self._fitReport = other._fitReport
+        self._fitParameters = other._fitParameters
+        self._fitParametersModel = other._fitParametersModel
+        self._fitStale = other._fitStale
+        self._fitDeferred = False
+
+    def deltaE(self: Self, amount: Optional[int] = None) -> ndarray:
+        """CIE76 color differences between the fitted color map and the gradient at amount
+        equidistant samples; differences of about 2.3 are just noticeable."""
+        t: ndarray = linspace(0., 1., ColorGradient.DeltaESampleCount if amount is None else amount)
+        toCIELAB: ColorSpaceConversion = ColorSpace.compile(
+            ColorSpaceType.SRGB,
+            ColorSpaceType.CIELAB,
+            self._observer,
+            self._illuminant,
+        )
+        difference: ndarray = toCIELAB.convertArray(self.evaluateFitMany(t)) - toCIELAB.convertArray(self.evaluateMany(t))
+        return sqrt((difference ** 2).sum(axis=-1))
+
+    @staticmethod
+    def _autoFitCandidate(info: dict, model: FitModel, degree: int) -> AutoFitCandidate:
+        """Fit one configuration of autoFit; runs in a worker process."""
+        start: float = perf_counter()
+        gradient: ColorGradient = ColorGradient.fromDict(info)
+        gradient.model = model
+        gradient.degree = degree
+        deltaE: ndarray = gradient.deltaE()
+        return AutoFitCandidate(
+            model,
+            degree,
+            len(gradient.coefficients),
+            float(deltaE.max()),
+            float(deltaE.mean()),
+            perf_counter() - start,
+            gradient._fitEntry(),
+        )
+
+    def autoFit(
+        self: Self,
+        maxDeltaE: float,
+        models: Iterable[FitModel] = tuple(FitModel),
+        degrees: Iterable[int] = range(4, 17),
+        workerCount: Optional[int] = None,
+    ) -> tuple[Optional[AutoFitCandidate], list[AutoFitCandidate]]:
+        """Fit all combinations of models and degrees in a process pool and switch to the
+        cheapest one whose maximum deltaE stays within maxDeltaE.
+
+        Cheapest means fewest coefficients, so the smallest and fastest shader; ties go to the
+        smaller error. Returns the chosen candidate, or None if no candidate meets the budget
+        and the gradient stays as it is, and the table of all candidates ordered by cost.
+        """
+        info: dict = self.toDict()
+        configurations: list[tuple[FitModel, int]] = [(model, degree) for model in models for degree in degrees]
+        with ColorGradient._processPool(workerCount) as executor:
+            candidates: list[AutoFitCandidate] = list(executor.map(
+                ColorGradient._autoFitCandidate,
+                repeat(info),
+                *zip(*configurations),
+            ))
+        candidates.sort(key=lambda candidate: (candidate.coefficientCount, candidate.maxDeltaE))
+
+        chosen: Optional[AutoFitCandidate] = next(filter(lambda candidate: candidate.maxDeltaE <= maxDeltaE, candidates), None)
+        if chosen is not None:
+            self.model = chosen.model
+            self.degree = chosen.degree
+            self._adoptFitEntry(chosen._entry, cached=False)
+            FitCache.put(self.fitKey, chosen._entry)
+        return chosen, candidates
 
     def toDict(self: Self) -> dict:
         return {
@@ -138,6 +705,8 @@ class ColorGradient:
             'algorithm': self._fitAlgorithm.name,
             'max_fit_iteration_count': self._maxFitIterationCount,
             'fit_amount': self._fitAmount,
+            'fit_loss': self._fitLoss.name,
+            'fit_start_count': self._fitStartCount,
         }
     
     @classmethod
@@ -158,6 +727,8 @@ class ColorGradient:
             fitAlgorithm = FitAlgorithm[info['algorithm']],
             maxFitIterationCount = int(info['max_fit_iteration_count']),
             fitAmount = int(info['fit_amount']),
+            fitLoss = FitLoss[info.get('fit_loss', FitLoss.Linear.name)],
+            fitStartCount = int(info.get('fit_start_count', 1)),
         )
 
     def determineWeights(
@@ -166,22 +737,16 @@ class ColorGradient:
         weights: List[float] = [0.0] * len(self._colors)
         colorspaceDistances: List[float] = [0.0] * len(self._colors)
         totalColorspaceDistance: float = 0.0
-        colorCount: int = self.colorCount if self._wraparound == Wraparound.Wrap else (self._colorCount - 1)
+        colorCount: int = self.colorCount if self._wraparound == Wraparound.Wrap else (self.colorCount - 1)
+        toWeightColorSpace: ColorSpaceConversion = ColorSpace.compile(
+            ColorSpaceType.SRGB,
+            self._weightColorSpace,
+            self._observer,
+            self._illuminant,
+        )
         for colorIndex in range(colorCount):
-            c1 = ColorSpace.convert(
-                self._colors[colorIndex],
-                ColorSpaceType.SRGB,
-                self._weightColorSpace,
-                observer=self._observer,
-                illuminant=self._illuminant,
-            )
-            c2 = ColorSpace.convert(
-                self._colors[(colorIndex + 1) % len(self._colors)],
-                ColorSpaceType.SRGB,
-                self._weightColorSpace,
-                observer=self._observer,
-                illuminant=self._illuminant,
-            )
+            c1 = toWeightColorSpace(self._colors[colorIndex])
+            c2 = toWeightColorSpace(self._colors[(colorIndex + 1) % len(self._colors)])
 
             colorspaceDistance = length(c1 - c2)
             colorspaceDistances[colorIndex] = colorspaceDistance
@@ -199,23 +764,13 @@ class ColorGradient:
         self: Self,
         amount: float,
     ) -> vec3:
+        mixStops: list[vec3] = self.mixStops
+        fromMixColorSpace: ColorSpaceConversion = self.fromMixColorSpace
         amount = fract(amount)
         for colorIndex in range(self.colorCount):
             if amount < self.weights[(colorIndex + 1) % self.colorCount]:
-                c1 = ColorSpace.convert(
-                    self._colors[colorIndex % self.colorCount],
-                    ColorSpaceType.SRGB,
-                    self._mixColorSpace,
-                    observer=self._observer,
-                    illuminant=self._illuminant,
-                )
-                c2 = ColorSpace.convert(
-                    self._colors[(colorIndex + 1) % self.colorCount],
-                    ColorSpaceType.SRGB,
-                    self._mixColorSpace,
-                    observer=self._observer,
-                    illuminant=self._illuminant,
-                )
+                c1 = mixStops[colorIndex % self.colorCount]
+                c2 = mixStops[(colorIndex + 1) % self.colorCount]
 
                 lowerWeight: float = self.weights[colorIndex]
                 upperWeight: float = self.weights[(colorIndex + 1) % len(self._colors)]
@@ -223,131 +778,348 @@ class ColorGradient:
                 
                 result: vec3 = mix(c1, c2, localAmount)
 
-                return ColorSpace.convert(
-                    result,
-                    self._mixColorSpace,
-                    ColorSpaceType.SRGB,
-                    observer=self._observer,
-                    illuminant=self._illuminant,
-                )
+                return fromMixColorSpace(result)
         
-        c1 = ColorSpace.convert(
-            self._colors[-1],
-            ColorSpaceType.SRGB,
-            self._mixColorSpace,
-            observer=self._observer,
-            illuminant=self._illuminant,
-        )
-        c2 = ColorSpace.convert(
-            self._colors[0],
-            ColorSpaceType.SRGB,
-            self._mixColorSpace,
-            observer=self._observer,
-            illuminant=self._illuminant,
-        )
+        c1 = mixStops[-1]
+        c2 = mixStops[0]
 
         lowerWeight: float = self.weights[-1]
         localAmount: float = (amount - lowerWeight) / abs(1. - lowerWeight)
         
         result = mix(c1, c2, localAmount)
-        return ColorSpace.convert(
-            result,
-            self._mixColorSpace,
-            ColorSpaceType.SRGB,
-            observer=self._observer,
-            illuminant=self._illuminant,
-        )
+        return fromMixColorSpace(result)
+
+    def evaluateMany(
+        self: Self,
+        amounts: ArrayLike,
+    ) -> ndarray:
+        """Array version of evaluate; returns sRGB colors of shape amounts.shape + (3,).
+
+        Amounts past the last weight mix the last into the first color, like evaluate does for
+        both Wraparound modes.
+        """
+        amounts = asarray(amounts, dtype=float64)
+        amounts = amounts - floor(amounts)
+        weights: ndarray = array(self.weights, dtype=float64)
+        upperWeights: ndarray = append(weights[1:], 1.)
+        mixStops: ndarray = self.mixStopArray
+
+        lowerIndices: ndarray = searchsorted(weights, amounts, side='right') - 1
+        upperIndices: ndarray = (lowerIndices + 1) % self.colorCount
+        lowerWeights: ndarray = weights[lowerIndices]
+        localAmounts: ndarray = ((amounts - lowerWeights) / abs(upperWeights[lowerIndices] - lowerWeights))[..., None]
+
+        result: ndarray = mixStops[lowerIndices] * (1. - localAmounts) + mixStops[upperIndices] * localAmounts
+        return self.fromMixColorSpace.convertArray(result)
     
+    @property
+    def inverseColorMap(self: Self) -> InverseColorMap:
+        """Index of the fitted color map for looking up the amounts of colors, built on first use."""
+        # Fits first, if needed, which determines the model of the coefficients.
+        coefficients: ndarray = self.coefficientMatrix
+        if self._inverseColorMap is None or self._inverseColorMap.coefficients is not coefficients:
+            self._inverseColorMap = InverseColorMap(
+                ColorGradient.ArrayModels[self._fitParametersModel],
+                coefficients,
+                self._observer,
+                self._illuminant,
+            )
+        return self._inverseColorMap
+
     def nearestWeightInColorMap(
         self: Self,
         c0: vec3,
     ) -> float:
-        costFunction: partial = partial(ColorGradient.colorMapDistance, colorMap=self._coefficients, c0=c0)
-        return minimize(costFunction, .5, method='Nelder-Mead').x[0]
+        """Amount at which the fitted color map comes closest to c0."""
+        amounts, _ = self.inverseColorMap.query(array(c0, dtype=float64))
+        return float(amounts)
 
-    @staticmethod
-    def colorMapDistance(t: float, colorMap: List[vec3], c0: vec3) -> float:
-        red = [color.r for color in colorMap]
-        green = [color.g for color in colorMap]
-        blue = [color.b for color in colorMap]
-        t = fract(t)
-        return length(vec3(
-            ColorGradient.polynomial(t, *red),
-            ColorGradient.polynomial(t, *green),
-            ColorGradient.polynomial(t, *blue),
-        ) - c0)
+    def _initialParameters(self: Self, initialGuess: list[list[float]]) -> tuple[ndarray, bool]:
+        """Start of the iterative fits, shape (parameterCount, 3), and whether it is a warm start.
+
+        After small edits the previous fit is much closer to the optimum than the model's initial
+        guess, so it is reused as long as the model is the same. If the degree grew, the new
+        higher order parameters start at zero; if it shrank, the fit starts cold.
+        """
+        guess: ndarray = array(initialGuess, dtype=float64).T
+        previous: Optional[ndarray] = self._fitParameters
+        if previous is None or self._fitParametersModel != self._model or len(previous) > len(guess) or not isfinite(previous).all():
+            return guess, False
+        guess[:len(previous)] = previous
+        guess[len(previous):] = 0.
+        return guess, True
 
     def fit(
         self: Self,
-        amount: int = 256,
+        amount: Optional[int] = None,
     ) -> List[vec3]:
-        t = linspace(0., 1., amount)
-        sampledColors: List[vec3] = list(map(
-            lambda _amount: self.evaluate(_amount),
-            t,
-        ))
+        """Fit the model to fitAmount samples of the gradient; the statistics end up in fitReport."""
+        start: float = perf_counter()
+        initialGuess: list[list[float]] = ColorGradient.InitialGuesses[self._model](self._degree)
+        parameterCount: int = len(initialGuess[0])
+        initialParameters, warmStart = self._initialParameters(initialGuess)
 
-        initialGuess: list[list[float]]
-        model: Callable
-        if self._model == FitModel.HornerPolynomial:
-            model = OptimizationModel.Polynomial
-            initialGuess = OptimizationModel.PolynomialInitialGuess(self._degree)
-        elif self._model == FitModel.Fourier:
-            model = OptimizationModel.Fourier
-            initialGuess = OptimizationModel.FourierInitialGuess(self._degree)
-        elif self._model == FitModel.Exponential:
-            model = OptimizationModel.Exponential
-            initialGuess = OptimizationModel.ExponentialInitialGuess(self._degree)
-        elif self._model == FitModel.ChebyshevT:
-            model = OptimizationModel.ChebyshevT
-            initialGuess = OptimizationModel.ChebyshevTInitialGuess(self._degree)
-        elif self._model == FitModel.ChebyshevU:
-            model = OptimizationModel.ChebyshevU
-            initialGuess = OptimizationModel.ChebyshevUInitialGuess(self._degree)
-
-        # Fit red
-        r = array(list(map(
-            lambda color: color.x,
-            sampledColors,
-        )))
-        rp, _ = curve_fit(model, t, r, initialGuess[0], method='trf', loss='arctan', maxfev=5000)
-
-        # Fit green
-        g = array(list(map(
-            lambda color: color.y,
-            sampledColors,
-        )))
-        gp, _ = curve_fit(model, t, g, initialGuess[1], method='trf', loss='arctan', maxfev=5000)
-
-        # Fit red
-        b = array(list(map(
-            lambda color: color.z,
-            sampledColors,
-        )))
-        bp, _ = curve_fit(model, t, b, initialGuess[2], method='trf', loss='arctan', maxfev=5000)
-
-        result: List[vec3] = []
-        for parameterIndex in range(len(bp)):
-            result.append(vec3(
-                rp[parameterIndex],
-                gp[parameterIndex],
-                bp[parameterIndex],
+        t: ndarray = linspace(0., 1., ColorGradient._sampleCount(self._fitAmount if amount is None else amount, parameterCount))
+        sampledColors: ndarray = self.evaluateMany(t)
+
+        model, design = ColorGradient._sampledModel(self._model, t, parameterCount)
+
+        parameters: ndarray
+        algorithm: str
+        iterationCount: int = 0
+        evaluationCount: int = 0
+        startCount: int = 1
+        bestStartCount: int = 1
+        if design is not None and self._fitLoss == FitLoss.Linear:
+            # The linear loss has a closed form solution, which every algorithm would converge to.
+            algorithm = 'LinearLeastSquares'
+            warmStart = False
+            parameters = OptimizationAlgorithm.LinearLeastSquares(design, sampledColors)
+            iterationCount, evaluationCount = 1, 1
+        elif design is not None and self._fitAlgorithm == FitAlgorithm.LM:
+            # LM has no robust losses; reweighting the linear problem is its robust counterpart.
+            algorithm = 'IterativelyReweightedLeastSquares'
+            # Starts from the exact linear fit, which is closer than any previous fit.
+            warmStart = False
+            parameters, iterationCount = OptimizationAlgorithm.IterativelyReweightedLeastSquares(
+                design,
+                sampledColors,
+                maxIterationCount=self._maxFitIterationCount,
+            )
+            evaluationCount = iterationCount + 1
+        else:
+            # LM only minimizes the linear loss; TRF takes over for the robust ones.
+            fitAlgorithm: FitAlgorithm = FitAlgorithm.TRF \
+                if self._fitAlgorithm == FitAlgorithm.LM and self._fitLoss != FitLoss.Linear else self._fitAlgorithm
+            algorithm = fitAlgorithm.name
+            # Starts with the initial CMA-ES step size for each.
+            starts: list[tuple[ndarray, float]] = [
+                # A warm start is close already; searching the whole initial range again wastes generations.
+                (initialParameters, ColorGradient.WarmStartSigma if warmStart else 1.),
+            ]
+            if self._model == FitModel.Fourier and self._fitStartCount > 1:
+                starts = self._fourierStarts(sampledColors, starts[0])
+            fitStart: partial = partial(
+                ColorGradient._fitIteratively,
+                self._model,
+                fitAlgorithm,
+                self._fitLoss,
+                max(1, self._maxFitIterationCount // len(starts)),
+                t,
+                sampledColors,
+            )
+            # One after the other: fits run in parallel one level up already, in the FitScheduler's
+            # threads and the process pools of fitMany and autoFit, and a pool per fit costs more
+            # to start than all starts take.
+            results: list[tuple[ndarray, int, int, float]] = list(map(fitStart, *zip(*starts)))
+
+            # The first of the best, so the choice does not depend on the scheduling.
+            best: int = min(range(len(results)), key=lambda index: (results[index][3], index))
+            parameters = results[best][0]
+            iterationCount = sum(map(lambda result: result[1], results))
+            evaluationCount = sum(map(lambda result: result[2], results))
+            startCount = len(results)
+            bestStartCount = sum(map(
+                lambda result: result[3] <= results[best][3] * (1. + ColorGradient.MultiStartTolerance) + 1e-12,
+                results,
             ))
+
+        residual: float = float(sqrt(((model(parameters) - sampledColors) ** 2).mean()))
+        self._fitReport = FitReport(
+            algorithm,
+            iterationCount,
+            evaluationCount,
+            perf_counter() - start,
+            residual,
+            warmStart,
+            startCount=startCount,
+            bestStartCount=bestStartCount,
+        )
+        return self._fittedCoefficients(parameters)
+
+    @staticmethod
+    def _sampleCount(amount: int, parameterCount: int) -> int:
+        """Samples a fit of parameterCount parameters takes for amount requested ones; with fewer
+        samples than parameters, the problem is underdetermined and LM refuses it."""
+        return max(amount, parameterCount)
+
+    @staticmethod
+    def _sampledModel(fitModel: FitModel, t: ndarray, parameterCount: int) -> tuple[Callable[[ndarray], ndarray], Optional[ndarray]]:
+        """Map of parameter matrices of shape (parameterCount, k) to model values of shape
+        (amount, k) at the amounts t, and the design matrix if the model is linear."""
+        if fitModel in ColorGradient.LinearBases:
+            design: ndarray = ColorGradient.LinearBases[fitModel](t, parameterCount)
+            return design.__matmul__, design
+        return partial(ColorGradient.ArrayModels[fitModel], t), None
+
+    @staticmethod
+    def _fitIteratively(
+        fitModel: FitModel,
+        fitAlgorithm: FitAlgorithm,
+        fitLoss: FitLoss,
+        maxEvaluationCount: int,
+        t: ndarray,
+        sampledColors: ndarray,
+        initialParameters: ndarray,
+        sigma: float,
+    ) -> tuple[ndarray, int, int, float]:
+        """Fit all channels from initialParameters of shape (parameterCount, 3) with CMA-ES or
+        least squares, with at most maxEvaluationCount objective evaluations per channel; sigma
+        is the initial CMA-ES step size.
+
+        Returns the parameters, the iterations and evaluations summed over the channels and the
+        value of the loss.
+        """
+        model, design = ColorGradient._sampledModel(fitModel, t, len(initialParameters))
+        loss: str = fitLoss.name.lower()
+        rho: Callable[[ndarray], ndarray] = OptimizationAlgorithm.Losses[loss]
+        jacobian: Optional[Callable[[ndarray], ndarray]] = None
+        if ColorGradient.AnalyticalJacobians:
+            # The Jacobian of a linear model is its design matrix.
+            jacobian = (lambda x: design) if design is not None else partial(ColorGradient.Jacobians[fitModel], t)
+
+        parameters: ndarray = empty(initialParameters.shape)
+        iterationCount: int = 0
+        evaluationCount: int = 0
+        for channel in range(3):
+            samples: ndarray = sampledColors[:, channel]
+            channelParameters: ndarray
+            channelIterationCount: int
+            channelEvaluationCount: int
+            if fitAlgorithm == FitAlgorithm.CMAES:
+                channelParameters, channelIterationCount, channelEvaluationCount = OptimizationAlgorithm.CMAES(
+                    lambda population: rho((model(population.T) - samples[:, None]) ** 2).sum(axis=0),
+                    initialParameters[:, channel],
+                    maxEvaluationCount,
+                    sigma,
+                )
+            else:
+                channelParameters, channelIterationCount, channelEvaluationCount = OptimizationAlgorithm.LeastSquares(
+                    lambda x: model(x[:, None])[:, 0] - samples,
+                    initialParameters[:, channel],
+                    ColorGradient.LeastSquaresMethods[fitAlgorithm],
+                    loss,
+                    maxEvaluationCount,
+                    jacobian,
+                )
+            parameters[:, channel] = channelParameters
+            iterationCount += channelIterationCount
+            evaluationCount += channelEvaluationCount
+        return parameters, iterationCount, evaluationCount, float(rho((model(parameters) - sampledColors) ** 2).sum())
+
+    def _fourierStarts(self: Self, sampledColors: ndarray, initialStart: tuple[ndarray, float]) -> list[tuple[ndarray, float]]:
+        """fitStartCount starts for the Fourier model: the spectrum of the samples, the usual
+        initial or warm start and seeded jitters of the spectrum."""
+        # The samples include both ends of the period; the spectrum wants one period.
+        spectral: ndarray = OptimizationModel.FourierSpectralGuess(sampledColors[:-1], self._degree)
+        starts: list[tuple[ndarray, float]] = [(spectral, ColorGradient.WarmStartSigma), initialStart]
+        generator = default_rng(ColorGradient.MultiStartSeed)
+        while len(starts) < self._fitStartCount:
+            jittered: ndarray = spectral.copy()
+            jittered[0::2] *= generator.uniform(.5, 1.5, jittered[0::2].shape)
+            jittered[1::2] += generator.normal(0., ColorGradient.MultiStartPhaseJitter, jittered[1::2].shape)
+            starts.append((jittered, 1.))
+        return starts[:self._fitStartCount]
+
+    def _fittedCoefficients(self: Self, parameters: ndarray) -> List[vec3]:
+        """Keep the fitted parameters for warm starts and expand them to the coefficients of the color map."""
+        self._fitParameters = parameters
+        self._fitParametersModel = self._model
         if self._model == FitModel.HornerPolynomial:
-            o = len(bp) + 1
-            result.append(vec3(
-                1. / (o - 2) * (rp[o - 2] - sum(map(lambda i: i * rp[i] - rp[i - 1], range(2, o - 1)))),
-                1. / (o - 2) * (gp[o - 2] - sum(map(lambda i: i * gp[i] - gp[i - 1], range(2, o - 1)))),
-                1. / (o - 2) * (bp[o - 2] - sum(map(lambda i: i * bp[i] - bp[i - 1], range(2, o - 1)))),
-            ))
-            result.append(vec3(
-                (1 - o) / (o - 2) * (rp[o - 2] - sum(map(lambda i: i * rp[i] - rp[i - 1], range(2, o - 1)))) - sum(map(lambda i: i * rp[i], range(2, o - 1))),
-                (1 - o) / (o - 2) * (gp[o - 2] - sum(map(lambda i: i * gp[i] - gp[i - 1], range(2, o - 1)))) - sum(map(lambda i: i * gp[i], range(2, o - 1))),
-                (1 - o) / (o - 2) * (bp[o - 2] - sum(map(lambda i: i * bp[i] - bp[i - 1], range(2, o - 1)))) - sum(map(lambda i: i * bp[i], range(2, o - 1))),
-            ))
-        print(result)
-        return result
-    
+            # Append the periodicity coefficients.
+            parameters = OptimizationModel.PolynomialConstraintMatrix(len(parameters)) @ parameters
+        elif self._model == FitModel.Fourier:
+            # Phases are periodic, but the fits let them drift; far from [0, 1), the single
+            # precision of the coefficients would lose them.
+            parameters = parameters.copy()
+            parameters[1::2] -= floor(parameters[1::2])
+            self._fitParameters = parameters
+        return list(map(lambda row: vec3(*row), parameters))
+
+    @staticmethod
+    def fitMany(
+        gradients: Iterable[ColorGradient],
+        workerCount: Optional[int] = None,
+    ) -> None:
+        """Fit all gradients that have no or stale coefficients, e.g. before exporting them.
+
+        Fits in the FitCache are taken from there, equal gradients are fitted once. Closed form
+        fits of the same model, degree and sample count share the design matrix; all their
+        channels are solved as one least squares problem. The iterative fits are spread over a
+        process pool. This takes time in the number of distinct configurations rather than in
+        the number of gradients.
+        """
+        pending: dict[str, list[ColorGradient]] = {}
+        for gradient in gradients:
+            if gradient._coefficients is not None and not gradient._fitStale:
+                continue
+            key: str = gradient.fitKey
+            if key not in pending:
+                entry: Optional[dict[str, ndarray]] = FitCache.get(key)
+                if entry is not None:
+                    gradient._adoptFitEntry(entry, cached=True)
+                    continue
+                pending[key] = []
+            pending[key].append(gradient)
+
+        batches: dict[tuple[FitModel, int, int], list[str]] = {}
+        iterativeKeys: list[str] = []
+        for key, equalGradients in pending.items():
+            gradient: ColorGradient = equalGradients[0]
+            if gradient._model in ColorGradient.LinearBases and gradient._fitLoss == FitLoss.Linear:
+                batches.setdefault((gradient._model, gradient._degree, gradient._fitAmount), []).append(key)
+            else:
+                iterativeKeys.append(key)
+
+        for (model, degree, amount), keys in batches.items():
+            start: float = perf_counter()
+            parameterCount: int = len(ColorGradient.InitialGuesses[model](degree)[0])
+            t: ndarray = linspace(0., 1., ColorGradient._sampleCount(amount, parameterCount))
+            design: ndarray = ColorGradient.LinearBases[model](t, parameterCount)
+            # Channels of all gradients side by side, shape (amount, 3 * len(keys)).
+            samples: ndarray = hstack(list(map(lambda key: pending[key][0].evaluateMany(t), keys)))
+            parameters: ndarray = OptimizationAlgorithm.LinearLeastSquares(design, samples)
+            residuals: ndarray = design @ parameters - samples
+            wallTime: float = (perf_counter() - start) / len(keys)
+            for index, key in enumerate(keys):
+                channels: slice = slice(3 * index, 3 * index + 3)
+                gradient: ColorGradient = pending[key][0]
+                gradient._fitReport = FitReport('LinearLeastSquares', 1, 1, wallTime, float(sqrt((residuals[:, channels] ** 2).mean())))
+                gradient._coefficients = gradient._fittedCoefficients(parameters[:, channels].copy())
+                gradient._coefficientMatrix = None
+                gradient._fitStale = gradient._fitDeferred = False
+                FitCache.put(key, gradient._fitEntry())
+
+        # Spawning workers costs more than a few fits; only worth it with several cores.
+        if len(iterativeKeys) > 1 and (cpu_count() or 1) > 1 and workerCount != 1:
+            with ColorGradient._processPool(workerCount) as executor:
+                entries: list[dict[str, ndarray]] = list(executor.map(
+                    ColorGradient._fitEntryOf,
+                    map(lambda key: pending[key][0].toDict(), iterativeKeys),
+                ))
+            for key, entry in zip(iterativeKeys, entries):
+                pending[key][0]._adoptFitEntry(entry, cached=False)
+                FitCache.put(key, entry)
+        else:
+            for key in iterativeKeys:
+                pending[key][0]._update()
+
+        for equalGradients in pending.values():
+            for gradient in equalGradients[1:]:
+                gradient.adoptFit(equalGradients[0])
+
+    @staticmethod
+    def _fitEntryOf(info: dict) -> dict[str, ndarray]:
+        """Fit of the gradient described by info as FitCache entry; runs in a worker process."""
+        gradient: ColorGradient = ColorGradient.fromDict(info)
+        gradient._update()
+        return gradient._fitEntry()
+
+    @staticmethod
+    def _processPool(workerCount: Optional[int] = None) -> ProcessPoolExecutor:
+        # Spawned workers do not inherit the threads of Qt and of the FitScheduler.
+        return ProcessPoolExecutor(max_workers=workerCount, mp_context=get_context('spawn'))
+
     def allColorMaps(
         self: Self,
     ) -> List[Tuple[GradientWeight, GradientMix, List[vec3]]]:
@@ -415,44 +1187,20 @@ class ColorGradient:
         ))) + ","
 
     def evaluateFit(self: Self, t: float) -> vec3:
-        model: Callable
-        if self._model == FitModel.HornerPolynomial:
-            model = OptimizationModel.Polynomial
-        elif self._model == FitModel.Fourier:
-            model = OptimizationModel.Fourier
-        elif self._model == FitModel.Exponential:
-            model = OptimizationModel.Exponential
-        elif self._model == FitModel.ChebyshevT:
-            model = OptimizationModel.ChebyshevT
-        elif self._model == FitModel.ChebyshevU:
-            model = OptimizationModel.ChebyshevU
-        
-        return vec3(
-            model(t, *list(map(
-                lambda fitelement: fitelement.x,
-                self._coefficients,
-            ))),
-            model(t, *list(map(
-                lambda fitelement: fitelement.y,
-                self._coefficients,
-            ))),
-            model(t, *list(map(
-                lambda fitelement: fitelement.z,
-                self._coefficients,
-            ))),
-        )
+        return vec3(*self.evaluateFitMany(t))
+
+    def evaluateFitMany(self: Self, t: ArrayLike) -> ndarray:
+        """Fitted color map at all amounts t at once; returns shape t.shape + (3,)."""
+        coefficients: ndarray = self.coefficientMatrix
+        # Stale coefficients may belong to another model.
+        return ColorGradient.ArrayModels[self._fitParametersModel](asarray(t, dtype=float64), coefficients)
 
     def buildCSSGradient(
         self: Self,
         weight: GradientWeight,
         mix: GradientMix,
     ) -> str:
-        amounts: List[float] = list(map(float,range(101)))
-
-        newcolors = list(map(
-            lambda amount: self.evaluateFit(float(amount) / 100.),
-            amounts,
-        ))
+        newcolors: ndarray = self.evaluateFitMany(linspace(0., 1., 101))
 
         return """linear-gradient({colors});""".format(
             colors=', '.join(map(
@@ -470,13 +1218,9 @@ class ColorGradient:
     ) -> QLinearGradient:
         stopIndices: list[int] = list(range(101))
         newColors = list(map(
-            lambda stopIndex: QColor.fromRgbF(
-                *self.evaluateFit(
-                    # This is the amount here.
-                    float(stopIndex) / 100.,
-                ),
-            ),
-            stopIndices,
+            lambda color: QColor.fromRgbF(*color),
+            # The stop index is the amount in percent here.
+            self.evaluateFitMany(linspace(0., 1., 101)),
         ))
 
         gradient: QLinearGradient = QLinearGradient()
@@ -494,10 +1238,7 @@ class ColorGradient:
     ) -> str:
         amounts: List[float] = list(map(float,range(101)))
 
-        newcolors = list(map(
-            lambda amount: self.evaluateFit(float(amount) / 100.),
-            amounts,
-        ))
+        newcolors: ndarray = self.evaluateFitMany(linspace(0., 1., 101))
 
         return """<linearGradient>
     {colors}
@@ -518,35 +1259,54 @@ class ColorGradient:
             result = ck + t * result
         return result
 
-DefaultGradient1 = ColorGradient(
-    "Default Gradient 1",
-    7,
-    ColorSpaceType.OKLAB,
-    ColorSpaceType.OKLAB,
-    [
-        vec3(0.15, 0.18, 0.26),
-        vec3(0.51, 0.56, 0.66),
-        vec3(0.78, 0.67, 0.68),
-        vec3(0.96, 0.75, 0.60),
-        vec3(0.97, 0.81, 0.55),
-        vec3(0.97, 0.61, 0.42),
-        vec3(0.91, 0.42, 0.34),
-        vec3(0.58, 0.23, 0.22),
-    ],
-)
-DefaultGradient2 = ColorGradient(
-    "Default Gradient 2",
-    7,
-    ColorSpaceType.CIELAB,
-    ColorSpaceType.CIELAB,
-    [
-        vec3(0.02, 0.07, 0.16),
-        vec3(0.07, 0.31, 0.41),
-        vec3(0.38, 0.67, 0.69),
-        vec3(0.95, 0.85, 0.76),
-        vec3(0.98, 0.94, 0.83),
-        vec3(0.99, 0.92, 0.51),
-        vec3(0.92, 0.44, 0.40),
-        vec3(0.46, 0.25, 0.33),
-    ],
-)
+def _defaultGradient1() -> ColorGradient:
+    return ColorGradient(
+        "Default Gradient 1",
+        7,
+        ColorSpaceType.OKLAB,
+        ColorSpaceType.OKLAB,
+        [
+            vec3(0.15, 0.18, 0.26),
+            vec3(0.51, 0.56, 0.66),
+            vec3(0.78, 0.67, 0.68),
+            vec3(0.96, 0.75, 0.60),
+            vec3(0.97, 0.81, 0.55),
+            vec3(0.97, 0.61, 0.42),
+            vec3(0.91, 0.42, 0.34),
+            vec3(0.58, 0.23, 0.22),
+        ],
+    )
+
+
+def _defaultGradient2() -> ColorGradient:
+    return ColorGradient(
+        "Default Gradient 2",
+        7,
+        ColorSpaceType.CIELAB,
+        ColorSpaceType.CIELAB,
+        [
+            vec3(0.02, 0.07, 0.16),
+            vec3(0.07, 0.31, 0.41),
+            vec3(0.38, 0.67, 0.69),
+            vec3(0.95, 0.85, 0.76),
+            vec3(0.98, 0.94, 0.83),
+            vec3(0.99, 0.92, 0.51),
+            vec3(0.92, 0.44, 0.40),
+            vec3(0.46, 0.25, 0.33),
+        ],
+    )
+
+
+_DefaultGradients: dict[str, Callable[[], ColorGradient]] = {
+    'DefaultGradient1': _defaultGradient1,
+    'DefaultGradient2': _defaultGradient2,
+}
+
+
+def __getattr__(name: str) -> ColorGradient:
+    """Builds DefaultGradient1 and DefaultGradient2 on first access instead of at import."""
+    if name in _DefaultGradients:
+        gradient: ColorGradient = _DefaultGradients[name]()
+        globals()[name] = gradient
+        return gradient
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
@@ -0,0 +1,446 @@
+from typing import (
+    Self,
+    Optional,
+    Callable,
+)
+from enum import (
+    IntEnum,
+    auto,
+)
+from hashlib import md5
+from pathlib import Path
+from os import replace
+from tempfile import NamedTemporaryFile
+from numpy import (
+    ndarray,
+    uint8,
+    intp,
+    float32,
+    float64,
+    arange,
+    array,
+    asarray,
+    linspace,
+    meshgrid,
+    stack,
+    fmin,
+    fmax,
+    minimum,
+    maximum,
+    zeros,
+    empty,
+    ascontiguousarray,
+    isfinite,
+    load,
+    savez,
+)
+from numpy.linalg import norm
+from numpy.random import default_rng
+from numpy.typing import ArrayLike
+from .colorspace import (
+    ColorSpace,
+    ColorSpaceType,
+    Observer,
+    Illuminant,
+)
+from .cachelocation import CacheLocation
+
+
+class LUTInterpolation(IntEnum):
+    Trilinear = auto()
+    Tetrahedral = auto()
+
+
+class ColorLUT:
+    """Dense 3D lookup table approximating ColorSpace.convertArray between two color spaces.
+
+    The table samples the conversion on a regular grid over a box of the source space, the
+    sRGB gamut by default, and apply interpolates it in float32. Trilinear interpolation
+    evaluates a polynomial per grid cell, whose coefficients are gathered in one row per
+    color; tetrahedral interpolation blends the four corners of the tetrahedron of the cell
+    the color lies in. uint8 colors look their cells up in per-axis tables instead.
+    """
+
+    # Bump when the file layout or the baking changes, so stale cache entries are not picked up.
+    Version: int = 2
+    CacheSubdirectory: str = 'lut'
+
+    # Hue angles wrap around, which interpolation can not handle. LUTs into polar spaces are
+    # baked into the cartesian space and converted afterwards.
+    PolarColorSpaces: dict[ColorSpaceType, ColorSpaceType] = {
+        ColorSpaceType.CIELCH: ColorSpaceType.CIELAB,
+        ColorSpaceType.OKLCH: ColorSpaceType.OKLAB,
+        ColorSpaceType.HunterLCH: ColorSpaceType.HunterLAB,
+    }
+
+    # Number of random samples the interpolation errors are estimated from.
+    ErrorSampleCount: int = 4096
+
+    # Axes with the largest and the smallest fraction of the tetrahedra in a cell, indexed by
+    # x >= y | (y >= z) << 1 | (x >= z) << 2. The orders 3 and 4 are contradictory.
+    TetrahedronAxes: ndarray = array([
+        [2, 2, 1, 0, 0, 0, 1, 0],
+        [0, 1, 0, 2, 2, 1, 2, 2],
+    ], dtype=intp)
+
+    # Colors are interpolated in chunks of this many, so that the temporaries stay in the cache.
+    ChunkSize: int = 1 << 14
+
+    def __init__(
+        self: Self,
+        table: ndarray,
+        domain: ndarray,
+        fromColorSpace: ColorSpaceType,
+        toColorSpace: ColorSpaceType,
+        observer: Observer = Observer.TwoDegreesCIE1931,
+        illuminant: Illuminant = Illuminant.D65,
+    ) -> None:
+        size: int = table.shape[0]
+        self._table: ndarray = table
+        self._domain: ndarray = domain
+        self._scale: ndarray = ((size - 1) / (domain[1] - domain[0])).astype(float32)[:, None]
+        self._offset: ndarray = (domain[0] * self._scale[:, 0]).astype(float32)[:, None]
+        self._cellStrides: ndarray = array([(size - 1) * (size - 1), size - 1, 1], dtype=intp)
+        self._vertexStrides: ndarray = array([size * size, size, 1], dtype=intp)
+        self._coefficients: ndarray = ColorLUT.trilinearCoefficients(table)
+        # Padded to 16 bytes per vertex, which makes the row gathers of the tetrahedral corners faster.
+        self._vertices: ndarray = zeros((size * size * size, 4), dtype=float32)
+        self._vertices[:, :3] = table.reshape(-1, 3)
+        # Cell and fraction of every 8 bit component k / 255 along each axis.
+        self._lower8, self._fractions8 = self._positions(arange(256, dtype=float32)[None, :] / float32(255.))
+        self._fromColorSpace: ColorSpaceType = fromColorSpace
+        self._toColorSpace: ColorSpaceType = toColorSpace
+        self._observer: Observer = observer
+        self._illuminant: Illuminant = illuminant
+        self._errors: Optional[dict[LUTInterpolation, tuple[float, float]]] = None
+        self._roundTripErrors: Optional[dict[LUTInterpolation, tuple[float, float]]] = None
+
+    @property
+    def size(self: Self) -> int:
+        return self._table.shape[0]
+
+    @property
+    def domain(self: Self) -> ndarray:
+        """Lower and upper corner of the box in the source space the table covers, shape (2, 3)."""
+        return self._domain
+
+    @property
+    def errors(self: Self) -> dict[LUTInterpolation, tuple[float, float]]:
+        """Maximum and mean euclidean distance to the exact conversion for each interpolation."""
+        if self._errors is None:
+            self._errors, self._roundTripErrors = self.measureErrors()
+        return self._errors
+
+    @property
+    def roundTripErrors(self: Self) -> dict[LUTInterpolation, tuple[float, float]]:
+        """Maximum and mean euclidean distance of the source colors after converting them with
+        this LUT and back with the inverse LUT, for each interpolation."""
+        if self._roundTripErrors is None:
+            self._errors, self._roundTripErrors = self.measureErrors()
+        return self._roundTripErrors
+
+    @staticmethod
+    def bakedColorSpace(toColorSpace: ColorSpaceType) -> ColorSpaceType:
+        return ColorLUT.PolarColorSpaces.get(toColorSpace, toColorSpace)
+
+    @staticmethod
+    def defaultDomain(
+        fromColorSpace: ColorSpaceType,
+        observer: Observer,
+        illuminant: Illuminant,
+    ) -> ndarray:
+        """Bounding box of the sRGB gamut in the source color space, shape (2, 3)."""
+        axis: ndarray = linspace(0., 1., 17)
+        cube: ndarray = stack(meshgrid(axis, axis, axis, indexing='ij'), axis=-1).reshape(-1, 3)
+        gamut: ndarray = ColorSpace.convertArray(cube, ColorSpaceType.SRGB, fromColorSpace, observer, illuminant)
+        gamut = gamut[isfinite(gamut).all(axis=-1)]
+        return array([gamut.min(axis=0), gamut.max(axis=0)], dtype=float64)
+
+    @staticmethod
+    def trilinearCoefficients(table: ndarray) -> ndarray:
+        """Coefficients c of c0 + c1 x + c2 y + c3 z + c4 x y + c5 x z + c6 y z + c7 x y z per cell
+        and channel, shape (cells, 8 * 3), with x, y and z the fractions of a color in its cell."""
+        size: int = table.shape[0]
+        corner: Callable[[int, int, int], ndarray] = lambda x, y, z: table[x:size - 1 + x, y:size - 1 + y, z:size - 1 + z]
+        c000, c100, c010, c001 = corner(0, 0, 0), corner(1, 0, 0), corner(0, 1, 0), corner(0, 0, 1)
+        c110, c101, c011, c111 = corner(1, 1, 0), corner(1, 0, 1), corner(0, 1, 1), corner(1, 1, 1)
+        return ascontiguousarray(stack([
+            c000,
+            c100 - c000,
+            c010 - c000,
+            c001 - c000,
+            c110 - c100 - c010 + c000,
+            c101 - c100 - c001 + c000,
+            c011 - c010 - c001 + c000,
+            c111 - c110 - c101 - c011 + c100 + c010 + c001 - c000,
+        ], axis=3).reshape(-1, 8 * 3), dtype=float32)
+
+    @staticmethod
+    def cachePath(
+        fromColorSpace: ColorSpaceType,
+        toColorSpace: ColorSpaceType,
+        size: int,
+        observer: Observer,
+        illuminant: Illuminant,
+        domain: ndarray,
+    ) -> Path:
+        domainHash: str = md5(asarray(domain, dtype=float64).tobytes()).hexdigest()[:8]
+        return CacheLocation.directory(ColorLUT.CacheSubdirectory) / \
+            f'v{ColorLUT.Version}_{fromColorSpace.name}_{toColorSpace.name}_{size}_{observer.name}_{illuminant.name}_{domainHash}.npz'
+
+    @classmethod
+    def bake(
+        cls: type[Self],
+        fromColorSpace: ColorSpaceType,
+        toColorSpace: ColorSpaceType,
+        size: int = 33,
+        observer: Observer = Observer.TwoDegreesCIE1931,
+        illuminant: Illuminant = Illuminant.D65,
+        domain: Optional[ArrayLike] = None,
+        cache: bool = True,
+    ) -> 'ColorLUT':
+        if size < 2:
+            raise ValueError(f'A LUT needs at least 2 samples per axis, not {size}.')
+        domain = ColorLUT.defaultDomain(fromColorSpace, observer, illuminant) \
+            if domain is None else asarray(domain, dtype=float64)
+        if domain.shape != (2, 3) or not (domain[1] > domain[0]).all():
+            raise ValueError(f'The domain must be a lower and an upper corner of a non-empty box, not {domain.tolist()}.')
+
+        path: Optional[Path] = ColorLUT.cachePath(fromColorSpace, toColorSpace, size, observer, illuminant, domain) \
+            if cache else None
+        if path is not None and path.exists():
+            try:
+                with load(path) as archive:
+                    return cls(archive['table'], archive['domain'], fromColorSpace, toColorSpace, observer, illuminant)
+            except Exception:
+                # Whatever is wrong with the file, e.g. a truncated zip, the LUT is baked again.
+                path.unlink(missing_ok=True)
+
+        axes: list[ndarray] = [linspace(domain[0, axis], domain[1, axis], size) for axis in range(3)]
+        grid: ndarray = stack(meshgrid(*axes, indexing='ij'), axis=-1)
+        table: ndarray = ColorSpace.convertArray(
+            grid,
+            fromColorSpace,
+            ColorLUT.bakedColorSpace(toColorSpace),
+            observer,
+            illuminant,
+        )
+
+        if path is not None:
+            # Written under a temporary name and renamed into place, like the fit cache.
+            temporaryPath: Optional[Path] = None
+            try:
+                with NamedTemporaryFile(dir=path.parent, prefix=f'{path.stem}_', suffix='.tmp', delete=False) as file:
+                    temporaryPath = Path(file.name)
+                    savez(file, table=table, domain=domain)
+                replace(temporaryPath, path)
+            except OSError:
+                if temporaryPath is not None:
+                    temporaryPath.unlink(missing_ok=True)
+
+        return cls(table, domain, fromColorSpace, toColorSpace, observer, illuminant)
+
+    def _positions(self: Self, colors: ndarray) -> tuple[ndarray, ndarray]:
+        """Lower cell corner and fractional position inside the cell of colors of shape (3, n).
+
+        Colors outside the domain are clamped to it, NaN to its lower corner.
+        """
+        size: int = self.size
+        position: ndarray = colors * self._scale
+        position -= self._offset
+        fmax(position, 0., out=position)
+        fmin(position, size - 1, out=position)
+        lower: ndarray = position.astype(intp)
+        minimum(lower, size - 2, out=lower)
+        position -= lower
+        return lower, position
+
+    def _positions8(self: Self, colors: ndarray) -> tuple[ndarray, ndarray]:
+        """_positions of uint8 colors of shape (3, n), read as k / 255."""
+        return (
+            stack([self._lower8[axis].take(colors[axis]) for axis in range(3)]),
+            stack([self._fractions8[axis].take(colors[axis]) for axis in range(3)]),
+        )
+
+    def _trilinear(self: Self, lower: ndarray, fractions: ndarray, result: ndarray) -> None:
+        coefficients: ndarray = ascontiguousarray(self._coefficients.take(self._cellStrides @ lower, axis=0).T).reshape(8, 3, -1)
+        x, y, z = fractions
+        c0, c1, c2, c3, c4, c5, c6, c7 = coefficients
+        # c0 + x (c1 + z c5 + y (c4 + z c7)) + y (c2 + z c6) + z c3, accumulated in place.
+        c7 *= z
+        c7 += c4
+        c7 *= y
+        c5 *= z
+        c7 += c5
+        c7 += c1
+        c7 *= x
+        c6 *= z
+        c6 += c2
+        c6 *= y
+        c3 *= z
+        c0 += c7
+        c0 += c6
+        c0 += c3
+        result[...] = c0.T
+
+    def _tetrahedral(self: Self, lower: ndarray, fractions: ndarray, result: ndarray) -> None:
+        x, y, z = fractions
+        base: ndarray = self._vertexStrides @ lower
+        last: ndarray = base + self._vertexStrides.sum()
+        # Walk from the lower to the upper cell corner, stepping along the axis with the largest
+        # fraction first and the smallest last. On ties the ambiguous corner has zero weight.
+        order: ndarray = (x >= y).view(uint8) | ((y >= z).view(uint8) << 1) | ((x >= z).view(uint8) << 2)
+        largest: ndarray = maximum(maximum(x, y), z)
+        smallest: ndarray = minimum(minimum(x, y), z)
+        middle: ndarray = x + y + z - largest - smallest
+        first: ndarray = base + self._vertexStrides.take(ColorLUT.TetrahedronAxes[0].take(order))
+        second: ndarray = last - self._vertexStrides.take(ColorLUT.TetrahedronAxes[1].take(order))
+        corners: ndarray = ascontiguousarray(stack([
+            self._vertices.take(base, axis=0),
+            self._vertices.take(first, axis=0),
+            self._vertices.take(second, axis=0),
+            self._vertices.take(last, axis=0),
+        ]).transpose(0, 2, 1))
+        v0, v1, v2, v3 = corners
+        # v0 + largest (v1 - v0) + middle (v2 - v1) + smallest (v3 - v2), accumulated in place.
+        v3 -= v2
+        v3 *= smallest
+        v2 -= v1
+        v2 *= middle
+        v1 -= v0
+        v1 *= largest
+        v0 += v1
+        v0 += v2
+        v0 += v3
+        result[...] = v0[:3].T
+
+    Interpolators: dict[LUTInterpolation, Callable[[Self, ndarray, ndarray, ndarray], None]] = {
+        LUTInterpolation.Trilinear: _trilinear,
+        LUTInterpolation.Tetrahedral: _tetrahedral,
+    }
+
+    def _interpolate(self: Self, colors: ndarray, interpolation: LUTInterpolation) -> ndarray:
+        """Interpolated colors of shape (n, 3) in the baked color space, in float32."""
+        interpolator: Callable[[Self, ndarray, ndarray, ndarray], None] = ColorLUT.Interpolators[interpolation]
+        result: ndarray = empty(colors.shape, dtype=float32)
+        for start in range(0, len(colors), ColorLUT.ChunkSize):
+            chunk: ndarray = colors[start:start + ColorLUT.ChunkSize].T
+            lower, fractions = self._positions8(chunk) if colors.dtype == uint8 \
+                else self._positions(chunk.astype(float32))
+            interpolator(self, lower, fractions, result[start:start + ColorLUT.ChunkSize])
+        return result
+
+    def apply(
+        self: Self,
+        colors: ArrayLike,
+        interpolation: LUTInterpolation = LUTInterpolation.Trilinear,
+    ) -> ndarray:
+        """Convert an array of shape (..., 3) to float32 colors of the same shape.
+
+        uint8 input is read as 8 bit components, k / 255, like ColorSpace.convertArray does.
+        Colors outside the domain are clamped to it.
+        """
+        if interpolation not in ColorLUT.Interpolators:
+            raise ValueError(f'Unknown LUT interpolation {interpolation!r}.')
+        colors = asarray(colors)
+        result: ndarray = self._interpolate(colors.reshape(-1, 3), interpolation).reshape(colors.shape)
+        if self._toColorSpace in ColorLUT.PolarColorSpaces:
+            result = ColorSpace.CartesianToPolarArray(result)
+        return result
+
+    def measureErrors(self: Self) -> tuple[dict[LUTInterpolation, tuple[float, float]], dict[LUTInterpolation, tuple[float, float]]]:
+        """Forward and round-trip errors, see errors and roundTripErrors.
+
+        Both are measured in cartesian spaces for polar color spaces, where hue distances are
+        meaningful. The round trip goes through a LUT of the same size for the inverse
+        conversion, baked over the bounding box of this table.
+        """
+        samples: ndarray = default_rng(210).uniform(self._domain[0], self._domain[1], (ColorLUT.ErrorSampleCount, 3))
+        bakedColorSpace: ColorSpaceType = ColorLUT.bakedColorSpace(self._toColorSpace)
+        exact: ndarray = ColorSpace.convertArray(samples, self._fromColorSpace, bakedColorSpace, self._observer, self._illuminant)
+        source: ndarray = ColorSpace.convertArray(samples, self._fromColorSpace, ColorLUT.bakedColorSpace(self._fromColorSpace), self._observer, self._illuminant)
+
+        image: ndarray = self._table.reshape(-1, 3)
+        image = image[isfinite(image).all(axis=-1)]
+        inverse: ColorLUT = ColorLUT.bake(
+            bakedColorSpace,
+            self._fromColorSpace,
+            self.size,
+            self._observer,
+            self._illuminant,
+            array([image.min(axis=0), image.max(axis=0)]),
+            cache=False,
+        )
+
+        errors: dict[LUTInterpolation, tuple[float, float]] = {}
+        roundTripErrors: dict[LUTInterpolation, tuple[float, float]] = {}
+        for interpolation in LUTInterpolation:
+            approximation: ndarray = self._interpolate(samples, interpolation)
+            distance: ndarray = norm(approximation - exact, axis=-1)
+            distance = distance[isfinite(distance)]
+            errors[interpolation] = (float(distance.max()), float(distance.mean()))
+
+            distance = norm(inverse._interpolate(approximation, interpolation) - source, axis=-1)
+            distance = distance[isfinite(distance)]
+            roundTripErrors[interpolation] = (float(distance.max()), float(distance.mean()))
+        return errors, roundTripErrors
+
+
+if __name__ == '__main__':
+    from argparse import ArgumentParser
+    from sys import exit
+    from time import perf_counter
+
+    parser: ArgumentParser = ArgumentParser('colorlut', description='Compare baked LUTs with the exact conversions.')
+    parser.add_argument('-c', '--check', dest='check', action='store_true', help='Check the accuracy of the LUTs and their 8 bit input.')
+    args = parser.parse_args()
+
+    failed: bool = False
+    generator = default_rng(210)
+    colors: ndarray = generator.uniform(0., 1., (1 << 20, 3))
+    colors8: ndarray = generator.integers(0, 256, (1 << 20, 3), dtype=uint8)
+    for toColorSpace in [ColorSpaceType.CIELAB, ColorSpaceType.OKLCH]:
+        for size in [33, 65]:
+            lut: ColorLUT = ColorSpace.bakeLUT(ColorSpaceType.SRGB, toColorSpace, size, cache=False)
+            for interpolation in LUTInterpolation:
+                (largest, mean), (roundTripLargest, roundTripMean) = lut.errors[interpolation], lut.roundTripErrors[interpolation]
+                print(f"SRGB -> {toColorSpace.name} @ {size}, {interpolation.name}: max. {largest:.2e} mean {mean:.2e}, round trip max. {roundTripLargest:.2e} mean {roundTripMean:.2e}")
+                # Perceptual accuracy: well below a just noticeable difference in CIELAB and OKLab.
+                failed = failed or largest > (.05 if toColorSpace == ColorSpaceType.CIELAB else 5e-3)
+
+                if args.check:
+                    # 8 bit input looks its cells up in tables; it must agree with the same colors as floats.
+                    difference: float = float(abs(lut.apply(colors8[:4096], interpolation) - lut.apply(colors8[:4096] / 255., interpolation)).max())
+                    failed = failed or difference > 1e-4
+                    continue
+
+                for name, samples in [('float', colors), ('uint8', colors8)]:
+                    start: float = perf_counter()
+                    lut.apply(samples, interpolation)
+                    lutTime: float = perf_counter() - start
+                    start = perf_counter()
+                    ColorSpace.convertArray(samples, ColorSpaceType.SRGB, toColorSpace)
+                    exactTime: float = perf_counter() - start
+                    print(f"    {name}: {lutTime * 1e3:.1f} ms LUT vs. {exactTime * 1e3:.1f} ms exact for {len(samples)} colors")
+
+    if args.check:
+        # Invalid parameters are errors, not silently replaced.
+        for invalid in [lambda: ColorSpace.bakeLUT(ColorSpaceType.SRGB, ColorSpaceType.CIELAB, 1, cache=False),
+                        lambda: lut.apply(colors8[:16], 'cubic')]:
+            try:
+                invalid()
+                failed = True
+            except ValueError:
+                pass
+
+        # Linear conversions are reproduced up to rounding, there and back.
+        lut = ColorSpace.bakeLUT(ColorSpaceType.RGB, ColorSpaceType.CIEXYZ, 5, cache=False)
+        for interpolation in LUTInterpolation:
+            failed = failed or lut.errors[interpolation][0] > 1e-5 or lut.roundTripErrors[interpolation][0] > 1e-5
+
+        # A cached LUT is the same table.
+        first: ColorLUT = ColorSpace.bakeLUT(ColorSpaceType.SRGB, ColorSpaceType.OKLAB, 9)
+        second: ColorLUT = ColorSpace.bakeLUT(ColorSpaceType.SRGB, ColorSpaceType.OKLAB, 9)
+        failed = failed or not (first._table == second._table).all()
+
+    exit(1 if failed else 0)
@@ -19,6 +19,8 @@ from typing import (
     Self,
     Callable,
     Any,
+    Iterable,
+    Optional,
 )
 from enum import (
     IntEnum,
@@ -26,12 +28,51 @@ from enum import (
     auto,
 )
 from copy import deepcopy
-from networkx import (
-    DiGraph,
-    shortest_path,
-    draw,
-    spring_layout,
+from threading import Lock
+from heapq import (
+    heappush,
+    heappop,
 )
+from importlib.resources import files
+from pathlib import Path
+from time import perf_counter
+from rtoml import (
+    loads,
+    dumps,
+)
+from itertools import pairwise
+from functools import partial
+from operator import mul
+from numpy import (
+    ndarray,
+    dtype,
+    uint8,
+    intp,
+    inf,
+    float32,
+    float64,
+    arange,
+    searchsorted,
+    fmin,
+    fmax,
+    array,
+    asarray,
+    stack,
+    where,
+    select,
+    power,
+    cbrt,
+    sqrt as npsqrt,
+    hypot,
+    arctan2,
+    cos as npcos,
+    sin as npsin,
+    floor,
+    clip,
+    errstate,
+)
+from numpy.linalg import inv
+from numpy.typing import ArrayLike
 
 class ColorSpaceType(IntEnum):
     SRGB = 0x0
@@ -82,6 +123,10 @@ class Illuminant(IntEnum):
     F11 = auto()
     F12 = auto()
 
+class ConversionPrecision(IntEnum):
+    Single = auto()
+    Double = auto()
+
 class ColorSpace:
     # Tristimuli
     Tristimuli: dict[Observer, dict[Illuminant, vec3]] = {
@@ -557,6 +602,360 @@ class ColorSpace:
     def ACESAP1ToCIEXYZ(ap1: vec3) -> vec3:
         return ColorSpace.MACESAPMInv * ap1
 
+    # Vectorized counterparts of the transforms above. They take arrays of shape (..., 3),
+    # run in float64 and mirror the branches of the glm code paths component-wise.
+    # Matrices are stored such that `colors @ matrix` equals `mat3 * vec3` for every row.
+    MRGBCIEXYZArray: ndarray = array(MRGBCIEXYZ.to_list(), dtype=float64)
+    MRGBCIEXYZInvArray: ndarray = inv(MRGBCIEXYZArray)
+    OKLABM1Array: ndarray = array(OKLABM1.to_list(), dtype=float64)
+    OKLABM1InvArray: ndarray = inv(OKLABM1Array)
+    OKLABM2Array: ndarray = array(OKLABM2.to_list(), dtype=float64)
+    OKLABM2InvArray: ndarray = inv(OKLABM2Array)
+    MACESAPMInvArray: ndarray = array(MACESAPMInv.to_list(), dtype=float64)
+    MACESAPMArray: ndarray = inv(MACESAPMInvArray)
+    MCIEXYZAdobeRGBArray: ndarray = array([
+        [2.04137, -0.96927, 0.01345],
+        [-0.56495, 1.87601, -0.11839],
+        [-0.34469, 0.04156, 1.01541],
+    ], dtype=float64)
+    MAdobeRGBCIEXYZArray: ndarray = array([
+        [0.57667, 0.29738, 0.02703],
+        [0.18555, 0.62735, 0.07069],
+        [0.18819, 0.07527, 0.99110],
+    ], dtype=float64)
+    MRGBYCbCrArray: ndarray = array([
+        [0.299, -0.565 * 0.299, 0.713 * (1.0 - 0.299)],
+        [0.587, -0.565 * 0.587, -0.713 * 0.587],
+        [0.114, 0.565 * (1.0 - 0.114), -0.713 * 0.114],
+    ], dtype=float64)
+    MYCbCrRGBArray: ndarray = array([
+        [1.0, 1.0, 1.0],
+        [0.0, -0.344, 1.770],
+        [1.403, -0.714, 0.0],
+    ], dtype=float64)
+
+    @staticmethod
+    def fractArray(x: ndarray) -> ndarray:
+        return x - floor(x)
+
+    # Component-wise parts of edges that are split around their matrix products, see LinearStages.
+    @staticmethod
+    def cubeRoot(color: vec3) -> vec3:
+        return pow(color, vec3(1. / 3.))
+
+    @staticmethod
+    def cubeRootArray(colors: ndarray) -> ndarray:
+        return power(colors, 1. / 3.)
+
+    @staticmethod
+    def cube(color: vec3) -> vec3:
+        return pow(color, vec3(3.))
+
+    @staticmethod
+    def cubeArray(colors: ndarray) -> ndarray:
+        return colors ** 3
+
+    @staticmethod
+    def encodeAdobeRGB(color: vec3) -> vec3:
+        return pow(color, vec3(1.0 / 2.19921875)) * 255
+
+    @staticmethod
+    def encodeAdobeRGBArray(colors: ndarray) -> ndarray:
+        return power(colors, 1.0 / 2.19921875) * 255
+
+    @staticmethod
+    def decodeAdobeRGB(color: vec3) -> vec3:
+        return pow(color / 255.0, vec3(2.19921875)) * 100.0
+
+    @staticmethod
+    def decodeAdobeRGBArray(colors: ndarray) -> ndarray:
+        return power(colors / 255.0, 2.19921875) * 100.0
+
+    @staticmethod
+    def linearToSRGBArray(component: ndarray) -> ndarray:
+        return where(
+            component <= 0.0031308,
+            12.92 * component,
+            (1.0 + ColorSpace.SRGBAlpha) * power(component, 1. / 2.4) - ColorSpace.SRGBAlpha,
+        )
+
+    @staticmethod
+    def RGBToSRGBArray(rgb: ndarray) -> ndarray:
+        return ColorSpace.linearToSRGBArray(rgb)
+
+    @staticmethod
+    def SRGBToLinearArray(component: ndarray) -> ndarray:
+        return where(
+            component <= 0.04045,
+            component / 12.92,
+            power((component + ColorSpace.SRGBAlpha) / (1.0 + ColorSpace.SRGBAlpha), 2.4),
+        )
+
+    @staticmethod
+    def SRGBToRGBArray(srgb: ndarray) -> ndarray:
+        return ColorSpace.SRGBToLinearArray(srgb)
+
+    # Size of the bucket table behind encodeSRGB8. With 4096 buckets no bucket spans more than
+    # one 8 bit code, which keeps the correction step in encodeSRGB8 to a single comparison.
+    SRGBEncodeTableSize: int = 4096
+
+    @staticmethod
+    def decodeSRGB8(srgb: ndarray) -> ndarray:
+        """Linear components of 8 bit sRGB components; exact, one table lookup per component."""
+        return ColorSpace.SRGBDecodeTable.take(srgb)
+
+    @staticmethod
+    def encodeSRGB8(linear: ndarray) -> ndarray:
+        """Rounded 8 bit sRGB components of linear components, clamped to [0, 1]; NaN maps to 0.
+
+        Identical to rounding linearToSRGBArray(linear) * 255 to the nearest integer.
+        """
+        linear = fmin(fmax(linear, 0.), 1.)
+        code: ndarray = ColorSpace.SRGBEncodeTable.take((linear * (ColorSpace.SRGBEncodeTableSize - 1)).astype(intp))
+        code += linear >= ColorSpace.SRGBEncodeThresholds.take(code)
+        return code
+
+    @staticmethod
+    def RGBToCIEXYZArray(rgb: ndarray) -> ndarray:
+        return rgb @ ColorSpace.MRGBCIEXYZArray
+
+    @staticmethod
+    def CIEXYZToRGBArray(xyz: ndarray) -> ndarray:
+        return xyz @ ColorSpace.MRGBCIEXYZInvArray
+
+    @staticmethod
+    def CIEXYZToCIELABArray(ciexyz: ndarray, whitepoint: ndarray) -> ndarray:
+        var = ciexyz / whitepoint
+        var = where(var > 0.008856, cbrt(var), 7.787 * var + 16 / 116)
+        return stack([
+            116 * var[..., 1] - 16,
+            500 * (var[..., 0] - var[..., 1]),
+            200 * (var[..., 1] - var[..., 2]),
+        ], axis=-1)
+
+    @staticmethod
+    def CIELABToCIEXYZArray(cielab: ndarray, whitepoint: ndarray) -> ndarray:
+        var_Y = (cielab[..., 0] + 16) / 116
+        var = stack([
+            cielab[..., 1] / 500 + var_Y,
+            var_Y,
+            var_Y - cielab[..., 2] / 200,
+        ], axis=-1)
+        cube = var ** 3
+        return where(cube > 0.008856, cube, (var - 16 / 116) / 7.787) * whitepoint
+
+    @staticmethod
+    def CartesianToPolarArray(lab: ndarray) -> ndarray:
+        return stack([
+            lab[..., 0],
+            hypot(lab[..., 1], lab[..., 2]),
+            arctan2(lab[..., 2], lab[..., 1]),
+        ], axis=-1)
+
+    @staticmethod
+    def PolarToCartesianArray(lch: ndarray) -> ndarray:
+        return stack([
+            lch[..., 0],
+            lch[..., 1] * npcos(lch[..., 2]),
+            lch[..., 1] * npsin(lch[..., 2]),
+        ], axis=-1)
+
+    @staticmethod
+    def CIEXYZToOKLABArray(ciexyz: ndarray) -> ndarray:
+        # Same as the glm path, negative cone responses end up as NaN.
+        return power(ciexyz @ ColorSpace.OKLABM1Array, 1. / 3.) @ ColorSpace.OKLABM2Array
+
+    @staticmethod
+    def OKLABToCIEXYZArray(oklab: ndarray) -> ndarray:
+        return (oklab @ ColorSpace.OKLABM2InvArray) ** 3 @ ColorSpace.OKLABM1InvArray
+
+    @staticmethod
+    def CIEXYZToHunterLABArray(ciexyz: ndarray, whitepoint: ndarray) -> ndarray:
+        var_Ka = 175.0 / 198.04 * (whitepoint[1] + whitepoint[0])
+        var_Kb = 70.0 / 218.11 * (whitepoint[1] + whitepoint[2])
+        var = ciexyz / whitepoint
+        root = npsqrt(var[..., 1])
+        defined = ciexyz[..., 1] != 0.
+        return stack([
+            100.0 * root,
+            where(defined, var_Ka * (var[..., 0] - var[..., 1]) / root, 1.),
+            where(defined, var_Kb * (var[..., 1] - var[..., 2]) / root, 1.),
+        ], axis=-1)
+
+    @staticmethod
+    def HunterLABToCIEXYZArray(hunterlab: ndarray, whitepoint: ndarray) -> ndarray:
+        var_Ka = 175.0 / 198.04 * (whitepoint[1] + whitepoint[0])
+        var_Kb = 70.0 / 218.11 * (whitepoint[1] + whitepoint[2])
+
+        Y = (hunterlab[..., 0] / whitepoint[1]) ** 2 * 100.0
+        root = npsqrt(Y / whitepoint[1])
+        return stack([
+            (hunterlab[..., 1] / var_Ka * root + Y / whitepoint[1]) * whitepoint[0],
+            Y,
+            -(hunterlab[..., 2] / var_Kb * root - Y / whitepoint[1]) * whitepoint[2],
+        ], axis=-1)
+
+    @staticmethod
+    def RGBToHSLArray(rgb: ndarray) -> ndarray:
+        r, g, b = rgb[..., 0], rgb[..., 1], rgb[..., 2]
+        cMin = rgb.min(axis=-1)
+        cMax = rgb.max(axis=-1)
+        delta = cMax - cMin
+        lightness = (cMax + cMin) / 2.
+        chromatic = delta != 0.0
+        saturation = where(
+            lightness < 0.5,
+            delta / (cMax + cMin),
+            delta / (2.0 - cMax - cMin),
+        )
+        deltaR = (cMax - r) / 6.0 / delta + 0.5
+        deltaG = (cMax - g) / 6.0 / delta + 0.5
+        deltaB = (cMax - b) / 6.0 / delta + 0.5
+        hue = select(
+            [r == cMax, g == cMax],
+            [deltaB - deltaG, 1.0 / 3.0 + deltaR - deltaB],
+            2.0 / 3.0 + deltaG - deltaR,
+        )
+        return stack([
+            where(chromatic, ColorSpace.fractArray(hue), 0.0),
+            where(chromatic, saturation, 0.0),
+            lightness,
+        ], axis=-1)
+
+    @staticmethod
+    def HSLToRGBArray(hsl: ndarray) -> ndarray:
+        saturation = hsl[..., 1:2]
+        lightness = hsl[..., 2:3]
+        b = where(
+            lightness < 0.5,
+            lightness * (1.0 + saturation),
+            lightness + saturation - saturation * lightness,
+        )
+        a = 2.0 * lightness - b
+        hue = ColorSpace.fractArray(hsl[..., 0])
+        rgb = clip(stack([
+            abs(hue * 6.0 - 3.0) - 1.0,
+            2.0 - abs(hue * 6.0 - 2.0),
+            2.0 - abs(hue * 6.0 - 4.0),
+        ], axis=-1), 0.0, 1.0)
+        return where(saturation == 0.0, lightness, a + rgb * (b - a))
+
+    @staticmethod
+    def RGBToYCbCrArray(rgb: ndarray) -> ndarray:
+        y = rgb @ array([0.299, 0.587, 0.114])
+        return stack([
+            y,
+            (rgb[..., 2] - y) * 0.565,
+            (rgb[..., 0] - y) * 0.713,
+        ], axis=-1)
+
+    @staticmethod
+    def YCbCrToRGBArray(yuv: ndarray) -> ndarray:
+        return stack([
+            yuv[..., 0] + 1.403 * yuv[..., 2],
+            yuv[..., 0] - 0.344 * yuv[..., 1] - 0.714 * yuv[..., 2],
+            yuv[..., 0] + 1.770 * yuv[..., 1],
+        ], axis=-1)
+
+    @staticmethod
+    def CIEXYZToCIE1931YxyArray(xyz: ndarray) -> ndarray:
+        s = xyz.sum(axis=-1)
+        return stack([
+            xyz[..., 1],
+            xyz[..., 0] / s,
+            xyz[..., 1] / s,
+        ], axis=-1)
+
+    @staticmethod
+    def CIE1931YxyToCIEXYZArray(yxy: ndarray) -> ndarray:
+        x = yxy[..., 0] * (yxy[..., 1] / yxy[..., 2])
+        return stack([
+            x,
+            yxy[..., 0],
+            x / yxy[..., 1] - x - yxy[..., 0],
+        ], axis=-1)
+
+    @staticmethod
+    def HSVToRGBArray(hsv: ndarray) -> ndarray:
+        p = clip(
+            abs(ColorSpace.fractArray(hsv[..., 0:1] + array([1.0, 2.0 / 3.0, 1.0 / 3.0])) * 6.0 - 3.0) - 1.0,
+            0.0,
+            1.0,
+        )
+        return hsv[..., 2:3] * (1.0 + (p - 1.0) * hsv[..., 1:2])
+
+    @staticmethod
+    def RGBToHSVArray(rgb: ndarray) -> ndarray:
+        r, g, b = rgb[..., 0], rgb[..., 1], rgb[..., 2]
+        cMax = rgb.max(axis=-1)
+        cMin = rgb.min(axis=-1)
+        delta = cMax - cMin
+        chromatic = cMax > cMin
+        hue = select(
+            [r == cMax, g == cMax],
+            [(g - b) / delta, 2.0 + (b - r) / delta],
+            4.0 + (r - g) / delta,
+        )
+        return stack([
+            where(chromatic, ColorSpace.fractArray(hue / 6.0), 0.0),
+            where(chromatic, delta / cMax, 0.0),
+            cMax,
+        ], axis=-1)
+
+    @staticmethod
+    def CIEXYZToCIELuvArray(xyz: ndarray, illuminant: ndarray) -> ndarray:
+        denominator = xyz @ array([1.0, 15.0, 3.0])
+        var_U = 4.0 * xyz[..., 0] / denominator
+        var_V = 9.0 * xyz[..., 1] / denominator
+
+        var_Y = xyz[..., 1] / 100.0
+        var_Y = where(var_Y > 0.008856, cbrt(var_Y), 7.787 * var_Y + 16.0 / 116.0)
+
+        referenceDenominator = illuminant[0] + 15.0 * illuminant[1] + 3.0 * illuminant[2]
+        ref_U = 4.0 * illuminant[0] / referenceDenominator
+        ref_V = 9.0 * illuminant[1] / referenceDenominator
+
+        s = 116.0 * var_Y - 16.0
+        return stack([
+            s,
+            13.0 * s * (var_U - ref_U),
+            13.0 * s * (var_V - ref_V),
+        ], axis=-1)
+
+    @staticmethod
+    def CIELuvToCIEXYZArray(luv: ndarray, illuminant: ndarray) -> ndarray:
+        var_Y = (luv[..., 0] + 16.0) / 116.0
+        cube = var_Y ** 3
+        var_Y = where(cube > 0.008856, cube, (var_Y - 16.0 / 116.0) / 7.787)
+
+        referenceDenominator = illuminant[0] + 15.0 * illuminant[1] + 3.0 * illuminant[2]
+        ref_U = 4.0 * illuminant[0] / referenceDenominator
+        ref_V = 9.0 * illuminant[1] / referenceDenominator
+
+        var_U = luv[..., 1] / 13.0 / luv[..., 0] + ref_U
+        var_V = luv[..., 2] / 13.0 / luv[..., 0] + ref_V
+
+        Y = var_Y * 100
+        X = - (9 * Y * var_U) / ((var_U - 4) * var_V - var_U * var_V)
+        Z = (9 * Y - (15 * var_V * Y) - (var_V * X)) / (3 * var_V)
+        return stack([X, Y, Z], axis=-1)
+
+    @staticmethod
+    def CIEXYZToAdobeRGBArray(xyz: ndarray) -> ndarray:
+        return power(xyz / 100.0 @ ColorSpace.MCIEXYZAdobeRGBArray, 1.0 / 2.19921875) * 255
+
+    @staticmethod
+    def AdobeRGBToCIEXYZArray(argb: ndarray) -> ndarray:
+        return power(argb / 255.0, 2.19921875) * 100.0 @ ColorSpace.MAdobeRGBCIEXYZArray
+
+    @staticmethod
+    def CIEXYZToACESAP1Array(ciexyz: ndarray) -> ndarray:
+        return ciexyz @ ColorSpace.MACESAPMArray
+
+    @staticmethod
+    def ACESAP1ToCIEXYZArray(ap1: ndarray) -> ndarray:
+        return ap1 @ ColorSpace.MACESAPMInvArray
+
     Edges: dict[tuple[ColorSpaceType, ColorSpaceType], tuple[Callable[[vec3, list[float]], vec3], ColorSpaceParameterType]] = {
         (ColorSpaceType.SRGB, ColorSpaceType.RGB): (SRGBToRGB, ColorSpaceParameterType.NoParameters),
         (ColorSpaceType.RGB, ColorSpaceType.SRGB): (RGBToSRGB, ColorSpaceParameterType.NoParameters),
@@ -590,9 +989,230 @@ class ColorSpace:
         (ColorSpaceType.ACESAP1, ColorSpaceType.CIEXYZ): (ACESAP1ToCIEXYZ, ColorSpaceParameterType.NoParameters),
     }
 
-    Graph: DiGraph = DiGraph(Edges.keys())
+    # Vectorized transform for every entry in Edges; the parameter types are shared.
+    ArrayEdges: dict[tuple[ColorSpaceType, ColorSpaceType], Callable[..., ndarray]] = {
+        (ColorSpaceType.SRGB, ColorSpaceType.RGB): SRGBToRGBArray,
+        (ColorSpaceType.RGB, ColorSpaceType.SRGB): RGBToSRGBArray,
+        (ColorSpaceType.RGB, ColorSpaceType.CIEXYZ): RGBToCIEXYZArray,
+        (ColorSpaceType.CIEXYZ, ColorSpaceType.RGB): CIEXYZToRGBArray,
+        (ColorSpaceType.CIEXYZ, ColorSpaceType.CIELAB): CIEXYZToCIELABArray,
+        (ColorSpaceType.CIELAB, ColorSpaceType.CIEXYZ): CIELABToCIEXYZArray,
+        (ColorSpaceType.CIELAB, ColorSpaceType.CIELCH): CartesianToPolarArray,
+        (ColorSpaceType.CIELCH, ColorSpaceType.CIELAB): PolarToCartesianArray,
+        (ColorSpaceType.CIEXYZ, ColorSpaceType.OKLAB): CIEXYZToOKLABArray,
+        (ColorSpaceType.OKLAB, ColorSpaceType.CIEXYZ): OKLABToCIEXYZArray,
+        (ColorSpaceType.OKLAB, ColorSpaceType.OKLCH): CartesianToPolarArray,
+        (ColorSpaceType.OKLCH, ColorSpaceType.OKLAB): PolarToCartesianArray,
+        (ColorSpaceType.CIEXYZ, ColorSpaceType.HunterLAB): CIEXYZToHunterLABArray,
+        (ColorSpaceType.HunterLAB, ColorSpaceType.CIEXYZ): HunterLABToCIEXYZArray,
+        (ColorSpaceType.HunterLAB, ColorSpaceType.HunterLCH): CartesianToPolarArray,
+        (ColorSpaceType.HunterLCH, ColorSpaceType.HunterLAB): PolarToCartesianArray,
+        (ColorSpaceType.RGB, ColorSpaceType.HSL): RGBToHSLArray,
+        (ColorSpaceType.HSL, ColorSpaceType.RGB): HSLToRGBArray,
+        (ColorSpaceType.CIEXYZ, ColorSpaceType.CIE1931Yxy): CIEXYZToCIE1931YxyArray,
+        (ColorSpaceType.CIE1931Yxy, ColorSpaceType.CIEXYZ): CIE1931YxyToCIEXYZArray,
+        (ColorSpaceType.RGB, ColorSpaceType.YCbCr): RGBToYCbCrArray,
+        (ColorSpaceType.YCbCr, ColorSpaceType.RGB): YCbCrToRGBArray,
+        (ColorSpaceType.RGB, ColorSpaceType.HSV): RGBToHSVArray,
+        (ColorSpaceType.HSV, ColorSpaceType.RGB): HSVToRGBArray,
+        (ColorSpaceType.CIEXYZ, ColorSpaceType.CIELuv): CIEXYZToCIELuvArray,
+        (ColorSpaceType.CIELuv, ColorSpaceType.CIEXYZ): CIELuvToCIEXYZArray,
+        (ColorSpaceType.CIEXYZ, ColorSpaceType.AdobeRGB): CIEXYZToAdobeRGBArray,
+        (ColorSpaceType.AdobeRGB, ColorSpaceType.CIEXYZ): AdobeRGBToCIEXYZArray,
+        (ColorSpaceType.CIEXYZ, ColorSpaceType.ACESAP1): CIEXYZToACESAP1Array,
+        (ColorSpaceType.ACESAP1, ColorSpaceType.CIEXYZ): ACESAP1ToCIEXYZArray,
+    }
+
+    # Edges that are matrix products, or matrix products around a component-wise function.
+    # Compiled conversions multiply adjacent matrices of a path into a single one.
+    LinearStages: dict[tuple[ColorSpaceType, ColorSpaceType], list[ndarray | tuple[Callable[[vec3], vec3], Callable[[ndarray], ndarray]]]] = {
+        (ColorSpaceType.RGB, ColorSpaceType.CIEXYZ): [MRGBCIEXYZArray],
+        (ColorSpaceType.CIEXYZ, ColorSpaceType.RGB): [MRGBCIEXYZInvArray],
+        (ColorSpaceType.CIEXYZ, ColorSpaceType.OKLAB): [OKLABM1Array, (cubeRoot, cubeRootArray), OKLABM2Array],
+        (ColorSpaceType.OKLAB, ColorSpaceType.CIEXYZ): [OKLABM2InvArray, (cube, cubeArray), OKLABM1InvArray],
+        (ColorSpaceType.RGB, ColorSpaceType.YCbCr): [MRGBYCbCrArray],
+        (ColorSpaceType.YCbCr, ColorSpaceType.RGB): [MYCbCrRGBArray],
+        (ColorSpaceType.CIEXYZ, ColorSpaceType.AdobeRGB): [MCIEXYZAdobeRGBArray / 100.0, (encodeAdobeRGB, encodeAdobeRGBArray)],
+        (ColorSpaceType.AdobeRGB, ColorSpaceType.CIEXYZ): [(decodeAdobeRGB, decodeAdobeRGBArray), MAdobeRGBCIEXYZArray],
+        (ColorSpaceType.CIEXYZ, ColorSpaceType.ACESAP1): [MACESAPMArray],
+        (ColorSpaceType.ACESAP1, ColorSpaceType.CIEXYZ): [MACESAPMInvArray],
+    }
+
+    # convertArray agrees with convert up to this tolerance, relative to max(1, |value|).
+    # The glm path computes in float32, the array path in float64.
+    ArrayTolerance: float = 1e-4
+
+    PrecisionTypes: dict[ConversionPrecision, type] = {
+        ConversionPrecision.Single: float32,
+        ConversionPrecision.Double: float64,
+    }
+
+    # Memoized contexts. Creation is serialized, so threads asking for the same context at
+    # once share one instance.
+    Contexts: dict[tuple[Observer, Illuminant, ConversionPrecision], 'ConversionContext'] = {}
+    ContextLock: Lock = Lock()
 
-    DijkstraCache: dict[tuple[ColorSpaceType, ColorSpaceType], Any] = {}
+    # Measured edge costs and the route table generated from them, bundled with the package;
+    # regenerate both with `python -m imagecolorpicker.colorspace --calibrate`. The routes are
+    # data, so that the conversion chains, and with them the results, only change on purpose.
+    EdgeCostsFile: str = 'edgecosts.toml'
+    RoutesFile: str = 'routes.toml'
+
+    @staticmethod
+    def edgeWeight(cost: tuple[float, float, float]) -> float:
+        """Routing weight of an edge from its (scalar seconds, array seconds, round-trip error) per color.
+
+        Both code paths count with their time. An edge that loses as much precision on a round
+        trip as ArrayTolerance allows counts twice.
+        """
+        scalarTime, arrayTime, roundTripError = cost
+        return (scalarTime + arrayTime) * (1. + roundTripError / ColorSpace.ArrayTolerance)
+
+    @staticmethod
+    def edgeWeights(
+        costs: dict[tuple[ColorSpaceType, ColorSpaceType], tuple[float, float, float]],
+    ) -> dict[tuple[ColorSpaceType, ColorSpaceType], float]:
+        """Weights for all edges. Without any costs every edge weighs 1, which minimizes hop counts;
+        edges missing from the costs weigh as much as the most expensive measured edge."""
+        weights: dict[tuple[ColorSpaceType, ColorSpaceType], float] = dict(map(
+            lambda item: (item[0], ColorSpace.edgeWeight(item[1])),
+            costs.items(),
+        ))
+        fallback: float = max(weights.values(), default=1.)
+        return dict(map(
+            lambda edge: (edge, weights.get(edge, fallback)),
+            ColorSpace.Edges.keys(),
+        ))
+
+    @staticmethod
+    def loadEdgeCosts(path: Optional[Path] = None) -> dict[tuple[ColorSpaceType, ColorSpaceType], tuple[float, float, float]]:
+        try:
+            text: str = path.read_text() if path is not None else (files(__package__) / ColorSpace.EdgeCostsFile).read_text()
+        except FileNotFoundError:
+            return {}
+        return dict(map(
+            lambda entry: (
+                (ColorSpaceType[entry['from']], ColorSpaceType[entry['to']]),
+                (float(entry['scalar']), float(entry['array']), float(entry['error'])),
+            ),
+            loads(text)['edges'],
+        ))
+
+    @staticmethod
+    def saveEdgeCosts(
+        costs: dict[tuple[ColorSpaceType, ColorSpaceType], tuple[float, float, float]],
+        path: Path,
+    ) -> None:
+        path.write_text(dumps({
+            'edges': list(map(
+                lambda item: {
+                    'from': item[0][0].name,
+                    'to': item[0][1].name,
+                    'scalar': item[1][0],
+                    'array': item[1][1],
+                    'error': item[1][2],
+                },
+                costs.items(),
+            )),
+        }, pretty=True))
+
+    @staticmethod
+    def calibrateEdgeCosts(
+        sampleCount: int = 1 << 16,
+        scalarSampleCount: int = 1 << 10,
+        repetitionCount: int = 5,
+    ) -> dict[tuple[ColorSpaceType, ColorSpaceType], tuple[float, float, float]]:
+        """Measure seconds per color in the vec3 and array path and the maximum relative
+        round-trip error of every edge, on random sRGB colors converted into the source space."""
+        from numpy.random import default_rng
+
+        whitepoint: vec3 = ColorSpace.Tristimuli[Observer.TwoDegreesCIE1931][Illuminant.D65]
+        whitepointArray: ndarray = array(whitepoint, dtype=float64)
+        corpus: ndarray = default_rng(210).uniform(0.05, 0.95, (sampleCount, 3))
+        costs: dict[tuple[ColorSpaceType, ColorSpaceType], tuple[float, float, float]] = {}
+        for edge in ColorSpace.Edges.keys():
+            transform, arrayTransform = ColorSpaceConversion._bind(edge, whitepoint, whitepointArray)
+            inverseTransform = ColorSpaceConversion._bind(edge[::-1], whitepoint, whitepointArray)[1]
+            inputs: ndarray = ColorSpace.convertArray(corpus, ColorSpaceType.SRGB, edge[0])
+            scalarInputs: list[vec3] = list(map(lambda color: vec3(*color), inputs[:scalarSampleCount]))
+
+            scalarTime: float = float('inf')
+            arrayTime: float = float('inf')
+            for _ in range(repetitionCount):
+                start: float = perf_counter()
+                for color in scalarInputs:
+                    transform(color)
+                scalarTime = min(scalarTime, (perf_counter() - start) / len(scalarInputs))
+                start = perf_counter()
+                with errstate(divide='ignore', invalid='ignore', over='ignore'):
+                    arrayTransform(inputs)
+                arrayTime = min(arrayTime, (perf_counter() - start) / len(inputs))
+
+            with errstate(divide='ignore', invalid='ignore', over='ignore'):
+                roundTrip: ndarray = inverseTransform(arrayTransform(inputs))
+            error: ndarray = abs(roundTrip - inputs) / fmax(1., abs(inputs))
+            # Hue angles of achromatic colors are arbitrary, compare only defined values.
+            costs[edge] = scalarTime, arrayTime, float(error[error == error].max(initial=0.))
+        return costs
+
+    @staticmethod
+    def buildRoutes(
+        edges: Iterable[tuple[ColorSpaceType, ColorSpaceType]],
+        weights: Optional[dict[tuple[ColorSpaceType, ColorSpaceType], float]] = None,
+    ) -> tuple[tuple[tuple[ColorSpaceType, ...], ...], ...]:
+        """Dijkstra search from every color space; routes[from][to] lists the nodes to visit.
+
+        Edges without weight weigh 1, so without weights the routes have minimal hop counts.
+        """
+        weights = weights or {}
+        edges = list(edges)
+        routes: list[list[tuple[ColorSpaceType, ...]]] = [[()] * len(ColorSpaceType) for _ in ColorSpaceType]
+        for source in ColorSpaceType:
+            queue: list[tuple[float, ColorSpaceType, tuple[ColorSpaceType, ...]]] = [(0., source, (source,))]
+            while len(queue) != 0:
+                distance, node, route = heappop(queue)
+                if len(routes[source][node]) != 0:
+                    continue
+                routes[source][node] = route
+                for edgeFrom, edgeTo in edges:
+                    if edgeFrom == node and len(routes[source][edgeTo]) == 0:
+                        heappush(queue, (distance + weights.get((edgeFrom, edgeTo), 1.), edgeTo, route + (edgeTo,)))
+        return tuple(map(tuple, routes))
+
+    @staticmethod
+    def loadRoutes(path: Optional[Path] = None) -> tuple[tuple[tuple[ColorSpaceType, ...], ...], ...]:
+        """The route table saved by saveRoutes, indexed by [fromColorSpace][toColorSpace]."""
+        text: str = path.read_text() if path is not None else (files(__package__) / ColorSpace.RoutesFile).read_text()
+        routes: list[list[tuple[ColorSpaceType, ...]]] = [[()] * len(ColorSpaceType) for _ in ColorSpaceType]
+        for entry in loads(text)['routes']:
+            routes[ColorSpaceType[entry['from']]][ColorSpaceType[entry['to']]] = tuple(map(
+                lambda name: ColorSpaceType[name],
+                entry['path'],
+            ))
+        return tuple(map(tuple, routes))
+
+    @staticmethod
+    def saveRoutes(
+        routes: tuple[tuple[tuple[ColorSpaceType, ...], ...], ...],
+        path: Path,
+    ) -> None:
+        path.write_text(dumps({
+            'routes': list(map(
+                lambda pair: {
+                    'from': pair[0].name,
+                    'to': pair[1].name,
+                    'path': list(map(lambda colorSpaceType: colorSpaceType.name, routes[pair[0]][pair[1]])),
+                },
+                ((fromColorSpace, toColorSpace) for fromColorSpace in ColorSpaceType for toColorSpace in ColorSpaceType),
+            )),
+        }, pretty=True))
+
+    @staticmethod
+    def path(
+        fromColorSpace: ColorSpaceType,
+        toColorSpace: ColorSpaceType,
+    ) -> tuple[ColorSpaceType, ...]:
+        return ColorSpace.Routes[fromColorSpace][toColorSpace]
 
     @staticmethod
     def convert(
@@ -601,11 +1221,7 @@ class ColorSpace:
         toColorSpace: ColorSpaceType,
         **kwargs,
     ) -> vec3:
-        if (fromColorSpace, toColorSpace) in ColorSpace.DijkstraCache.keys():
-            path = ColorSpace.DijkstraCache[fromColorSpace, toColorSpace]
-        else:
-            path = shortest_path(ColorSpace.Graph, fromColorSpace, toColorSpace)
-            ColorSpace.DijkstraCache[fromColorSpace, toColorSpace] = path
+        path = ColorSpace.path(fromColorSpace, toColorSpace)
         result: vec3 = color
         for nodeIndex in range(len(path) - 1):
             edge = path[nodeIndex], path[nodeIndex + 1]
@@ -616,7 +1232,63 @@ class ColorSpace:
                 parameters.append(ColorSpace.Tristimuli[kwargs['observer']][kwargs['illuminant']])
             result = transform(result, *parameters)
         return result
-    
+
+    @staticmethod
+    def context(
+        observer: Observer = Observer.TwoDegreesCIE1931,
+        illuminant: Illuminant = Illuminant.D65,
+        precision: ConversionPrecision = ConversionPrecision.Double,
+    ) -> 'ConversionContext':
+        key = observer, illuminant, precision
+        context: Optional[ConversionContext] = ColorSpace.Contexts.get(key)
+        if context is None:
+            with ColorSpace.ContextLock:
+                if key not in ColorSpace.Contexts:
+                    ColorSpace.Contexts[key] = ConversionContext(*key)
+                context = ColorSpace.Contexts[key]
+        return context
+
+    @staticmethod
+    def compile(
+        fromColorSpace: ColorSpaceType,
+        toColorSpace: ColorSpaceType,
+        observer: Observer = Observer.TwoDegreesCIE1931,
+        illuminant: Illuminant = Illuminant.D65,
+    ) -> 'ColorSpaceConversion':
+        return ColorSpace.context(observer, illuminant).conversion(fromColorSpace, toColorSpace)
+
+    @staticmethod
+    def convertArray(
+        colors: ArrayLike,
+        fromColorSpace: ColorSpaceType,
+        toColorSpace: ColorSpaceType,
+        observer: Observer = Observer.TwoDegreesCIE1931,
+        illuminant: Illuminant = Illuminant.D65,
+        resultType: Optional[type] = None,
+    ) -> ndarray:
+        """Convert an array of shape (..., 3) at once. See ArrayTolerance for the accuracy and
+        ColorSpaceConversion.convertArray for 8 bit input and output."""
+        return ColorSpace.compile(
+            fromColorSpace,
+            toColorSpace,
+            observer,
+            illuminant,
+        ).convertArray(colors, resultType)
+
+    @staticmethod
+    def bakeLUT(
+        fromColorSpace: ColorSpaceType,
+        toColorSpace: ColorSpaceType,
+        size: int = 33,
+        observer: Observer = Observer.TwoDegreesCIE1931,
+        illuminant: Illuminant = Illuminant.D65,
+        domain: Optional[ArrayLike] = None,
+        cache: bool = True,
+    ) -> 'ColorLUT':
+        """Dense 3D lookup table approximating convertArray, cached on disk. See ColorLUT."""
+        from .colorlut import ColorLUT
+        return ColorLUT.bake(fromColorSpace, toColorSpace, size, observer, illuminant, domain, cache)
+
     @staticmethod
     def SortByCIEH(colors: list[vec3], colorSpace: ColorSpaceType = ColorSpaceType.RGB):
         first = sorted(colors, key=lambda color: length(color))[0]
@@ -644,12 +1316,398 @@ class ColorSpace:
             result = result[1:] + [result[0]]
         return result
 
+# Routing table for ColorSpace.path, indexed by [fromColorSpace][toColorSpace].
+ColorSpace.Routes = ColorSpace.loadRoutes()
+
+# Transfer function tables for 8 bit sRGB. SRGBEncodeThresholds[code] is the linear value from
+# which on code + 1 is the nearest 8 bit encoding; SRGBEncodeTable holds the code at the lower
+# end of each of the SRGBEncodeTableSize buckets evenly spaced over [0, 1].
+ColorSpace.SRGBDecodeTable = ColorSpace.SRGBToLinearArray(arange(256) / 255.)
+ColorSpace.SRGBEncodeThresholds = ColorSpace.SRGBToLinearArray((arange(256) + .5) / 255.)
+ColorSpace.SRGBEncodeThresholds[-1] = inf
+ColorSpace.SRGBEncodeTable = searchsorted(
+    ColorSpace.SRGBEncodeThresholds,
+    arange(ColorSpace.SRGBEncodeTableSize) / (ColorSpace.SRGBEncodeTableSize - 1),
+    side='right',
+).astype(uint8)
+
+
+class ColorSpaceConversion:
+    """Conversion between two color spaces with path, whitepoint and matrices resolved ahead of time.
+
+    Use ColorSpace.compile or a ConversionContext to obtain shared instances. Calling the
+    conversion converts a single vec3, convertArray converts arrays of shape (..., 3).
+    """
+
+    def __init__(
+        self: Self,
+        fromColorSpace: ColorSpaceType,
+        toColorSpace: ColorSpaceType,
+        observer: Observer = Observer.TwoDegreesCIE1931,
+        illuminant: Illuminant = Illuminant.D65,
+        precision: ConversionPrecision = ConversionPrecision.Double,
+    ) -> None:
+        self._fromColorSpace: ColorSpaceType = fromColorSpace
+        self._toColorSpace: ColorSpaceType = toColorSpace
+        self._observer: Observer = observer
+        self._illuminant: Illuminant = illuminant
+        self._precisionType: type = ColorSpace.PrecisionTypes[precision]
+
+        # Copied, so that later changes to Tristimuli can not leak into existing conversions.
+        whitepoint: vec3 = vec3(ColorSpace.Tristimuli[observer][illuminant])
+        whitepointArray: ndarray = array(whitepoint, dtype=self._precisionType)
+
+        stages: list[ndarray | tuple[Callable[[vec3], vec3], Callable[[ndarray], ndarray]]] = []
+        for edge in pairwise(ColorSpace.path(fromColorSpace, toColorSpace)):
+            if edge in ColorSpace.LinearStages:
+                edgeStages = ColorSpace.LinearStages[edge]
+            else:
+                edgeStages = [ColorSpaceConversion._bind(edge, whitepoint, whitepointArray)]
+            for stage in edgeStages:
+                if isinstance(stage, ndarray) and len(stages) != 0 and isinstance(stages[-1], ndarray):
+                    stages[-1] = stages[-1] @ stage
+                else:
+                    stages.append(stage)
+
+        # 8 bit input and output skip the sRGB transfer function stages in favor of table lookups.
+        route: tuple[ColorSpaceType, ...] = ColorSpace.path(fromColorSpace, toColorSpace)
+        self._decodesSRGB: bool = route[:2] == (ColorSpaceType.SRGB, ColorSpaceType.RGB)
+        self._encodesSRGB: bool = route[-2:] == (ColorSpaceType.RGB, ColorSpaceType.SRGB)
+
+        self._scalarStages: list[Callable[[vec3], vec3]] = []
+        self._arrayStages: list[Callable[[ndarray], ndarray]] = []
+        for stage in stages:
+            if isinstance(stage, ndarray):
+                self._scalarStages.append(partial(mul, mat3(*stage.flatten())))
+                self._arrayStages.append(partial(ColorSpaceConversion._multiply, matrix=stage.astype(self._precisionType)))
+            else:
+                self._scalarStages.append(stage[0])
+                self._arrayStages.append(stage[1])
+
+    @staticmethod
+    def _bind(
+        edge: tuple[ColorSpaceType, ColorSpaceType],
+        whitepoint: vec3,
+        whitepointArray: ndarray,
+    ) -> tuple[Callable[[vec3], vec3], Callable[[ndarray], ndarray]]:
+        transform, parameterTypes = ColorSpace.Edges[edge]
+        arrayTransform = ColorSpace.ArrayEdges[edge]
+        if ColorSpaceParameterType.Illuminant in parameterTypes and \
+            ColorSpaceParameterType.Observer in parameterTypes:
+            return (
+                lambda color: transform(color, whitepoint),
+                lambda colors: arrayTransform(colors, whitepointArray),
+            )
+        return transform, arrayTransform
+
+    @staticmethod
+    def _multiply(colors: ndarray, matrix: ndarray) -> ndarray:
+        return colors @ matrix
+
+    @property
+    def stageCount(self: Self) -> int:
+        return len(self._arrayStages)
+
+    def __deepcopy__(self: Self, memo: dict) -> 'ColorSpaceConversion':
+        # Immutable and shared through the conversion contexts; copies of objects holding
+        # a conversion share it, too.
+        return self
+
+    def __call__(self: Self, color: vec3) -> vec3:
+        for stage in self._scalarStages:
+            color = stage(color)
+        return color
+
+    def convertArray(self: Self, colors: ArrayLike, resultType: Optional[type] = None) -> ndarray:
+        """Convert an array of shape (..., 3), computing in the precision of the conversion.
+
+        The result has the computation type unless resultType is given. uint8 input is read as
+        8 bit components, k / 255. A uint8 result type yields components rounded to 8 bits and
+        clamped to [0, 1]. Both use the sRGB transfer function tables where the conversion
+        starts or ends in SRGB.
+        """
+        colors = asarray(colors)
+        stages: list[Callable[[ndarray], ndarray]] = self._arrayStages
+        result: ndarray
+        if colors.dtype == uint8:
+            if self._decodesSRGB:
+                result = ColorSpace.decodeSRGB8(colors).astype(self._precisionType, copy=False)
+                stages = stages[1:]
+            else:
+                result = colors / self._precisionType(255.)
+        else:
+            result = colors.astype(self._precisionType, copy=False)
+
+        if resultType is None:
+            resultType = self._precisionType
+        quantized: bool = dtype(resultType) == uint8
+        if quantized and self._encodesSRGB:
+            stages = stages[:-1]
+
+        # Degenerate inputs (black in Yxy, L=0 in CIELuv, ...) yield inf/NaN like the glm path.
+        with errstate(divide='ignore', invalid='ignore', over='ignore'):
+            for stage in stages:
+                result = stage(result)
+
+        if not quantized:
+            return result.astype(resultType, copy=False)
+        if self._encodesSRGB:
+            return ColorSpace.encodeSRGB8(result)
+        return (fmin(fmax(result, 0.), 1.) * 255. + .5).astype(uint8)
+
+
+class ConversionContext:
+    """Conversions between all color spaces for one observer, illuminant and precision.
+
+    All routes, whitepoints and matrices are resolved when the context is created, and the
+    context is never modified afterwards. Contexts can therefore be shared between threads
+    without locking; use ColorSpace.context to obtain memoized instances.
+
+    The array conversions spend their time in NumPy ufuncs and matrix products, which release
+    the GIL while they process arrays of numeric types. Converting separate chunks from a
+    ThreadPoolExecutor or QThreadPool runs in parallel, as long as the chunks are large enough
+    to amortize the Python overhead of a few calls per stage. The vec3 path runs in glm and
+    holds the GIL.
+    """
+
+    def __init__(
+        self: Self,
+        observer: Observer = Observer.TwoDegreesCIE1931,
+        illuminant: Illuminant = Illuminant.D65,
+        precision: ConversionPrecision = ConversionPrecision.Double,
+    ) -> None:
+        self._observer: Observer = observer
+        self._illuminant: Illuminant = illuminant
+        self._precision: ConversionPrecision = precision
+        self._conversions: tuple[tuple[ColorSpaceConversion, ...], ...] = tuple(
+            tuple(
+                ColorSpaceConversion(fromColorSpace, toColorSpace, observer, illuminant, precision)
+                for toColorSpace in ColorSpaceType
+            )
+            for fromColorSpace in ColorSpaceType
+        )
+
+    @property
+    def observer(self: Self) -> Observer:
+        return self._observer
+
+    @property
+    def illuminant(self: Self) -> Illuminant:
+        return self._illuminant
+
+    @property
+    def precision(self: Self) -> ConversionPrecision:
+        return self._precision
+
+    def conversion(
+        self: Self,
+        fromColorSpace: ColorSpaceType,
+        toColorSpace: ColorSpaceType,
+    ) -> ColorSpaceConversion:
+        return self._conversions[fromColorSpace][toColorSpace]
+
+    def convert(
+        self: Self,
+        color: vec3,
+        fromColorSpace: ColorSpaceType,
+        toColorSpace: ColorSpaceType,
+    ) -> vec3:
+        return self._conversions[fromColorSpace][toColorSpace](color)
+
+    def convertArray(
+        self: Self,
+        colors: ArrayLike,
+        fromColorSpace: ColorSpaceType,
+        toColorSpace: ColorSpaceType,
+        resultType: Optional[type] = None,
+    ) -> ndarray:
+        return self._conversions[fromColorSpace][toColorSpace].convertArray(colors, resultType)
+
+
 if __name__ == '__main__':
+    from argparse import (
+        ArgumentParser,
+        Namespace,
+    )
+    from sys import exit
+    from numpy import (
+        abs as npabs,
+        isnan,
+        isfinite,
+        maximum,
+        rint,
+    )
+    from numpy.random import default_rng
+
+    parser: ArgumentParser = ArgumentParser('colorspace', description='Color space conversion graph')
+    parser.add_argument(
+        '-c', '--check',
+        action='store_true',
+        dest='check',
+        help='Verify convertArray against convert for all color space pairs.',
+    )
+    parser.add_argument(
+        '--calibrate',
+        action='store_true',
+        dest='calibrate',
+        help=f'Measure the edge costs on this machine and write them and the routes generated from them to the bundled {ColorSpace.EdgeCostsFile} and {ColorSpace.RoutesFile}.',
+    )
+    args: Namespace = parser.parse_args()
+
+    if args.calibrate:
+        costs: dict[tuple[ColorSpaceType, ColorSpaceType], tuple[float, float, float]] = ColorSpace.calibrateEdgeCosts()
+        for (edgeFrom, edgeTo), (scalarTime, arrayTime, roundTripError) in costs.items():
+            print(f"{edgeFrom.name} -> {edgeTo.name}: {scalarTime * 1e9:.0f} ns scalar, {arrayTime * 1e9:.1f} ns array, round trip error {roundTripError:.1e}")
+        ColorSpace.saveEdgeCosts(costs, Path(__file__).parent / ColorSpace.EdgeCostsFile)
+        routes = ColorSpace.buildRoutes(ColorSpace.Edges.keys(), ColorSpace.edgeWeights(costs))
+        ColorSpace.saveRoutes(routes, Path(__file__).parent / ColorSpace.RoutesFile)
+        changedRouteCount: int = sum(map(
+            lambda pair: routes[pair[0]][pair[1]] != ColorSpace.path(*pair),
+            ((fromColorSpace, toColorSpace) for fromColorSpace in ColorSpaceType for toColorSpace in ColorSpaceType),
+        ))
+        print(f"{changedRouteCount} routes changed.")
+        exit(0)
+
+    if args.check:
+        errored: bool = False
+
+        # The bundled route table must be the one generated from the bundled edge costs.
+        weights: dict[tuple[ColorSpaceType, ColorSpaceType], float] = ColorSpace.edgeWeights(ColorSpace.loadEdgeCosts())
+        if ColorSpace.Routes != ColorSpace.buildRoutes(ColorSpace.Edges.keys(), weights):
+            print(f"{ColorSpace.RoutesFile} is out of date with {ColorSpace.EdgeCostsFile}; regenerate both with --calibrate.")
+            errored = True
+
+        # Every route must be a chain of edges and have the minimal weight.
+        unreachable: float = float('inf')
+        distances: list[list[float]] = [[unreachable] * len(ColorSpaceType) for _ in ColorSpaceType]
+        for colorSpaceType in ColorSpaceType:
+            distances[colorSpaceType][colorSpaceType] = 0.
+        for (edgeFrom, edgeTo), weight in weights.items():
+            distances[edgeFrom][edgeTo] = weight
+        for via in ColorSpaceType:
+            for fromColorSpace in ColorSpaceType:
+                for toColorSpace in ColorSpaceType:
+                    distances[fromColorSpace][toColorSpace] = min(
+                        distances[fromColorSpace][toColorSpace],
+                        distances[fromColorSpace][via] + distances[via][toColorSpace],
+                    )
+        for fromColorSpace in ColorSpaceType:
+            for toColorSpace in ColorSpaceType:
+                route: tuple[ColorSpaceType, ...] = ColorSpace.path(fromColorSpace, toColorSpace)
+                if len(route) == 0 or route[0] != fromColorSpace or route[-1] != toColorSpace or \
+                    any(map(lambda edge: edge not in ColorSpace.Edges, pairwise(route))) or \
+                    sum(map(weights.get, pairwise(route))) > distances[fromColorSpace][toColorSpace] * (1. + 1e-9):
+                    print(f"{fromColorSpace.name} -> {toColorSpace.name}: invalid route {route}")
+                    errored = True
+
+        corpus: list[vec3] = list(map(
+            lambda components: vec3(*components),
+            default_rng(210).uniform(0.05, 0.95, (64, 3)),
+        ))
+        for fromColorSpace in ColorSpaceType:
+            inputs: list[vec3] = list(map(
+                lambda color: ColorSpace.convert(
+                    color,
+                    ColorSpaceType.SRGB,
+                    fromColorSpace,
+                    observer=Observer.TwoDegreesCIE1931,
+                    illuminant=Illuminant.D65,
+                ),
+                corpus,
+            ))
+            for toColorSpace in ColorSpaceType:
+                expected: ndarray = array(list(map(
+                    lambda color: ColorSpace.convert(
+                        color,
+                        fromColorSpace,
+                        toColorSpace,
+                        observer=Observer.TwoDegreesCIE1931,
+                        illuminant=Illuminant.D65,
+                    ),
+                    inputs,
+                )), dtype=float64)
+                actual: ndarray = ColorSpace.convertArray(
+                    array(inputs, dtype=float64),
+                    fromColorSpace,
+                    toColorSpace,
+                )
+                error: ndarray = npabs(actual - expected) / maximum(1., npabs(expected))
+                if (isnan(actual) != isnan(expected)).any() or (error[~isnan(error)] > ColorSpace.ArrayTolerance).any():
+                    print(f"{fromColorSpace.name} -> {toColorSpace.name}: max. relative error {error[~isnan(error)].max():.2e}")
+                    errored = True
+
+        # The 8 bit transfer function tables must match the exact computation.
+        codes: ndarray = arange(256, dtype=uint8)
+        if (ColorSpace.decodeSRGB8(codes) != ColorSpace.SRGBToLinearArray(codes / 255.)).any():
+            print("decodeSRGB8 differs from SRGBToLinearArray.")
+            errored = True
+        if (ColorSpace.encodeSRGB8(ColorSpace.decodeSRGB8(codes)) != codes).any():
+            print("encodeSRGB8 does not invert decodeSRGB8.")
+            errored = True
+        linear: ndarray = default_rng(210).uniform(-.1, 1.1, 1 << 20)
+        exact: ndarray = rint(clip(ColorSpace.linearToSRGBArray(clip(linear, 0., 1.)), 0., 1.) * 255.)
+        mismatches: int = int((ColorSpace.encodeSRGB8(linear) != exact).sum())
+        if mismatches != 0:
+            print(f"encodeSRGB8 differs from rounding linearToSRGBArray for {mismatches} of {len(linear)} values.")
+            errored = True
+        pixels: ndarray = default_rng(210).integers(0, 256, (4096, 3), dtype=uint8)
+        for toColorSpace in ColorSpaceType:
+            expected = ColorSpace.convertArray(pixels / 255., ColorSpaceType.SRGB, toColorSpace)
+            actual = ColorSpace.convertArray(pixels, ColorSpaceType.SRGB, toColorSpace)
+            error = npabs(actual - expected) / maximum(1., npabs(expected))
+            if (error[~isnan(error)] > ColorSpace.ArrayTolerance).any():
+                print(f"SRGB -> {toColorSpace.name}: uint8 input deviates by {error[~isnan(error)].max():.2e}")
+                errored = True
+            # Quantized output must equal rounding the float output.
+            quantized: ndarray = ColorSpace.convertArray(actual, toColorSpace, ColorSpaceType.SRGB, resultType=uint8)
+            rounded: ndarray = rint(clip(ColorSpace.convertArray(actual, toColorSpace, ColorSpaceType.SRGB), 0., 1.) * 255.)
+            valid: ndarray = isfinite(actual).all(axis=-1)
+            if (quantized[valid] != rounded[valid]).any():
+                print(f"{toColorSpace.name} -> SRGB: uint8 output differs for {int((quantized[valid] != rounded[valid]).any(axis=-1).sum())} colors")
+                errored = True
+
+        # Single precision contexts must stay in float32 and close to the double precision result.
+        singleContext: ConversionContext = ColorSpace.context(precision=ConversionPrecision.Single)
+        colors: ndarray = default_rng(210).uniform(0.05, 0.95, (4096, 3))
+        worstSingleError: float = 0.
+        for fromColorSpace in ColorSpaceType:
+            inputs = ColorSpace.convertArray(colors, ColorSpaceType.SRGB, fromColorSpace)
+            for toColorSpace in ColorSpaceType:
+                expected = ColorSpace.convertArray(inputs, fromColorSpace, toColorSpace)
+                actual = singleContext.convertArray(inputs, fromColorSpace, toColorSpace)
+                if actual.dtype != float32:
+                    print(f"{fromColorSpace.name} -> {toColorSpace.name}: single precision context computes in {actual.dtype}")
+                    errored = True
+                error = npabs(actual - expected) / maximum(1., npabs(expected))
+                worstSingleError = max(worstSingleError, float(error[~isnan(error)].max(initial=0.)))
+        if worstSingleError > ColorSpace.ArrayTolerance:
+            print(f"Single precision contexts deviate by up to {worstSingleError:.2e}")
+            errored = True
+
+        # Concurrent conversions through one shared context must give the serial results.
+        from concurrent.futures import ThreadPoolExecutor
+        chunks: list[ndarray] = list(default_rng(210).uniform(0., 1., (16, 1 << 14, 3)))
+        sharedContext: ConversionContext = ColorSpace.context(Observer.TenDegreesCIE1964, Illuminant.D50)
+        serial: list[ndarray] = [sharedContext.convertArray(chunk, ColorSpaceType.SRGB, ColorSpaceType.CIELuv) for chunk in chunks]
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            parallel: list[ndarray] = list(executor.map(
+                lambda chunk: ColorSpace.context(Observer.TenDegreesCIE1964, Illuminant.D50).convertArray(chunk, ColorSpaceType.SRGB, ColorSpaceType.CIELuv),
+                chunks,
+            ))
+        if any(map(lambda pair: not (pair[0] == pair[1]).all(), zip(serial, parallel))):
+            print("Concurrent conversions differ from serial conversions.")
+            errored = True
+        exit(1 if errored else 0)
+
     from matplotlib import pyplot
+    from networkx import (
+        DiGraph,
+        draw,
+    )
     labeldict = {}
     for colorSpaceType in ColorSpaceType:
         labeldict[colorSpaceType] = colorSpaceType.name
-    draw(ColorSpace.Graph, with_labels=True, labels=labeldict)
+    draw(DiGraph(ColorSpace.Edges.keys()), with_labels=True, labels=labeldict)
     pyplot.draw()
     pyplot.show()
 
@@ -53,8 +53,8 @@ from copy import deepcopy
 from glm import vec3
 from uuid import uuid4
 from .colorspace import ColorSpaceType, ColorSpace
+from .imagearray import ImageArray
 from random import uniform
-from tempfile import TemporaryDirectory
 from Pylette import extract_colors
 from rtoml import loads, dumps
 from .language import Language
@@ -63,6 +63,8 @@ from .model.settingsmodel import SettingsModel
 from .delegate.settingsdelegate import SettingsDelegate
 from .export import Export
 from .optimizationmodel import OptimizationModel
+from .fitscheduler import FitScheduler
+from .inversecolormap import InverseColorMap
 
 
 class Controller:
@@ -87,13 +89,17 @@ class Controller:
             ],
         )
 
-        self._gradientListModel: GradientListModel = GradientListModel()
+        self._fitScheduler: FitScheduler = FitScheduler()
+        self._fitScheduler.gradientFitted.connect(self._gradientFitted)
+        QApplication.instance().aboutToQuit.connect(self._fitScheduler.shutdown)
+
+        self._gradientListModel: GradientListModel = GradientListModel(fitScheduler=self._fitScheduler)
         self._gradientListModel.currentGradientChanged.connect(self._currentGradientChanged)
         self._gradientListModel.dataChanged.connect(self._gradientListDataChanged)
 
         self._gradientListDelegate: GradientListDelegate = GradientListDelegate()        
         
-        self._previewGradientListmodel: GradientListModel = GradientListModel()
+        self._previewGradientListmodel: GradientListModel = GradientListModel(fitScheduler=self._fitScheduler)
         self._mainWindow._ui.gradientPreviewTableView.setModel(self._previewGradientListmodel)
         self._mainWindow._ui.gradientPreviewTableView.setItemDelegate(self._gradientListDelegate)
 
@@ -145,6 +151,8 @@ class Controller:
         self._mainWindow._ui.actionImport_Palette.triggered.connect(self._importPalette)
         self._mainWindow._ui.actionExport_Palette.triggered.connect(self._exportPalette)
 
+        self._mainWindow._ui.actionExport_Weights.triggered.connect(self._exportWeights)
+
         self._mainWindow._ui.actionCopy.triggered.connect(self._copy)
 
         self.updateFromCmapFile()
@@ -191,6 +199,35 @@ class Controller:
                 },
             }, pretty=True))
 
+    def _exportWeights(self: Self) -> None:
+        """Map the current image back to amounts of the current gradient and save them.
+
+        The amounts go to a 16 bit grayscale PNG, how well each pixel matches the gradient to a
+        second one next to it, see InverseColorMap.confidence.
+        """
+        settings = QSettings()
+        filename, _ = QFileDialog.getSaveFileName(
+            None,
+            'Export weights...',
+            settings.value("export_weights_path", QDir.homePath()),
+            "PNG images (*.png)",
+        )
+
+        if filename == "":
+            return
+
+        if len(Path(filename).suffixes) == 0:
+            filename += '.png'
+
+        file_info = QFileInfo(filename)
+        settings.setValue("export_weights_path", file_info.absoluteDir().absolutePath())
+
+        gradient: ColorGradient = self._cmapFile._gradients[self._gradientListModel._currentIndex]
+        amounts, distances = gradient.inverseColorMap.mapImage(self._mainWindow._ui.picker._image)
+        path: Path = Path(filename)
+        ImageArray.toGrayscale16(amounts).save(str(path))
+        ImageArray.toGrayscale16(InverseColorMap.confidence(distances)).save(str(path.with_stem(f'{path.stem}_confidence')))
+
     def _importPalette(self: Self) -> None:
         settings = QSettings()
         filename, _ = QFileDialog.getOpenFileName(
@@ -212,7 +249,7 @@ class Controller:
         
         if suffix == '.toml':
             paletteObject: dict = loads(Path(filename).read_text())
-            self._cmapFile._gradients[self._gradientListModel._currentIndex]._colors = ColorSpace.SortByCIEH(list(map(
+            self._cmapFile._gradients[self._gradientListModel._currentIndex].colors = ColorSpace.SortByCIEH(list(map(
                 lambda colorList: vec3(*colorList),
                 paletteObject['palette']['colors'],
             )))
@@ -223,7 +260,8 @@ class Controller:
     def _removeColor(self: Self) -> None:
         if len(self._cmapFile._gradients[self._gradientListModel._currentIndex]._colors) <= 1:
             return
-        del self._cmapFile._gradients[self._gradientListModel._currentIndex]._colors[-1]
+        gradient: ColorGradient = self._cmapFile._gradients[self._gradientListModel._currentIndex]
+        gradient.colors = gradient.colors[:-1]
         index = min(
             self._gradientListModel._currentIndex,
             len(self._cmapFile._gradients[self._gradientListModel._currentIndex]._colors) - 1,
@@ -232,7 +270,8 @@ class Controller:
         self._gradientListModel.changeCurrent(index)
 
     def _addColor(self: Self) -> None:
-        self._cmapFile._gradients[self._gradientListModel._currentIndex]._colors.append(vec3(1,1,1))
+        gradient: ColorGradient = self._cmapFile._gradients[self._gradientListModel._currentIndex]
+        gradient.colors = gradient.colors + [vec3(1,1,1)]
         index = self._gradientListModel._currentIndex
         self.updateFromCmapFile()
         self._gradientListModel.changeCurrent(index)
@@ -290,6 +329,9 @@ class Controller:
             self._mainWindow._ui.picker.setImage(self._imageListModel._imageList[index.row()])
 
     def _updateGradientPreview(self: Self) -> None:
+        # The previews are recreated from the current gradient; pending fits of the old ones are moot.
+        for previewGradient in self._previewGradientListmodel._gradientList:
+            self._fitScheduler.cancel(previewGradient)
         previewGradientList: list[ColorGradient] = list(map(
             lambda colorspaces: self._gradientListModel.copyCurrentGradientWithColorSpaces(*colorspaces),
             self._cmapFile._previewColorSpaces,
@@ -305,7 +347,12 @@ class Controller:
         if Qt.ItemDataRole.EditRole in roles:
             self._gradientListModel.updateCurrentGradient()
             self._updateGradientPreview()
-            self._mainWindow._plot.loadGradient(self._gradientListModel._gradientList[self._gradientListModel._currentIndex])
+
+    def _gradientFitted(self: Self, gradient: ColorGradient) -> None:
+        gradientList: list[ColorGradient] = self._gradientListModel._gradientList
+        if self._gradientListModel._currentIndex < len(gradientList) and gradient is gradientList[self._gradientListModel._currentIndex]:
+            self._gradientPropertyModel.fitReportChanged()
+            self._mainWindow._plot.loadGradient(gradient)
 
     def _gradientListDataChanged(self: Self, topLeft: QModelIndex, bottomRight: QModelIndex, roles: list[Qt.ItemDataRole]):
         if Qt.ItemDataRole.EditRole in roles: 
@@ -361,26 +408,24 @@ class Controller:
         self._cmapFile.save(Path(filename))
 
     def extractPalette(self: Self) -> None:
-        with TemporaryDirectory() as directory:
-            imagePath: Path = Path(directory) / 'image.jpg'
-            self._mainWindow._ui.picker._image.save(str(imagePath))
-            palette = extract_colors(
-                image=str(Path(directory) / 'image.jpg'),
-                palette_size=len(self._cmapFile._gradients[self._gradientListModel._currentIndex]._colors),
-                resize=False,
-                # mode='MC',
-                mode='KM',
-                sort_mode='luminance',
-            )
-            palette = list(map(
-                lambda color: vec3(*color.rgb) / 255.,
-                palette,
-            ))
-            palette = ColorSpace.SortByCIEH(palette)
-            self._cmapFile._gradients[self._gradientListModel._currentIndex]._colors = palette
-            index = self._gradientListModel._currentIndex
-            self.updateFromCmapFile()
-            self._gradientListModel.changeCurrent(index)
+        # Pylette takes arrays directly, which saves the lossy round trip through a JPEG on disk.
+        palette = extract_colors(
+            image=ImageArray.rgb8(self._mainWindow._ui.picker._image),
+            palette_size=len(self._cmapFile._gradients[self._gradientListModel._currentIndex]._colors),
+            resize=False,
+            # mode='MC',
+            mode='KM',
+            sort_mode='luminance',
+        )
+        palette = list(map(
+            lambda color: vec3(*color.rgb) / 255.,
+            palette,
+        ))
+        palette = ColorSpace.SortByCIEH(palette)
+        self._cmapFile._gradients[self._gradientListModel._currentIndex].colors = palette
+        index = self._gradientListModel._currentIndex
+        self.updateFromCmapFile()
+        self._gradientListModel.changeCurrent(index)
 
     def _cmapPasted(self: Self, cmap: list[vec3]) -> None:
         print(cmap)
@@ -410,7 +455,7 @@ class Controller:
                 ),
             ))
         # colors = ColorSpace.SortByCIEH(colors)
-        self._cmapFile._gradients[self._gradientListModel._currentIndex]._colors = colors
+        self._cmapFile._gradients[self._gradientListModel._currentIndex].colors = colors
         index = self._gradientListModel._currentIndex
         self.updateFromCmapFile()
         self._gradientListModel.changeCurrent(index)
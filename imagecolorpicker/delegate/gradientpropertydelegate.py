@@ -25,6 +25,7 @@ from ..colorspace import ColorSpaceType
 from ..colorgradient import (
     Observer,
     FitAlgorithm,
+    FitLoss,
     FitModel,
     Illuminant,
     Wraparound,
@@ -73,4 +74,6 @@ class GradientPropertyDelegate(QStyledItemDelegate):
                 return self.enumComboBox(parent, index, Observer)
             elif rowType == GradientPropertyRowType.FitAlgorithm:
                 return self.enumComboBox(parent, index, FitAlgorithm)
+            elif rowType == GradientPropertyRowType.FitLoss:
+                return self.enumComboBox(parent, index, FitLoss)
         return super().createEditor(parent, option, index)
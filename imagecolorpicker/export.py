@@ -19,7 +19,10 @@ from glm import ceil, sqrt
 from functools import reduce
 from PyQt6.QtGui import QColor
 from json import dumps
-from numpy import pi
+from numpy import (
+    pi,
+    linspace,
+)
 
 
 class Export:
@@ -49,6 +52,8 @@ class Export:
         gradientList: list[ColorGradient],
         selectedColor: vec3,
     ) -> Optional[Union[ByteString, str]]:
+        # Exports need fits of the current state, also while background fits are pending.
+        ColorGradient.fitMany(gradientList if representation == Representation.ColorMaps else [selectedGradient])
         if language == Language.GLSL:
             if representation == Representation.ColorMap:
                 cmap: list[vec3] = selectedGradient.coefficients
@@ -95,10 +100,10 @@ class Export:
             elif representation == Representation.Weights:
                 weightSlide = ',\n    '.join(list(map(
                     lambda weight: f'{weight:.2f}',
-                    selectedGradient._weights,
+                    selectedGradient.weights,
                 )))
                 name: str = Export.MakeIdentifier(selectedGradient._name)
-                return f'const int {name}_weight_count = {len(selectedGradient._weights)};\nconst float {name}_weights[] = float[](\n    {weightSlide}\n);\n'
+                return f'const int {name}_weight_count = {len(selectedGradient.weights)};\nconst float {name}_weights[] = float[](\n    {weightSlide}\n);\n'
             elif representation == Representation.ColorMaps:
                 cmaps: list[list[vec3]] = reduce(
                     lambda accumulator, addition: accumulator + addition,
@@ -158,10 +163,10 @@ class Export:
             elif representation == Representation.Weights:
                 weightSlide = ',\n    '.join(list(map(
                     lambda weight: f'{weight:.2f}',
-                    selectedGradient._weights,
+                    selectedGradient.weights,
                 )))
                 name: str = Export.MakeIdentifier(selectedGradient._name)
-                return f'const int {name}_weight_count = {len(selectedGradient._weights)};\nconst float {name}_weights[] = {{\n    {weightSlide}\n}};\n'
+                return f'const int {name}_weight_count = {len(selectedGradient.weights)};\nconst float {name}_weights[] = {{\n    {weightSlide}\n}};\n'
             elif representation == Representation.ColorMaps:
                 cmaps: list[list[vec3]] = reduce(
                     lambda accumulator, addition: accumulator + addition,
@@ -197,10 +202,7 @@ class Export:
                     return f'const int gradient_count = {len(gradientList)};\nconst int all_cmap_coefficient_count = {len(cmaps)};\nconst int offsets_per_cmap[] = {{\n    {offsetSlide}\n}};\nconst float3 all_cmap_coefficients[] = {{\n    {coefficientSlide}\n}};\nfloat3 cmap(float t, int index) {{\n    float3 a = all_cmap_coefficients[offsets_per_cmap[index + 1] - 1];\n    for(int i = offsets_per_cmap[index + 1] - 2; i >= offsets_per_cmap[index]; --i) {{\n        a = all_cmap_coefficients[i] + t * a;\n    }}\n    return a;\n}}'
         elif language == Language.CSS:
             if representation == Representation.ColorMap:
-                colorStops = list(map(
-                    lambda amount: selectedGradient.evaluateFit(float(amount) / 100.),
-                    list(map(float, range(101))),
-                ))
+                colorStops = selectedGradient.evaluateFitMany(linspace(0., 1., 101))
                 colorSlide: str = ', '.join(map(
                     lambda colorStop: f'{QColor.fromRgbF(*colorStop).name()}',
                     colorStops,
@@ -211,10 +213,7 @@ class Export:
         elif language == Language.SVG:
             if representation == Representation.ColorMap:
                 amounts = list(map(float, range(101)))
-                colorStops = list(map(
-                    lambda amount: selectedGradient.evaluateFit(float(amount) / 100.),
-                    amounts,
-                ))
+                colorStops = selectedGradient.evaluateFitMany(linspace(0., 1., 101))
                 colorSlide: str = '\n  '.join(map(
                     lambda stopIndex: f'<stop stop-color="{QColor.fromRgbF(*colorStops[stopIndex]).name()}" offset="{int(amounts[stopIndex])}%" />',
                     range(len(amounts)),
@@ -245,10 +244,7 @@ class Export:
         elif language == Language.CablesJSON:
             if representation == Representation.ColorMap:
                 amounts = list(map(float, range(101)))
-                colorStops = list(map(
-                    lambda amount: selectedGradient.evaluateFit(float(amount) / 100.),
-                    amounts,
-                ))
+                colorStops = selectedGradient.evaluateFitMany(linspace(0., 1., 101))
                 return dumps({
                     "ops": [
                         {
@@ -262,9 +258,9 @@ class Export:
                                         "keys": list(map(
                                             lambda stopIndex: {
                                                 "pos": amounts[stopIndex] / 100.,
-                                                "r": colorStops[stopIndex].x,
-                                                "g": colorStops[stopIndex].y,
-                                                "b": colorStops[stopIndex].z,
+                                                "r": colorStops[stopIndex, 0],
+                                                "g": colorStops[stopIndex, 1],
+                                                "b": colorStops[stopIndex, 2],
                                                 "a": 1,
                                             },
                                             range(len(amounts)),
@@ -0,0 +1,241 @@
+from typing import Optional
+from collections import OrderedDict
+from hashlib import md5
+from pathlib import Path
+from threading import Lock
+from os import replace
+from tempfile import NamedTemporaryFile
+from numpy import (
+    ndarray,
+    load,
+    savez,
+)
+from .cachelocation import CacheLocation
+
+
+class FitCache:
+    """Content-addressed cache of fit results, in memory and on disk.
+
+    Entries are dicts of arrays, keyed by a hash of everything the fit depends on, see key().
+    The memory tier is an LRU bounded by the bytes of its arrays, the disk tier lives in the
+    user cache directory and drops the least recently used files beyond its byte limit.
+
+    Only put deterministic results: the key covers the inputs of a fit, not its history, so
+    fits warm-started from a previous fit do not belong here.
+    Files are written under a temporary name and renamed into place, so that concurrent
+    readers in other threads and processes never see them half written.
+    """
+
+    # Bump when the fitting changes, so results of older versions are not picked up.
+    Version: int = 4
+    CacheSubdirectory: str = 'fit'
+    MemoryByteLimit: int = 8 << 20
+    DiskByteLimit: int = 32 << 20
+    DiskEnabled: bool = True
+
+    _Entries: OrderedDict[str, dict[str, ndarray]] = OrderedDict()
+    _MemoryByteCount: int = 0
+    _MemoryHitCount: int = 0
+    _DiskHitCount: int = 0
+    _MissCount: int = 0
+    # Bytes of the cache files, seeded from one scan of the directory when first needed and kept
+    # up to date by put. Other processes sharing the directory are accounted for when evicting.
+    _DiskByteCount: Optional[int] = None
+    # Fits run in worker threads, see FitScheduler.
+    _Lock: Lock = Lock()
+
+    @staticmethod
+    def key(*parts: ndarray | str | int) -> str:
+        """Stable hash of the parts; arrays contribute their type, shape and bytes, all others their repr."""
+        digest = md5(f'v{FitCache.Version}'.encode())
+        for part in parts:
+            if isinstance(part, ndarray):
+                digest.update(f'{part.dtype.str}{part.shape}'.encode())
+                digest.update(part.tobytes())
+            else:
+                digest.update(repr(part).encode())
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    @staticmethod
+    def path(key: str) -> Path:
+        return CacheLocation.directory(FitCache.CacheSubdirectory) / f'v{FitCache.Version}_{key}.npz'
+
+    @staticmethod
+    def get(key: str) -> Optional[dict[str, ndarray]]:
+        """The entry for key, or None. The arrays are shared; callers must not modify them."""
+        with FitCache._Lock:
+            entry: Optional[dict[str, ndarray]] = FitCache._Entries.get(key)
+            if entry is not None:
+                FitCache._Entries.move_to_end(key)
+                FitCache._MemoryHitCount += 1
+                return entry
+
+        if FitCache.DiskEnabled:
+            path: Path = FitCache.path(key)
+            if path.exists():
+                try:
+                    with load(path) as archive:
+                        entry = dict(archive)
+                    # Refresh the modification time, which orders the disk eviction.
+                    path.touch()
+                except Exception:
+                    # Whatever is wrong with the file, e.g. a truncated zip, the fit is redone.
+                    entry = None
+                    FitCache._unlink(path)
+            if entry is not None:
+                with FitCache._Lock:
+                    FitCache._DiskHitCount += 1
+                FitCache._remember(key, entry)
+                return entry
+
+        with FitCache._Lock:
+            FitCache._MissCount += 1
+        return None
+
+    @staticmethod
+    def put(key: str, entry: dict[str, ndarray]) -> None:
+        FitCache._remember(key, entry)
+        if not FitCache.DiskEnabled:
+            return
+        path: Path = FitCache.path(key)
+        temporaryPath: Optional[Path] = None
+        try:
+            with NamedTemporaryFile(dir=path.parent, prefix=f'{path.stem}_', suffix='.tmp', delete=False) as file:
+                temporaryPath = Path(file.name)
+                savez(file, **entry)
+                byteCount: int = file.tell()
+            replacedByteCount: int = FitCache._fileByteCount(path)
+            replace(temporaryPath, path)
+            if FitCache._countDiskBytes(byteCount - replacedByteCount) > FitCache.DiskByteLimit:
+                FitCache._evictDisk()
+        except OSError:
+            if temporaryPath is not None:
+                temporaryPath.unlink(missing_ok=True)
+
+    @staticmethod
+    def _remember(key: str, entry: dict[str, ndarray]) -> None:
+        with FitCache._Lock:
+            if key in FitCache._Entries:
+                FitCache._Entries.move_to_end(key)
+                return
+            FitCache._Entries[key] = entry
+            FitCache._MemoryByteCount += FitCache._byteCount(entry)
+            while FitCache._MemoryByteCount > FitCache.MemoryByteLimit and len(FitCache._Entries) > 1:
+                _, evicted = FitCache._Entries.popitem(last=False)
+                FitCache._MemoryByteCount -= FitCache._byteCount(evicted)
+
+    @staticmethod
+    def _byteCount(entry: dict[str, ndarray]) -> int:
+        return sum(map(lambda array: array.nbytes, entry.values()))
+
+    @staticmethod
+    def _fileByteCount(path: Path) -> int:
+        try:
+            return path.stat().st_size
+        except OSError:
+            return 0
+
+    @staticmethod
+    def _countDiskBytes(byteCount: int) -> int:
+        """Add byteCount to the running total of the cache files and return the new total.
+
+        The first call scans the directory instead, which already reflects the change.
+        """
+        with FitCache._Lock:
+            if FitCache._DiskByteCount is None:
+                FitCache._DiskByteCount = sum(map(
+                    FitCache._fileByteCount,
+                    CacheLocation.directory(FitCache.CacheSubdirectory).glob('*.npz'),
+                ))
+            else:
+                FitCache._DiskByteCount += byteCount
+            return FitCache._DiskByteCount
+
+    @staticmethod
+    def _unlink(path: Path) -> None:
+        byteCount: int = FitCache._fileByteCount(path)
+        path.unlink(missing_ok=True)
+        FitCache._countDiskBytes(-byteCount)
+
+    @staticmethod
+    def _evictDisk() -> None:
+        """Delete the least recently used files until the cache fits its byte limit.
+
+        Only called once the running total exceeds the limit; the scan also picks up the files
+        other processes wrote and deleted in the meantime.
+        """
+        files: list[tuple[float, int, Path]] = []
+        for path in CacheLocation.directory(FitCache.CacheSubdirectory).glob('*.npz'):
+            try:
+                status = path.stat()
+            except OSError:
+                continue
+            files.append((status.st_mtime, status.st_size, path))
+        files.sort(key=lambda file: file[0])
+        byteCount: int = sum(map(lambda file: file[1], files))
+        for _, size, path in files:
+            if byteCount <= FitCache.DiskByteLimit:
+                break
+            path.unlink(missing_ok=True)
+            byteCount -= size
+        with FitCache._Lock:
+            FitCache._DiskByteCount = byteCount
+
+    @staticmethod
+    def statistics() -> dict[str, int]:
+        """Hit and miss counts and the size of the memory tier, for diagnostics."""
+        with FitCache._Lock:
+            return {
+                'memory_hits': FitCache._MemoryHitCount,
+                'disk_hits': FitCache._DiskHitCount,
+                'misses': FitCache._MissCount,
+                'entries': len(FitCache._Entries),
+                'bytes': FitCache._MemoryByteCount,
+            }
+
+    @staticmethod
+    def clear(disk: bool = False) -> None:
+        """Empty the memory tier and reset the counters; with disk, delete the cache files, too."""
+        with FitCache._Lock:
+            FitCache._Entries.clear()
+            FitCache._MemoryByteCount = 0
+            FitCache._MemoryHitCount = 0
+            FitCache._DiskHitCount = 0
+            FitCache._MissCount = 0
+        if disk:
+            for path in CacheLocation.directory(FitCache.CacheSubdirectory).glob('*.npz'):
+                path.unlink(missing_ok=True)
+            with FitCache._Lock:
+                FitCache._DiskByteCount = 0
+
+
+if __name__ == '__main__':
+    from argparse import ArgumentParser
+    from time import perf_counter
+    from .colorgradient import (
+        ColorGradient,
+        DefaultGradient1,
+        DefaultGradient2,
+        FitModel,
+        # Run as a script, this module is __main__; the gradients use the cache of the package.
+        FitCache,
+    )
+
+    parser: ArgumentParser = ArgumentParser('fitcache', description='Show the effect of the fit cache.')
+    parser.add_argument('--clear', dest='clear', action='store_true', help='Delete the cached fits on disk first.')
+    args = parser.parse_args()
+
+    if args.clear:
+        FitCache.clear(disk=True)
+
+    for model in FitModel:
+        for gradient in [DefaultGradient1, DefaultGradient2]:
+            info: dict = gradient.toDict()
+            info['model'] = model.name
+            for _ in range(2):
+                start: float = perf_counter()
+                fitted: ColorGradient = ColorGradient.fromDict(info)
+                fitted.coefficients
+                print(f"{gradient._name}, {model.name}: {(perf_counter() - start) * 1e3:.2f} ms, {fitted.fitReport}")
+    print(FitCache.statistics())
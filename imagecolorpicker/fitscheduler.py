@@ -0,0 +1,177 @@
+from typing import (
+    Self,
+    Optional,
+)
+from copy import deepcopy
+from traceback import print_exc
+from weakref import WeakKeyDictionary
+from PyQt6.QtCore import (
+    QObject,
+    QRunnable,
+    QThreadPool,
+    pyqtSignal,
+    pyqtBoundSignal,
+)
+from .colorgradient import ColorGradient
+
+
+class FitJob(QRunnable):
+    """Fits a snapshot of a gradient, so the worker never touches the gradient the GUI reads."""
+
+    def __init__(
+        self: Self,
+        finished: pyqtBoundSignal,
+        gradient: ColorGradient,
+        revision: int,
+    ) -> None:
+        super().__init__()
+        self._finished: pyqtBoundSignal = finished
+        self._gradient: ColorGradient = gradient
+        self._snapshot: ColorGradient = deepcopy(gradient)
+        self._revision: int = revision
+        self._cancelled: bool = False
+
+    @property
+    def revision(self: Self) -> int:
+        return self._revision
+
+    def cancel(self: Self) -> None:
+        """Skip the fit if the job did not start yet."""
+        self._cancelled = True
+
+    def run(self: Self) -> None:
+        if self._cancelled:
+            return
+        try:
+            self._snapshot._update()
+        except Exception:
+            print_exc()
+            # Without a snapshot; the scheduler still has to drop the job.
+            self._finished.emit(self._gradient, self._revision, None)
+            return
+        # Queued to the thread of the scheduler, i.e. the GUI thread.
+        self._finished.emit(self._gradient, self._revision, self._snapshot)
+
+
+class FitScheduler(QObject):
+    """Runs gradient fits in a thread pool instead of the GUI thread.
+
+    Every schedule tags the job with a new revision of the gradient. Jobs of older revisions that
+    did not start yet are skipped, results of older revisions that were already running are
+    dropped. Until the fit of the latest revision arrives, the gradient keeps its
+    previous coefficients; if that fit fails, it keeps them for good and fitFailed is emitted.
+    """
+
+    gradientFitted: pyqtSignal = pyqtSignal(ColorGradient)
+    fitFailed: pyqtSignal = pyqtSignal(ColorGradient)
+    _jobFinished: pyqtSignal = pyqtSignal(object, int, object)
+
+    def __init__(
+        self: Self,
+        parent: Optional[QObject] = None,
+    ) -> None:
+        super().__init__(parent)
+        self._threadPool: QThreadPool = QThreadPool(self)
+        self._revisions: WeakKeyDictionary[ColorGradient, int] = WeakKeyDictionary()
+        self._pendingJobs: dict[ColorGradient, FitJob] = {}
+        self._jobFinished.connect(self._finish)
+
+    def schedule(self: Self, gradient: ColorGradient) -> int:
+        """Queue a fit of the current state of the gradient and return its revision."""
+        revision: int = self.cancel(gradient)
+        # The GUI keeps showing the previous fit instead of refitting on its thread.
+        gradient.deferFit()
+        job: FitJob = FitJob(self._jobFinished, gradient, revision)
+        self._pendingJobs[gradient] = job
+        self._threadPool.start(job)
+        return revision
+
+    def cancel(self: Self, gradient: ColorGradient) -> int:
+        """Supersede all scheduled fits of the gradient; returns the new revision."""
+        revision: int = self._revisions.get(gradient, 0) + 1
+        self._revisions[gradient] = revision
+        pendingJob: Optional[FitJob] = self._pendingJobs.pop(gradient, None)
+        if pendingJob is not None:
+            pendingJob.cancel()
+        return revision
+
+    def isPending(self: Self, gradient: ColorGradient) -> bool:
+        return gradient in self._pendingJobs
+
+    def waitForDone(self: Self, msecs: int = -1) -> bool:
+        """Wait for the running fits. Their results are delivered once the event loop runs."""
+        return self._threadPool.waitForDone(msecs)
+
+    def shutdown(self: Self) -> None:
+        for gradient in list(self._pendingJobs.keys()):
+            self.cancel(gradient)
+        self._threadPool.waitForDone()
+
+    def _finish(self: Self, gradient: ColorGradient, revision: int, snapshot: Optional[ColorGradient]) -> None:
+        if self._revisions.get(gradient) != revision:
+            return
+        del self._pendingJobs[gradient]
+        if snapshot is None:
+            self.fitFailed.emit(gradient)
+            return
+        gradient.adoptFit(snapshot)
+        self.gradientFitted.emit(gradient)
+
+
+if __name__ == '__main__':
+    from argparse import ArgumentParser
+    from time import perf_counter
+    from glm import vec3
+    from PyQt6.QtCore import QCoreApplication
+    from .colorgradient import (
+        DefaultGradient1,
+        FitModel,
+        FitReport,
+    )
+
+    parser: ArgumentParser = ArgumentParser('fitscheduler', description='Fit gradients in the background.')
+    parser.add_argument('-c', '--check', dest='check', action='store_true', help='Check that only the latest revision is applied.')
+    args = parser.parse_args()
+
+    scheduler: FitScheduler = FitScheduler()
+    gradient: ColorGradient = deepcopy(DefaultGradient1)
+    gradient.model = FitModel.Fourier
+    gradient.coefficients
+    fitted: list[ColorGradient] = []
+    scheduler.gradientFitted.connect(fitted.append)
+
+    start: float = perf_counter()
+    for step in range(8):
+        gradient.setColor(2, gradient.colors[2] + vec3(.01, -.01, .005))
+        revision: int = scheduler.schedule(gradient)
+    # What the last job fits, fitted synchronously for comparison.
+    expected: ColorGradient = deepcopy(gradient)
+    # Until the result arrives, repaints show the previous fit instead of refitting on this thread.
+    previousReport: FitReport = gradient.fitReport
+    gradient.linearGradient(0, 100)
+    deferred: bool = gradient.fitStale and gradient.fitReport is previousReport
+    print(f"Scheduled {revision} revisions in {(perf_counter() - start) * 1e3:.1f} ms.")
+    while scheduler.isPending(gradient):
+        scheduler.waitForDone()
+        QCoreApplication.processEvents()
+    print(f"Applied {len(fitted)} fit(s) after {(perf_counter() - start) * 1e3:.1f} ms: {gradient.fitReport}")
+
+    # A fit that raises must not leave the gradient pending forever.
+    failedFits: list[ColorGradient] = []
+    scheduler.fitFailed.connect(failedFits.append)
+    previousCoefficients: list[vec3] = gradient.coefficients
+    fit = ColorGradient.fit
+    ColorGradient.fit = lambda self, *args, **kwargs: 1 / 0
+    gradient.setColor(2, gradient.colors[2] + vec3(.01, -.01, .005))
+    scheduler.schedule(gradient)
+    scheduler.waitForDone()
+    QCoreApplication.processEvents()
+    ColorGradient.fit = fit
+    print(f"Failed fits: {len(failedFits)}, still pending: {scheduler.isPending(gradient)}")
+
+    if args.check:
+        expected._update()
+        failed: bool = len(fitted) != 1 or previousCoefficients != expected.coefficients or \
+            not deferred or len(failedFits) != 1 or scheduler.isPending(gradient)
+        print("Failed." if failed else "Only the latest revision was applied; failed fits were dropped.")
+        exit(1 if failed else 0)
@@ -0,0 +1,215 @@
+from typing import (
+    Self,
+    Iterator,
+)
+from sys import byteorder
+from numpy import (
+    ndarray,
+    dtype,
+    uint8,
+    uint16,
+    float32,
+    float64,
+    frombuffer,
+    broadcast_to,
+    empty,
+    ascontiguousarray,
+)
+from PyQt6.QtGui import QImage
+from .colorspace import (
+    ColorSpace,
+    ColorSpaceConversion,
+    ColorSpaceType,
+    Observer,
+    Illuminant,
+)
+
+
+class ImageArray:
+    # Pixels converted per chunk. Bounds the float64 temporaries to a few MB independent of the image size.
+    ChunkPixelCount: int = 1 << 18
+
+    # 32 bit formats store 0xAARRGGBB as native integers, so the byte order in memory depends on the machine.
+    _ARGB32Channels: tuple[int, int, int] = (2, 1, 0) if byteorder == 'little' else (1, 2, 3)
+
+    # Format -> (component type, components per pixel, indices of the red, green and blue components).
+    # Grayscale formats have a single component that is broadcast to all three channels.
+    Layouts: dict[QImage.Format, tuple[type, int, tuple[int, ...]]] = {
+        QImage.Format.Format_RGB32: (uint8, 4, _ARGB32Channels),
+        QImage.Format.Format_ARGB32: (uint8, 4, _ARGB32Channels),
+        QImage.Format.Format_RGB888: (uint8, 3, (0, 1, 2)),
+        QImage.Format.Format_BGR888: (uint8, 3, (2, 1, 0)),
+        QImage.Format.Format_RGBX8888: (uint8, 4, (0, 1, 2)),
+        QImage.Format.Format_RGBA8888: (uint8, 4, (0, 1, 2)),
+        QImage.Format.Format_Grayscale8: (uint8, 1, (0,)),
+        QImage.Format.Format_Grayscale16: (uint16, 1, (0,)),
+        QImage.Format.Format_RGBX64: (uint16, 4, (0, 1, 2)),
+        QImage.Format.Format_RGBA64: (uint16, 4, (0, 1, 2)),
+    }
+
+    @staticmethod
+    def normalized(image: QImage) -> QImage:
+        """The image itself if its format has a layout, a converted copy otherwise.
+
+        Premultiplied, indexed and packed formats are converted to ARGB32 or, if they have more
+        than 8 bits per component, to RGBA64.
+        """
+        if image.format() in ImageArray.Layouts:
+            return image
+        return image.convertToFormat(
+            QImage.Format.Format_RGBA64 if image.depth() > 32 else QImage.Format.Format_ARGB32,
+        )
+
+    @staticmethod
+    def view(image: QImage, writeable: bool = False) -> ndarray:
+        """Strided view on the pixel memory of shape (height, width, components), without copying.
+
+        The view is only valid while the image is alive and unmodified. Requesting a writeable
+        view detaches the image from implicitly shared copies, like QImage.bits() does.
+        """
+        componentType, componentCount, _ = ImageArray.Layouts[image.format()]
+        bits = image.bits() if writeable else image.constBits()
+        bits.setsize(image.sizeInBytes())
+        itemSize: int = dtype(componentType).itemsize
+        # Scan lines are padded to 32 bit boundaries; drop the padding before splitting into pixels.
+        return frombuffer(bits, dtype=componentType) \
+            .reshape(image.height(), image.bytesPerLine() // itemSize)[:, :image.width() * componentCount] \
+            .reshape(image.height(), image.width(), componentCount)
+
+    @staticmethod
+    def rgb(image: QImage) -> ndarray:
+        """Read-only view of shape (height, width, 3) on the red, green and blue components.
+
+        Zero-copy for all formats in Layouts. Other formats are converted, and the result is
+        copied out of the temporary image before it is released.
+        """
+        normalizedImage: QImage = ImageArray.normalized(image)
+        _, _, channels = ImageArray.Layouts[normalizedImage.format()]
+        pixels: ndarray = ImageArray.view(normalizedImage)
+        if len(channels) == 1:
+            pixels = broadcast_to(pixels, pixels.shape[:-1] + (3,))
+        elif channels == (2, 1, 0):
+            pixels = pixels[..., 2::-1]
+        else:
+            pixels = pixels[..., channels[0]:channels[0] + 3]
+        return pixels if normalizedImage is image else pixels.copy()
+
+    @staticmethod
+    def rgb8(image: QImage) -> ndarray:
+        """Contiguous 8 bit copy of shape (height, width, 3), as expected by PIL and most image libraries."""
+        pixels: ndarray = ImageArray.rgb(image)
+        if pixels.dtype != uint8:
+            pixels = (pixels >> 8).astype(uint8)
+        return ascontiguousarray(pixels)
+
+    @staticmethod
+    def scale(image: QImage) -> float:
+        """Maximum component value of the image after normalization."""
+        componentType, _, _ = ImageArray.Layouts[ImageArray.normalized(image).format()]
+        return float((1 << (8 * dtype(componentType).itemsize)) - 1)
+
+    @staticmethod
+    def chunks(
+        image: QImage,
+        toColorSpace: ColorSpaceType = ColorSpaceType.SRGB,
+        observer: Observer = Observer.TwoDegreesCIE1931,
+        illuminant: Illuminant = Illuminant.D65,
+        resultType: type = float64,
+    ) -> Iterator[tuple[slice, ndarray]]:
+        """Convert the image row block by row block.
+
+        Yields the row slice and the colors of shape (rows, width, 3) in the target color space,
+        so whole-image statistics never need the full image in floating point.
+        """
+        image = ImageArray.normalized(image)
+        pixels: ndarray = ImageArray.rgb(image)
+        scale: float = ImageArray.scale(image)
+        rowCount: int = max(1, ImageArray.ChunkPixelCount // max(1, image.width()))
+        conversion: ColorSpaceConversion = ColorSpace.compile(ColorSpaceType.SRGB, toColorSpace, observer, illuminant)
+        for firstRow in range(0, image.height(), rowCount):
+            rows: slice = slice(firstRow, min(firstRow + rowCount, image.height()))
+            # 8 bit pixels go through the sRGB decode table of the conversion as they are.
+            colors: ndarray = pixels[rows]
+            if colors.dtype != uint8:
+                colors = colors / scale
+            yield rows, conversion.convertArray(colors, resultType)
+
+    @staticmethod
+    def convert(
+        image: QImage,
+        toColorSpace: ColorSpaceType = ColorSpaceType.SRGB,
+        observer: Observer = Observer.TwoDegreesCIE1931,
+        illuminant: Illuminant = Illuminant.D65,
+        resultType: type = float32,
+    ) -> ndarray:
+        """Colors of all pixels in the target color space, shape (height, width, 3)."""
+        result: ndarray = empty((image.height(), image.width(), 3), dtype=resultType)
+        for rows, colors in ImageArray.chunks(image, toColorSpace, observer, illuminant, resultType if dtype(resultType) == uint8 else float64):
+            result[rows] = colors
+        return result
+
+    @staticmethod
+    def toImage(colors: ndarray) -> QImage:
+        """RGB888 image owning a copy of an sRGB array of shape (height, width, 3).
+
+        Integer arrays are taken as 8 bit components, floating point arrays are clamped to [0, 1].
+        """
+        if colors.dtype != uint8:
+            colors = (colors.clip(0., 1.) * 255. + .5).astype(uint8)
+        colors = ascontiguousarray(colors)
+        height, width, _ = colors.shape
+        # QImage does not take ownership of the buffer; copy() detaches it before colors goes away.
+        return QImage(colors.data, width, height, 3 * width, QImage.Format.Format_RGB888).copy()
+
+    @staticmethod
+    def toGrayscale16(values: ndarray) -> QImage:
+        """Grayscale16 image owning a copy of an array of shape (height, width) with values in [0, 1]."""
+        values = ascontiguousarray((values.clip(0., 1.) * 65535. + .5).astype(uint16))
+        height, width = values.shape
+        return QImage(values.data, width, height, 2 * width, QImage.Format.Format_Grayscale16).copy()
+
+
+if __name__ == '__main__':
+    from argparse import ArgumentParser
+    from importlib.resources import files
+    from time import perf_counter
+    from numpy import (
+        array,
+        abs as npabs,
+    )
+    from numpy.random import default_rng
+    from .widgets import pickablecolorlabel
+
+    parser: ArgumentParser = ArgumentParser('imagearray', description='Check the QImage to NumPy bridge.')
+    parser.add_argument('-c', '--check', dest='check', action='store_true', help='Compare the views to QImage.pixelColor.')
+    args = parser.parse_args()
+
+    image: QImage = QImage(str(files(pickablecolorlabel) / 'default.png'))
+    if args.check:
+        failed: bool = False
+        generator = default_rng(210)
+        # Odd width, so that the 24 and 8 bit formats have padded scan lines.
+        source: QImage = image.copy(0, 0, 37, 23)
+        for imageFormat in [*ImageArray.Layouts.keys(), QImage.Format.Format_ARGB32_Premultiplied, QImage.Format.Format_Indexed8]:
+            converted: QImage = source.convertToFormat(imageFormat)
+            pixels: ndarray = ImageArray.rgb(converted)
+            scale: float = ImageArray.scale(converted)
+            for _ in range(64):
+                x, y = int(generator.integers(converted.width())), int(generator.integers(converted.height()))
+                color = converted.pixelColor(x, y)
+                expected: ndarray = array([color.redF(), color.greenF(), color.blueF()])
+                if npabs(pixels[y, x] / scale - expected).max() > 1. / 255.:
+                    print(f"{imageFormat.name} at ({x}, {y}): {pixels[y, x] / scale} vs. {expected}")
+                    failed = True
+                    break
+        roundTrip: QImage = ImageArray.toImage(ImageArray.convert(source))
+        if (ImageArray.rgb(roundTrip) != ImageArray.rgb(source)).any():
+            print("toImage(convert(image)) does not reproduce the image.")
+            failed = True
+        print("Failed." if failed else "All views match QImage.pixelColor.")
+        exit(1 if failed else 0)
+
+    for toColorSpace in [ColorSpaceType.SRGB, ColorSpaceType.CIELAB, ColorSpaceType.OKLCH]:
+        start: float = perf_counter()
+        colors: ndarray = ImageArray.convert(image, toColorSpace)
+        print(f"{image.width()}x{image.height()} -> {toColorSpace.name}: {(perf_counter() - start) * 1e3:.1f} ms, mean {colors.reshape(-1, 3).mean(axis=0)}")
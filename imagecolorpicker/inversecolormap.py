@@ -0,0 +1,252 @@
+from typing import (
+    Self,
+    Callable,
+    Optional,
+)
+from concurrent.futures import ThreadPoolExecutor
+from numpy import (
+    ndarray,
+    uint8,
+    uint32,
+    float32,
+    asarray,
+    empty,
+    unique,
+    linspace,
+    sqrt,
+    clip,
+    where,
+    isfinite,
+)
+from numpy.typing import ArrayLike
+from PyQt6.QtGui import QImage
+from .colorspace import (
+    ColorSpace,
+    ColorSpaceConversion,
+    ColorSpaceType,
+    Observer,
+    Illuminant,
+)
+from .imagearray import ImageArray
+
+
+class InverseColorMap:
+    """Maps colors back to the amounts t in [0, 1] at which a fitted color map comes closest.
+
+    The color map is sampled densely and the samples are indexed by a KD-tree in OKLab, so
+    distances are perceptual. A query takes the nearest sample and refines its amount by a
+    golden section search on the model itself between the neighbouring samples. All queries
+    are vectorized over arrays of colors, up to whole images, see mapImage.
+
+    Fitted color maps often leave the sRGB gamut, where OKLab is undefined. Like any render of
+    the color map, the index clips the model to the gamut; so do the queries.
+    """
+
+    # Samples of the color map in the index.
+    SampleCount: int = 4096
+    # Golden section steps of the refinement; each shrinks the bracket to 0.618 of its width.
+    RefinementStepCount: int = 24
+    # OKLab distance at which a pixel no longer counts as a color of the color map, see confidence.
+    # About five just noticeable differences.
+    MismatchDistance: float = .1
+    _GoldenRatio: float = (sqrt(5.) - 1.) / 2.
+
+    def __init__(
+        self: Self,
+        model: Callable[[ndarray, ndarray], ndarray],
+        coefficients: ndarray,
+        observer: Observer = Observer.TwoDegreesCIE1931,
+        illuminant: Illuminant = Illuminant.D65,
+        sampleCount: int = SampleCount,
+    ) -> None:
+        # Half a second to import; only pay for it when colors are looked up.
+        from scipy.spatial import cKDTree
+
+        self._model: Callable[[ndarray, ndarray], ndarray] = model
+        self._coefficients: ndarray = coefficients
+        self._observer: Observer = observer
+        self._illuminant: Illuminant = illuminant
+        self._toOKLAB: ColorSpaceConversion = ColorSpace.compile(
+            ColorSpaceType.SRGB,
+            ColorSpaceType.OKLAB,
+            observer,
+            illuminant,
+        )
+        self._sampleStep: float = 1. / (sampleCount - 1)
+        sampleAmounts: ndarray = linspace(0., 1., sampleCount)
+        samples: ndarray = self._oklab(sampleAmounts)
+        # Coefficients of failed fits can still make samples non-finite, which the tree rejects.
+        finite: ndarray = isfinite(samples).all(axis=-1)
+        self._sampleAmounts: ndarray = sampleAmounts[finite]
+        self._tree: cKDTree = cKDTree(samples[finite])
+
+    @property
+    def coefficients(self: Self) -> ndarray:
+        """The coefficient matrix the index was built for."""
+        return self._coefficients
+
+    def _oklab(self: Self, t: ndarray) -> ndarray:
+        return self._toOKLAB.convertArray(clip(self._model(t, self._coefficients), 0., 1.))
+
+    def _distance(self: Self, t: ndarray, targets: ndarray) -> ndarray:
+        return sqrt(((self._oklab(t) - targets) ** 2).sum(axis=-1))
+
+    def query(self: Self, colors: ArrayLike) -> tuple[ndarray, ndarray]:
+        """Amounts and OKLab distances of the closest points of the color map to the sRGB colors.
+
+        colors has shape (..., 3); both results have shape colors.shape[:-1]. uint8 colors are
+        read as 8 bit components, others are clipped to the gamut.
+        """
+        colors = asarray(colors)
+        if colors.dtype != uint8:
+            colors = clip(colors, 0., 1.)
+        amounts, distances = self.queryOKLAB(self._toOKLAB.convertArray(colors.reshape(-1, 3)))
+        return amounts.reshape(colors.shape[:-1]), distances.reshape(colors.shape[:-1])
+
+    def queryOKLAB(self: Self, targets: ndarray) -> tuple[ndarray, ndarray]:
+        """Like query, for colors of shape (count, 3) that are in OKLab already."""
+        _, nearest = self._tree.query(targets)
+
+        # The minimum lies between the neighbours of the nearest sample.
+        lower: ndarray = clip(self._sampleAmounts[nearest] - self._sampleStep, 0., 1.)
+        upper: ndarray = clip(self._sampleAmounts[nearest] + self._sampleStep, 0., 1.)
+        left: ndarray = upper - InverseColorMap._GoldenRatio * (upper - lower)
+        right: ndarray = lower + InverseColorMap._GoldenRatio * (upper - lower)
+        leftDistance: ndarray = self._distance(left, targets)
+        rightDistance: ndarray = self._distance(right, targets)
+        for _ in range(InverseColorMap.RefinementStepCount):
+            # Keep the bracket around the smaller of the two inner points and probe it anew.
+            leftIsSmaller: ndarray = leftDistance < rightDistance
+            upper = where(leftIsSmaller, right, upper)
+            lower = where(leftIsSmaller, lower, left)
+            left, right = (
+                where(leftIsSmaller, upper - InverseColorMap._GoldenRatio * (upper - lower), right),
+                where(leftIsSmaller, left, lower + InverseColorMap._GoldenRatio * (upper - lower)),
+            )
+            probe: ndarray = where(leftIsSmaller, left, right)
+            probeDistance: ndarray = self._distance(probe, targets)
+            leftDistance, rightDistance = (
+                where(leftIsSmaller, probeDistance, rightDistance),
+                where(leftIsSmaller, leftDistance, probeDistance),
+            )
+
+        amounts: ndarray = (lower + upper) / 2.
+        return amounts, self._distance(amounts, targets)
+
+    @staticmethod
+    def confidence(distances: ndarray) -> ndarray:
+        """How well colors match the color map, from 1 on it to 0 at MismatchDistance and beyond."""
+        return clip(1. - distances / float32(InverseColorMap.MismatchDistance), 0., 1.)
+
+    def mapImage(
+        self: Self,
+        image: QImage,
+        workerCount: Optional[int] = None,
+    ) -> tuple[ndarray, ndarray]:
+        """Amounts and OKLab distances of all pixels, float32 arrays of shape (height, width).
+
+        Recovers the scalar field behind an image rendered with the color map; the distances
+        tell how well each pixel matches the color map at all. The image is looked up in blocks
+        of ImageArray.ChunkPixelCount pixels in a thread pool, so the temporaries stay bounded
+        for any image size. Within a block, each distinct 8 bit color is looked up once.
+        """
+        image = ImageArray.normalized(image)
+        pixels: ndarray = ImageArray.rgb(image)
+        scale: float = ImageArray.scale(image)
+        amounts: ndarray = empty((image.height(), image.width()), dtype=float32)
+        distances: ndarray = empty((image.height(), image.width()), dtype=float32)
+
+        def mapRows(rows: slice) -> None:
+            colors: ndarray = pixels[rows].reshape(-1, 3)
+            rowAmounts: ndarray
+            rowDistances: ndarray
+            if colors.dtype == uint8:
+                # Color mapped renders have few distinct colors.
+                keys: ndarray = (colors[:, 0].astype(uint32) << 16) | (colors[:, 1].astype(uint32) << 8) | colors[:, 2]
+                _, first, inverse = unique(keys, return_index=True, return_inverse=True)
+                rowAmounts, rowDistances = self.query(colors[first])
+                rowAmounts, rowDistances = rowAmounts[inverse], rowDistances[inverse]
+            else:
+                rowAmounts, rowDistances = self.query(colors / scale)
+            amounts[rows] = rowAmounts.reshape(pixels[rows].shape[:-1])
+            distances[rows] = rowDistances.reshape(pixels[rows].shape[:-1])
+
+        rowCount: int = max(1, ImageArray.ChunkPixelCount // max(1, image.width()))
+        with ThreadPoolExecutor(max_workers=workerCount) as executor:
+            # Consume the results to raise the exceptions of the workers.
+            list(executor.map(
+                mapRows,
+                map(lambda firstRow: slice(firstRow, firstRow + rowCount), range(0, image.height(), rowCount)),
+            ))
+        return amounts, distances
+
+if __name__ == '__main__':
+    from argparse import ArgumentParser
+    from time import perf_counter
+    from numpy import (
+        mgrid,
+        sin,
+        cos,
+        abs as npabs,
+    )
+    from numpy.random import default_rng
+    from .colorgradient import (
+        ColorGradient,
+        DefaultGradient1,
+        FitModel,
+    )
+
+    parser: ArgumentParser = ArgumentParser('inversecolormap', description='Look up colors in fitted color maps.')
+    parser.add_argument('-c', '--check', dest='check', action='store_true', help='Check that colors of the color maps are found at their amounts.')
+    args = parser.parse_args()
+
+    failed: bool = False
+    generator = default_rng(210)
+    for model in FitModel:
+        gradient: ColorGradient = ColorGradient.fromDict(dict(DefaultGradient1.toDict(), model=model.name))
+        start: float = perf_counter()
+        inverse: InverseColorMap = InverseColorMap(ColorGradient.ArrayModels[model], gradient.coefficientMatrix)
+        buildTime: float = perf_counter() - start
+
+        amounts: ndarray = generator.uniform(0., 1., 10000)
+        start = perf_counter()
+        found, distances = inverse.query(gradient.evaluateFitMany(amounts))
+        queryTime: float = perf_counter() - start
+
+        # Distinct amounts can map to the same color, so compare the colors, not the amounts.
+        error: float = float(inverse._distance(found, inverse._oklab(amounts)).max())
+        print(f"{model.name}: index {buildTime * 1e3:.1f} ms, {len(amounts)} queries {queryTime * 1e3:.1f} ms, max OKLab error {error:.1e}, max distance {distances.max():.1e}")
+        failed = failed or error > 1e-4
+
+    # A render of a scalar field with the color map, as found in screenshots.
+    gradient = ColorGradient.fromDict(dict(DefaultGradient1.toDict(), model=FitModel.ChebyshevT.name))
+    y, x = mgrid[0:1080, 0:1920]
+    field: ndarray = (sin(x / 300.) * cos(y / 200.) + 1.) / 2.
+    render: QImage = ImageArray.toImage(gradient.evaluateFitMany(field))
+    start = perf_counter()
+    recovered, distances = gradient.inverseColorMap.mapImage(render)
+    mapTime: float = perf_counter() - start
+    # 8 bit quantization limits how well the field can be recovered; compare in color again.
+    error = float(npabs(gradient.evaluateFitMany(recovered) - gradient.evaluateFitMany(field)).max())
+    print(f"{render.width()}x{render.height()} image: {mapTime * 1e3:.0f} ms, max sRGB error {error:.1e}, max distance {distances.max():.1e}")
+    failed = failed or error > 2. / 255.
+    grayscale: QImage = ImageArray.toGrayscale16(recovered)
+    failed = failed or float(npabs(ImageArray.rgb(grayscale)[..., 0] / 65535. - recovered).max()) > 1. / 65535.
+    # Every pixel of a render is a color of the color map.
+    failed = failed or float(InverseColorMap.confidence(distances).min()) < .9
+
+    # A fit that overshoots the gamut, where OKLab has no cube root of the negative cone responses.
+    from glm import vec3
+    from .colorspace import ColorSpaceType
+    gradient = ColorGradient('Out of gamut', 7, ColorSpaceType.OKLAB, ColorSpaceType.OKLAB, [vec3(0, 0, 0), vec3(.2, .1, .4), vec3(.9, .5, .1), vec3(1, 1, .6)])
+    outside: float = float(npabs(gradient.evaluateFitMany(linspace(0., 1., 1024)) - .5).max() - .5)
+    amounts = generator.uniform(0., 1., 10000)
+    found, distances = gradient.inverseColorMap.query(gradient.evaluateFitMany(amounts))
+    error = float(gradient.inverseColorMap._distance(found, gradient.inverseColorMap._oklab(amounts)).max())
+    print(f"Out of gamut by {outside:.1e}: max OKLab error {error:.1e}")
+    # Clipping puts kinks into the color map, which the refinement resolves less precisely.
+    failed = failed or outside <= 0. or error > 1e-3 or not isfinite(distances).all()
+
+    if args.check:
+        print("Failed." if failed else "All colors were found on their color maps.")
+        exit(1 if failed else 0)
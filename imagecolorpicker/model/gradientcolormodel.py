@@ -109,12 +109,12 @@ class GradientColorModel(QAbstractTableModel):
         if roleEnum == Qt.ItemDataRole.EditRole:
             if columnType == GradientColorColumnType.Name:
                 color = QColor(value)
-                self._gradient._colors[index.row()] = vec3(color.redF(), color.greenF(), color.blueF())
+                self._gradient.setColor(index.row(), vec3(color.redF(), color.greenF(), color.blueF()))
                 self.dataChanged.emit(index, index, [Qt.ItemDataRole.EditRole])
                 return True
         return False
 
     def updateColor(self: Self, row: int, color: QColor) -> None:
-        self._gradient._colors[row] = vec3(color.redF(), color.greenF(), color.blueF())
+        self._gradient.setColor(row, vec3(color.redF(), color.greenF(), color.blueF()))
         self.dataChanged.emit(self.index(row, 0), self.index(row, self.columnCount()), [Qt.ItemDataRole.EditRole])
         
\ No newline at end of file
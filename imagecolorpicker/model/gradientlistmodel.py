@@ -33,6 +33,7 @@ from ..colorgradient import (
 )
 from sys import argv
 from ..delegate.gradientlistdelegate import GradientListDelegate
+from ..fitscheduler import FitScheduler
 from .gradientlistcolumntype import GradientListColumnType
 from copy import deepcopy
 from ..colorspace import ColorSpaceType
@@ -44,9 +45,14 @@ class GradientListModel(QAbstractTableModel):
     def __init__(
         self: Self,
         parent: Optional[QObject] = None,
+        fitScheduler: Optional[FitScheduler] = None,
     ) -> None:
         super().__init__(parent)
 
+        self._fitScheduler: Optional[FitScheduler] = fitScheduler
+        if self._fitScheduler is not None:
+            self._fitScheduler.gradientFitted.connect(self._gradientFitted)
+
         self._columnList: list[GradientListColumnType] = [
             GradientListColumnType.Name,
             GradientListColumnType.Preview,
@@ -109,16 +115,16 @@ class GradientListModel(QAbstractTableModel):
                 self.dataChanged.emit(index, index, [Qt.ItemDataRole.EditRole])        
             elif columnType == GradientListColumnType.Degree:
                 try:
-                    self._gradientList[index.row()]._degree = int(value)
-                    self._gradientList[index.row()]._update()
+                    self._gradientList[index.row()].degree = int(value)
+                    self.fitGradient(self._gradientList[index.row()])
                     self.dataChanged.emit(index, index, [Qt.ItemDataRole.EditRole])
                     return True
                 except:
                     return False
             elif columnType == GradientListColumnType.Model:
                 try:
-                    self._gradientList[index.row()]._model = FitModel[value]
-                    self._gradientList[index.row()]._update()
+                    self._gradientList[index.row()].model = FitModel[value]
+                    self.fitGradient(self._gradientList[index.row()])
                     self.dataChanged.emit(index, index, [Qt.ItemDataRole.EditRole])
                     return True
                 except:
@@ -175,8 +181,24 @@ class GradientListModel(QAbstractTableModel):
         self.dataChanged.emit(self.index(newIndex, 0), self.index(newIndex, self.columnCount()), [Qt.ItemDataRole.EditRole])
         self.currentGradientChanged.emit(self._gradientList[self._currentIndex])
 
+    def fitGradient(self: Self, gradient: ColorGradient) -> None:
+        """Refit in the background if there is a fit scheduler, right away otherwise."""
+        if self._fitScheduler is not None:
+            self._fitScheduler.schedule(gradient)
+        else:
+            gradient._update()
+
+    def _gradientFitted(self: Self, gradient: ColorGradient) -> None:
+        for row, listedGradient in enumerate(self._gradientList):
+            if listedGradient is gradient:
+                self.dataChanged.emit(
+                    self.index(row, 0),
+                    self.index(row, self.columnCount()),
+                    [Qt.ItemDataRole.DisplayRole],
+                )
+
     def updateCurrentGradient(self: Self) -> None:
-        self._gradientList[self._currentIndex]._update()
+        self.fitGradient(self._gradientList[self._currentIndex])
         self.dataChanged.emit(
             self.index(self._currentIndex, 0),
             self.index(self._currentIndex, self.columnCount()),
@@ -185,10 +207,10 @@ class GradientListModel(QAbstractTableModel):
 
     def copyCurrentGradientWithColorSpaces(self: Self, weightColorSpace: ColorSpaceType, mixColorSpace: ColorSpaceType) -> ColorGradient:
         result: ColorGradient = deepcopy(self._gradientList[self._currentIndex])
-        result._weightColorSpace = weightColorSpace
-        result._mixColorSpace = mixColorSpace
+        result.weightColorSpace = weightColorSpace
+        result.mixColorSpace = mixColorSpace
         result._name = f'{weightColorSpace.name}:{mixColorSpace.name}'
-        result._update()
+        self.fitGradient(result)
         return result
 
 if __name__ == '__main__':
@@ -38,6 +38,7 @@ from ..colorspace import ColorSpaceType
 from ..colorgradient import (
     Observer,
     FitAlgorithm,
+    FitLoss,
     FitModel,
     Illuminant,
     Wraparound,
@@ -68,8 +69,11 @@ class GradientPropertyModel(QAbstractTableModel):
             GradientPropertyRowType.Illuminant,
             GradientPropertyRowType.Observer,
             GradientPropertyRowType.FitAlgorithm,
+            GradientPropertyRowType.FitLoss,
             GradientPropertyRowType.FitAmount,
             GradientPropertyRowType.MaxFitIterationCount,
+            GradientPropertyRowType.FitStartCount,
+            GradientPropertyRowType.FitReport,
         ]
 
         self._gradient: Optional[ColorGradient] = None
@@ -82,6 +86,14 @@ class GradientPropertyModel(QAbstractTableModel):
         self._gradient = gradient
         self.endResetModel()
 
+    def fitReportChanged(self: Self) -> None:
+        """Refresh the fit report after the gradient was refitted."""
+        index: QModelIndex = self.index(
+            self._rowList.index(GradientPropertyRowType.FitReport),
+            self._columnList.index(GradientPropertyColumnType.Value),
+        )
+        self.dataChanged.emit(index, index, [Qt.ItemDataRole.DisplayRole])
+
     def data(
         self: Self,
         index: QModelIndex,
@@ -119,6 +131,12 @@ class GradientPropertyModel(QAbstractTableModel):
                     return self._gradient._maxFitIterationCount
                 elif rowType == GradientPropertyRowType.FitAmount:
                     return self._gradient._fitAmount
+                elif rowType == GradientPropertyRowType.FitLoss:
+                    return self._gradient._fitLoss.name
+                elif rowType == GradientPropertyRowType.FitStartCount:
+                    return self._gradient._fitStartCount
+                elif rowType == GradientPropertyRowType.FitReport:
+                    return str(self._gradient.fitReport)
 
     def setData(
         self: Self,
@@ -139,43 +157,51 @@ class GradientPropertyModel(QAbstractTableModel):
                     self.dataChanged.emit(index, index, [Qt.ItemDataRole.EditRole])
                     return True
                 elif rowType == GradientPropertyRowType.Degree:
-                    self._gradient._degree = int(value)
+                    self._gradient.degree = int(value)
                     self.dataChanged.emit(index, index, [Qt.ItemDataRole.EditRole])
                     return True
                 elif rowType == GradientPropertyRowType.WeightColorSpace:
-                    self._gradient._weightColorSpace = ColorSpaceType[value]
+                    self._gradient.weightColorSpace = ColorSpaceType[value]
                     self.dataChanged.emit(index, index, [Qt.ItemDataRole.EditRole])
                     return True
                 elif rowType == GradientPropertyRowType.MixColorSpace:
-                    self._gradient._mixColorSpace = ColorSpaceType[value]
+                    self._gradient.mixColorSpace = ColorSpaceType[value]
                     self.dataChanged.emit(index, index, [Qt.ItemDataRole.EditRole])
                     return True
                 elif rowType == GradientPropertyRowType.Observer:
-                    self._gradient._observer = Observer[value]
+                    self._gradient.observer = Observer[value]
                     self.dataChanged.emit(index, index, [Qt.ItemDataRole.EditRole])
                     return True
                 elif rowType == GradientPropertyRowType.Illuminant:
-                    self._gradient._illuminant = Illuminant[value]
+                    self._gradient.illuminant = Illuminant[value]
                     self.dataChanged.emit(index, index, [Qt.ItemDataRole.EditRole])
                     return True
                 elif rowType == GradientPropertyRowType.Model:
-                    self._gradient._model = FitModel[value]
+                    self._gradient.model = FitModel[value]
                     self.dataChanged.emit(index, index, [Qt.ItemDataRole.EditRole])
                     return True
                 elif rowType == GradientPropertyRowType.Wraparound:
-                    self._gradient._wraparound = Wraparound[value]
+                    self._gradient.wraparound = Wraparound[value]
                     self.dataChanged.emit(index, index, [Qt.ItemDataRole.EditRole])
                     return True
                 elif rowType == GradientPropertyRowType.FitAlgorithm:
-                    self._gradient._fitAlgorithm = FitAlgorithm[value]
+                    self._gradient.fitAlgorithm = FitAlgorithm[value]
                     self.dataChanged.emit(index, index, [Qt.ItemDataRole.EditRole])
                     return True
                 elif rowType == GradientPropertyRowType.MaxFitIterationCount:
-                    self._gradient._maxFitIterationCount = int(value)
+                    self._gradient.maxFitIterationCount = int(value)
                     self.dataChanged.emit(index, index, [Qt.ItemDataRole.EditRole])
                     return True
                 elif rowType == GradientPropertyRowType.FitAmount:
-                    self._gradient._fitAmount = int(value)
+                    self._gradient.fitAmount = int(value)
+                    self.dataChanged.emit(index, index, [Qt.ItemDataRole.EditRole])
+                    return True
+                elif rowType == GradientPropertyRowType.FitLoss:
+                    self._gradient.fitLoss = FitLoss[value]
+                    self.dataChanged.emit(index, index, [Qt.ItemDataRole.EditRole])
+                    return True
+                elif rowType == GradientPropertyRowType.FitStartCount:
+                    self._gradient.fitStartCount = int(value)
                     self.dataChanged.emit(index, index, [Qt.ItemDataRole.EditRole])
                     return True
         return False
@@ -212,7 +238,8 @@ class GradientPropertyModel(QAbstractTableModel):
     def flags(self: Self, index: QModelIndex) -> Qt.ItemFlag:
         flags: Qt.ItemFlag = super().flags(index)
         columnType: GradientPropertyColumnType = self._columnList[index.column()]
-        if columnType == GradientPropertyColumnType.Value:
+        rowType: GradientPropertyRowType = self._rowList[index.row()]
+        if columnType == GradientPropertyColumnType.Value and rowType != GradientPropertyRowType.FitReport:
             flags = flags | Qt.ItemFlag.ItemIsEditable
         return flags
 
@@ -16,3 +16,6 @@ class GradientPropertyRowType(IntEnum):
     FitAlgorithm = auto()
     MaxFitIterationCount = auto()
     FitAmount = auto()
+    FitLoss = auto()
+    FitStartCount = auto()
+    FitReport = auto()
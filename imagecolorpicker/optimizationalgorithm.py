@@ -1,8 +1,188 @@
-from typing import Self
+from typing import (
+    Callable,
+    Optional,
+)
+from numpy import (
+    ndarray,
+    float64,
+    asarray,
+    arange,
+    argsort,
+    outer,
+    identity,
+    zeros,
+    ones,
+    sqrt,
+    log,
+    exp,
+    arctan,
+    maximum,
+    abs as npabs,
+)
+from numpy.linalg import (
+    lstsq,
+    norm,
+    eigh,
+)
+from numpy.random import default_rng
 
 
-# class OptimizationAlgorithm:
-#     @staticmethod
-#     def 
+class OptimizationAlgorithm:
+    # Losses rho(z) of the squared residuals z = r², named like scipy's least squares losses.
+    Losses: dict[str, Callable[[ndarray], ndarray]] = {
+        'linear': lambda squaredResiduals: squaredResiduals,
+        'arctan': arctan,
+    }
 
+    @staticmethod
+    def LinearLeastSquares(design: ndarray, samples: ndarray) -> ndarray:
+        """Coefficients minimizing |design @ coefficients - samples|² for all columns of samples at once.
 
+        design has shape (sampleCount, coefficientCount), samples (sampleCount, channelCount).
+        """
+        return lstsq(design, samples, rcond=None)[0]
+
+    @staticmethod
+    def ArctanWeights(residuals: ndarray) -> ndarray:
+        """IRLS weights of scipy's 'arctan' loss, rho(z) = arctan(z) with z = r², i.e. rho'(z)."""
+        squaredResiduals: ndarray = residuals * residuals
+        return 1. / (1. + squaredResiduals * squaredResiduals)
+
+    @staticmethod
+    def IterativelyReweightedLeastSquares(
+        design: ndarray,
+        samples: ndarray,
+        weights: Callable[[ndarray], ndarray] = ArctanWeights,
+        maxIterationCount: int = 20,
+        tolerance: float = 1e-10,
+    ) -> tuple[ndarray, int]:
+        """Robust linear least squares: minimizes the sum of the loss over the residuals by
+        solving weighted least squares problems with the weights of the current residuals.
+
+        Returns the coefficients and the number of reweighting iterations.
+        """
+        coefficients: ndarray = OptimizationAlgorithm.LinearLeastSquares(design, samples)
+        iterationCount: int = 0
+        while iterationCount < maxIterationCount:
+            iterationCount += 1
+            rootWeights: ndarray = sqrt(weights(design @ coefficients - samples))
+            previousCoefficients: ndarray = coefficients.copy()
+            # The weights differ per channel, so each channel has its own weighted problem.
+            for channel in range(samples.shape[1]):
+                coefficients[:, channel] = OptimizationAlgorithm.LinearLeastSquares(
+                    design * rootWeights[:, channel, None],
+                    samples[:, channel] * rootWeights[:, channel],
+                )
+            if npabs(coefficients - previousCoefficients).max() <= tolerance * (1. + npabs(coefficients).max()):
+                break
+        return coefficients, iterationCount
+
+    @staticmethod
+    def LeastSquares(
+        residuals: Callable[[ndarray], ndarray],
+        initialGuess: ndarray,
+        method: str = 'trf',
+        loss: str = 'linear',
+        maxEvaluationCount: int = 5000,
+        jacobian: Optional[Callable[[ndarray], ndarray]] = None,
+    ) -> tuple[ndarray, int, int]:
+        """Nonlinear least squares with scipy's 'lm', 'trf' or 'dogbox' methods.
+
+        jacobian maps the parameters to the Jacobian of the residuals, of shape
+        (residualCount, parameterCount); without, it is estimated by finite differences at
+        the cost of one residual evaluation per parameter.
+
+        Returns the parameters, the number of iterations (Jacobian evaluations) and of residual
+        evaluations. 'lm' does not estimate Jacobians separately, so every evaluation counts.
+        """
+        # scipy.optimize takes most of a second to import; only pay for it when needed.
+        from scipy.optimize import least_squares
+        result = least_squares(
+            residuals,
+            asarray(initialGuess, dtype=float64),
+            method=method,
+            loss=loss,
+            max_nfev=maxEvaluationCount,
+            jac=jacobian if jacobian is not None else '2-point',
+            # Scaling by the Jacobian's column norms throws parameters with vanishing derivatives,
+            # like the phases of FourierInitialGuess, far off; newer scipy versions default to it.
+            x_scale=1.,
+        )
+        return result.x, result.njev if result.njev is not None else result.nfev, result.nfev
+
+    @staticmethod
+    def CMAES(
+        objective: Callable[[ndarray], ndarray],
+        initialGuess: ndarray,
+        maxEvaluationCount: int = 5000,
+        sigma: float = 1.,
+        tolerance: float = 1e-8,
+        seed: int = 210,
+    ) -> tuple[ndarray, int, int]:
+        """Covariance matrix adaptation evolution strategy, after Hansen's tutorial (arXiv:1604.00772).
+
+        objective maps a population of shape (populationSize, parameterCount) to the objective
+        values of shape (populationSize,), so it can evaluate all candidates at once. Stops before
+        exceeding maxEvaluationCount objective evaluations, the budget unit of LeastSquares, or
+        when the step size falls below tolerance relative to the parameters. Returns the best parameters seen, the number of generations and of
+        objective evaluations.
+        """
+        mean: ndarray = asarray(initialGuess, dtype=float64).copy()
+        n: int = len(mean)
+        generator = default_rng(seed)
+
+        populationSize: int = 4 + int(3 * log(n))
+        parentCount: int = populationSize // 2
+        weights: ndarray = log(parentCount + .5) - log(arange(1, parentCount + 1))
+        weights /= weights.sum()
+        effectiveParentCount: float = 1. / (weights * weights).sum()
+
+        # Learning rates of the evolution paths, the rank-one and rank-mu updates and the step size.
+        cc: float = (4. + effectiveParentCount / n) / (n + 4. + 2. * effectiveParentCount / n)
+        cs: float = (effectiveParentCount + 2.) / (n + effectiveParentCount + 5.)
+        c1: float = 2. / ((n + 1.3) ** 2 + effectiveParentCount)
+        cmu: float = min(1. - c1, 2. * (effectiveParentCount - 2. + 1. / effectiveParentCount) / ((n + 2.) ** 2 + effectiveParentCount))
+        damping: float = 1. + 2. * max(0., sqrt((effectiveParentCount - 1.) / (n + 1.)) - 1.) + cs
+        expectedNorm: float = sqrt(n) * (1. - 1. / (4. * n) + 1. / (21. * n * n))
+
+        pc: ndarray = zeros(n)
+        ps: ndarray = zeros(n)
+        B: ndarray = identity(n)
+        D: ndarray = ones(n)
+        C: ndarray = identity(n)
+
+        best: ndarray = mean.copy()
+        bestValue: float = float(objective(mean[None])[0])
+        evaluationCount: int = 1
+        generation: int = 0
+        while evaluationCount + populationSize <= maxEvaluationCount:
+            generation += 1
+            steps: ndarray = (generator.standard_normal((populationSize, n)) * D) @ B.T
+            values: ndarray = objective(mean + sigma * steps)
+            evaluationCount += populationSize
+
+            order: ndarray = argsort(values)
+            if values[order[0]] < bestValue:
+                bestValue = float(values[order[0]])
+                best = mean + sigma * steps[order[0]]
+
+            parentSteps: ndarray = steps[order[:parentCount]]
+            meanStep: ndarray = weights @ parentSteps
+            mean += sigma * meanStep
+
+            ps = (1. - cs) * ps + sqrt(cs * (2. - cs) * effectiveParentCount) * (B @ ((B.T @ meanStep) / D))
+            stalled: bool = norm(ps) / sqrt(1. - (1. - cs) ** (2 * generation)) / expectedNorm >= 1.4 + 2. / (n + 1.)
+            pc = (1. - cc) * pc + (0. if stalled else sqrt(cc * (2. - cc) * effectiveParentCount)) * meanStep
+
+            C = (1. - c1 - cmu) * C \
+                + c1 * (outer(pc, pc) + (cc * (2. - cc) * C if stalled else 0.)) \
+                + cmu * (parentSteps.T * weights) @ parentSteps
+            sigma *= exp(cs / damping * (norm(ps) / expectedNorm - 1.))
+
+            squaredD, B = eigh((C + C.T) / 2.)
+            D = sqrt(maximum(squaredD, 1e-30))
+
+            if sigma * D.max() < tolerance * (1. + npabs(mean).max()):
+                break
+
+        return best, generation, evaluationCount
@@ -2,23 +2,36 @@ from enum import (
     IntEnum,
     auto,
 )
-from typing import Self
+from typing import (
+    Self,
+    Optional,
+)
 # from glm import *
 from numpy import (
-    array,
+    ndarray,
+    float64,
     array,
     linspace,
+    arange,
+    empty,
+    zeros,
+    identity,
     cos,
     pi,
     sin,
     sqrt,
     exp,
     log,
+    angle,
+    abs as npabs,
 )
-from lmfit.models import PolynomialModel
+from numpy.fft import rfft
 
 
 class OptimizationModel:
+    # See PolynomialConstraintMatrix.
+    _PolynomialConstraintMatrices: dict[int, ndarray] = {}
+
     @staticmethod
     def PolynomialInitialGuess(degree: int) -> list[list[float]]:
         return [
@@ -29,13 +42,11 @@ class OptimizationModel:
 
     @staticmethod
     def Polynomial(t: float, *c: tuple[float]) -> float:
-        o = len(c) + 1
-        result = c[-1]
-        for ck in reversed(c[:-1]):
+        # Make periodic by appending the two periodicity terms, then evaluate by Horner's scheme.
+        coefficients: ndarray = OptimizationModel.PolynomialConstraintMatrix(len(c)) @ array(c, dtype=float64)
+        result = coefficients[-1]
+        for ck in coefficients[-2::-1]:
             result = ck + t * result
-        # Make periodic
-        result += 1. / (o - 2) * (c[o - 2] - sum(map(lambda i: i * c[i] - c[i - 1], range(2, o - 1)))) * t ** (o - 1)
-        result += ((1 - o) / (o - 2) * (c[o - 2] - sum(map(lambda i: i * c[i] - c[i - 1], range(2, o - 1)))) - sum(map(lambda i: i * c[i], range(2, o - 1)))) * t ** o
         return result
 
     @staticmethod
@@ -46,6 +57,22 @@ class OptimizationModel:
             [1.] * degree,
         ]
 
+    @staticmethod
+    def FourierSpectralGuess(samples: ndarray, degree: int) -> ndarray:
+        """Amplitudes and phases of the Fourier coefficients of one period of samples, shape
+        (sampleCount, channelCount), taken at t = k / sampleCount. Close to the least squares
+        fit of Fourier, so a much better start than FourierInitialGuess; shape (degree, channelCount).
+        """
+        termCount: int = degree // 2
+        spectrum: ndarray = rfft(samples, axis=0)[:termCount] / len(samples)
+        amplitudes: ndarray = 2. * npabs(spectrum)
+        # The constant term is not mirrored at negative frequencies.
+        amplitudes[0] /= 2.
+        guess: ndarray = zeros((degree, samples.shape[1]))
+        guess[0:2 * termCount:2] = amplitudes
+        guess[1:2 * termCount:2] = angle(spectrum) / (pi * 2)
+        return guess
+
     @staticmethod
     def Fourier(t: float, *c: tuple[float]) -> float:
         result = c[0] * cos(pi * 2 * c[1])
@@ -107,3 +134,123 @@ class OptimizationModel:
             tnm1 = tn
             tn = tnp1
         return result
+
+    # Array versions of the models. They take amounts t of any shape and a coefficient matrix of
+    # shape (coefficientCount, channelCount), here one row of RGB per coefficient, and evaluate
+    # all channels at once; the result has shape t.shape + (channelCount,).
+    # The linear models are evaluated as basis @ coefficients; the bases are shared with fitting.
+
+    @staticmethod
+    def PolynomialArray(t: ndarray, coefficients: ndarray) -> ndarray:
+        """Horner scheme over all coefficients, without the periodicity terms of Polynomial."""
+        t = t[..., None]
+        result: ndarray = zeros(t.shape[:-1] + coefficients.shape[1:]) + coefficients[-1]
+        for coefficient in coefficients[-2::-1]:
+            result *= t
+            result += coefficient
+        return result
+
+    @staticmethod
+    def PolynomialConstraintMatrix(count: int) -> ndarray:
+        """Matrix of shape (count + 2, count) mapping the count coefficients of Polynomial to the
+        count + 2 coefficients of PolynomialArray; the two highest are the periodicity terms,
+        which are linear in the others.
+
+        Computed once per count and shared by Polynomial, PolynomialBasis and the fit; read-only.
+        """
+        matrix: Optional[ndarray] = OptimizationModel._PolynomialConstraintMatrices.get(count)
+        if matrix is None:
+            matrix = OptimizationModel._polynomialConstraintMatrix(count)
+            matrix.flags.writeable = False
+            OptimizationModel._PolynomialConstraintMatrices[count] = matrix
+        return matrix
+
+    @staticmethod
+    def _polynomialConstraintMatrix(count: int) -> ndarray:
+        o: int = count + 1
+        matrix: ndarray = zeros((count + 2, count))
+        matrix[:count] = identity(count)
+        for column in range(count):
+            c: ndarray = matrix[:count, column]
+            periodicity: float = c[o - 2] - sum(map(lambda i: i * c[i] - c[i - 1], range(2, o - 1)))
+            matrix[count, column] = 1. / (o - 2) * periodicity
+            matrix[count + 1, column] = (1 - o) / (o - 2) * periodicity - sum(map(lambda i: i * c[i], range(2, o - 1)))
+        return matrix
+
+    @staticmethod
+    def PolynomialBasis(t: ndarray, count: int) -> ndarray:
+        """Basis of Polynomial with the periodicity terms folded in, shape t.shape + (count,)."""
+        return (t[..., None] ** arange(count + 2)) @ OptimizationModel.PolynomialConstraintMatrix(count)
+
+    @staticmethod
+    def FourierArray(t: ndarray, coefficients: ndarray) -> ndarray:
+        termCount: int = len(coefficients) // 2
+        amplitudes: ndarray = coefficients[0:2 * termCount:2]
+        phases: ndarray = coefficients[1:2 * termCount:2]
+        return (amplitudes * cos(pi * 2 * (arange(termCount)[:, None] * t[..., None, None] + phases))).sum(axis=-2)
+
+    @staticmethod
+    def ExponentialBasis(t: ndarray, count: int) -> ndarray:
+        return exp(-arange(count) * t[..., None])
+
+    @staticmethod
+    def ExponentialArray(t: ndarray, coefficients: ndarray) -> ndarray:
+        return OptimizationModel.ExponentialBasis(t, len(coefficients)) @ coefficients
+
+    @staticmethod
+    def ChebyshevBasis(t: ndarray, count: int, first: ndarray) -> ndarray:
+        """Columns 1, first, 2 t first - 1, ... of the Chebyshev recurrence."""
+        basis: ndarray = empty(t.shape + (count,))
+        tnm1: ndarray = t * 0. + 1.
+        tn: ndarray = first
+        for k in range(count):
+            basis[..., k] = tnm1
+            tnm1, tn = tn, 2 * t * tn - tnm1
+        return basis
+
+    @staticmethod
+    def ChebyshevTBasis(t: ndarray, count: int) -> ndarray:
+        return OptimizationModel.ChebyshevBasis(t, count, t)
+
+    @staticmethod
+    def ChebyshevTArray(t: ndarray, coefficients: ndarray) -> ndarray:
+        return OptimizationModel.ChebyshevTBasis(t, len(coefficients)) @ coefficients
+
+    @staticmethod
+    def ChebyshevUBasis(t: ndarray, count: int) -> ndarray:
+        return OptimizationModel.ChebyshevBasis(t, count, 2 * t)
+
+    @staticmethod
+    def ChebyshevUArray(t: ndarray, coefficients: ndarray) -> ndarray:
+        return OptimizationModel.ChebyshevUBasis(t, len(coefficients)) @ coefficients
+
+    # Jacobians of the array models with respect to a single channel's coefficients c of shape
+    # (coefficientCount,), of shape t.shape + (coefficientCount,). For the linear models, they
+    # are the bases and do not depend on c.
+
+    @staticmethod
+    def PolynomialJacobian(t: ndarray, c: ndarray) -> ndarray:
+        return OptimizationModel.PolynomialBasis(t, len(c))
+
+    @staticmethod
+    def FourierJacobian(t: ndarray, c: ndarray) -> ndarray:
+        termCount: int = len(c) // 2
+        amplitudes: ndarray = c[0:2 * termCount:2]
+        phases: ndarray = pi * 2 * (arange(termCount) * t[..., None] + c[1:2 * termCount:2])
+        # An odd last coefficient does not enter the model.
+        jacobian: ndarray = zeros(t.shape + (len(c),))
+        jacobian[..., 0:2 * termCount:2] = cos(phases)
+        jacobian[..., 1:2 * termCount:2] = -pi * 2 * amplitudes * sin(phases)
+        return jacobian
+
+    @staticmethod
+    def ExponentialJacobian(t: ndarray, c: ndarray) -> ndarray:
+        return OptimizationModel.ExponentialBasis(t, len(c))
+
+    @staticmethod
+    def ChebyshevTJacobian(t: ndarray, c: ndarray) -> ndarray:
+        return OptimizationModel.ChebyshevTBasis(t, len(c))
+
+    @staticmethod
+    def ChebyshevUJacobian(t: ndarray, c: ndarray) -> ndarray:
+        return OptimizationModel.ChebyshevUBasis(t, len(c))
@@ -54,27 +54,27 @@ class Plot(QWidget):
         self._ax_data.clear()
         self._ax_res.clear()
 
-        colors = list(map(gradient.evaluate, self._t))
-        fitted_colors = list(map(gradient.evaluateFit, self._t))
+        colors = gradient.evaluateMany(self._t)
+        fitted_colors = gradient.evaluateFitMany(self._t)
 
-        residuals = list(map(lambda colorIndex: colors[colorIndex] - fitted_colors[colorIndex], range(len(colors))))
-        squaresum = sum(map(lambda residual: residual * residual, residuals))
+        residuals = colors - fitted_colors
+        squaresum = (residuals * residuals).sum(axis=0)
 
-        self._ax_data.scatter(self._t, list(map(lambda color: color.x, colors)), label="Red", color="tab:red", s=2)
-        self._ax_data.plot(self._t, list(map(lambda color: color.x, fitted_colors)), label="Red fit", color="tab:red")
-        self._ax_data.scatter(self._t, list(map(lambda color: color.y, colors)), label="Green", color="tab:green", s=2)
-        self._ax_data.plot(self._t, list(map(lambda color: color.y, fitted_colors)), label="Green fit", color="tab:green")
-        self._ax_data.scatter(self._t, list(map(lambda color: color.z, colors)), label="Blue", color="tab:blue", s=2)
-        self._ax_data.plot(self._t, list(map(lambda color: color.z, fitted_colors)), label="Blue fit", color="tab:blue")
+        self._ax_data.scatter(self._t, colors[:, 0], label="Red", color="tab:red", s=2)
+        self._ax_data.plot(self._t, fitted_colors[:, 0], label="Red fit", color="tab:red")
+        self._ax_data.scatter(self._t, colors[:, 1], label="Green", color="tab:green", s=2)
+        self._ax_data.plot(self._t, fitted_colors[:, 1], label="Green fit", color="tab:green")
+        self._ax_data.scatter(self._t, colors[:, 2], label="Blue", color="tab:blue", s=2)
+        self._ax_data.plot(self._t, fitted_colors[:, 2], label="Blue fit", color="tab:blue")
         # self._ax_data.legend()
         self._ax_data.set_ylabel("RGB Comp.")
-        self._ax_data.set_title(f"Approx. CMAP {gradient._weightColorSpace.name} weight {DefaultGradient1._mixColorSpace.name} mix @ {squaresum.x:.2f} / {squaresum.y:.2f} / {squaresum.z:.2f}")
+        self._ax_data.set_title(f"Approx. CMAP {gradient._weightColorSpace.name} weight {DefaultGradient1._mixColorSpace.name} mix @ {squaresum[0]:.2f} / {squaresum[1]:.2f} / {squaresum[2]:.2f}")
         self._ax_data.grid()
 
         self._ax_res.axhline(0, color="black", linewidth=1)
-        self._ax_res.scatter(self._t, list(map(lambda color: color.x, residuals)), color="tab:red", s=2)
-        self._ax_res.scatter(self._t, list(map(lambda color: color.y, residuals)), color="tab:green", s=2)
-        self._ax_res.scatter(self._t, list(map(lambda color: color.z, residuals)), color="tab:blue", s=2)
+        self._ax_res.scatter(self._t, residuals[:, 0], color="tab:red", s=2)
+        self._ax_res.scatter(self._t, residuals[:, 1], color="tab:green", s=2)
+        self._ax_res.scatter(self._t, residuals[:, 2], color="tab:blue", s=2)
         self._ax_res.set_ylabel("Residuals")
         self._ax_res.set_xlabel("t")
         self._ax_res.grid()
@@ -169,6 +169,8 @@ class Ui_MainWindow(object):
         self.actionExport_Palette.setObjectName("actionExport_Palette")
         self.actionImport_Palette = QtGui.QAction(parent=MainWindow)
         self.actionImport_Palette.setObjectName("actionImport_Palette")
+        self.actionExport_Weights = QtGui.QAction(parent=MainWindow)
+        self.actionExport_Weights.setObjectName("actionExport_Weights")
         self.actionForce_16_9_View = QtGui.QAction(parent=MainWindow)
         self.actionForce_16_9_View.setObjectName("actionForce_16_9_View")
         self.actionAspect_Corrected_Top_Down = QtGui.QAction(parent=MainWindow)
@@ -278,6 +280,8 @@ class Ui_MainWindow(object):
         self.menuFile.addAction(self.actionExport_Palette)
         self.menuFile.addAction(self.actionImport_Palette)
         self.menuFile.addSeparator()
+        self.menuFile.addAction(self.actionExport_Weights)
+        self.menuFile.addSeparator()
         self.menuFile.addAction(self.actionQuit)
         self.menuEdit.addAction(self.actionCopy)
         self.menuEdit.addAction(self.actionPaste)
@@ -334,6 +338,7 @@ class Ui_MainWindow(object):
         self.actionExtract_Palette.setText(_translate("MainWindow", "Extract Palette"))
         self.actionExport_Palette.setText(_translate("MainWindow", "Export Palette..."))
         self.actionImport_Palette.setText(_translate("MainWindow", "Import Palette..."))
+        self.actionExport_Weights.setText(_translate("MainWindow", "Export Weights..."))
         self.actionForce_16_9_View.setText(_translate("MainWindow", "Force 16:9 View"))
         self.actionAspect_Corrected_Top_Down.setText(_translate("MainWindow", "Aspect Corrected Top-Down"))
         self.actionNormalized_Top_Down.setText(_translate("MainWindow", "Normalized Top-Down"))
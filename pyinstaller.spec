@@ -25,6 +25,8 @@ a = Analysis(
     datas=[
         (buildPath / '{}.py'.format(Version.VersionModuleName), moduleName),
         (join(sourcePath, 'team210.ico'), moduleName),
+        (join(sourcePath, 'edgecosts.toml'), moduleName),
+        (join(sourcePath, 'routes.toml'), moduleName),
         (join(sourcePath, 'widgets', 'pickablecolorlabel', 'default.png'), join(moduleName, 'widgets', 'pickablecolorlabel')),
     ],
     hiddenimports=[